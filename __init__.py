@@ -9,49 +9,90 @@ __version__ = "1.0.0"
 __author__ = "JSON Normalize Team"
 __description__ = "Comprehensive JSON normalization library"
 
-# Import main functions for easy access
-from .core.flattener import flatten_dict
-from .core.null_handler import normalize_nulls
-from .core.transformer import normalize_json
-from .core.relation import (
-    extract_child_table,
-    extract_nested_relations,
-    extract_junction_table,
-    flatten_nested_array
-)
-from .core.type_cast import apply_type_casting, infer_schema, cast_value
-from .core.dedup import (
-    deduplicate_records,
-    deduplicate_relations,
-    find_duplicates,
-    merge_duplicates
-)
-
-# Import utilities
-from .utils.config import JsonNormalizeConfig, get_config, set_config
-from .utils.naming import (
-    normalize_keys,
-    to_snake_case,
-    to_camel_case,
-    normalize_key,
-    clean_special_chars
-)
-from .utils.validation import (
-    validate_data,
-    validate_record,
-    filter_valid_records
-)
-from .utils.error_handler import (
-    handle_error,
-    safe_type_cast,
-    validate_nesting_depth,
-    log_processing_step,
-    create_error_summary,
-    JsonNormalizeError,
-    SchemaValidationError,
-    TypeCastError,
-    NestingDepthError
-)
+import importlib
+
+# Public API -> defining submodule. Submodules are imported on first attribute
+# access (PEP 562), so `import` stays cheap and optional dependencies such as
+# pandas are only loaded when an output format needs them.
+_LAZY_ATTRIBUTES = {
+    "flatten_dict": ".core.flattener",
+    "normalize_nulls": ".core.null_handler",
+    "normalize_json": ".core.transformer",
+    "normalize_batch": ".core.transformer",
+    "extract_child_table": ".core.relation",
+    "extract_nested_relations": ".core.relation",
+    "extract_junction_table": ".core.relation",
+    "flatten_nested_array": ".core.relation",
+    "apply_type_casting": ".core.type_cast",
+    "infer_schema": ".core.type_cast",
+    "cast_value": ".core.type_cast",
+    "PathSelector": ".core.selector",
+    "compile_selector": ".core.selector",
+    "compile_predicate": ".core.predicate",
+    "CompactTable": ".core.rows",
+    "RowView": ".core.rows",
+    "SpillTable": ".core.spill",
+    "MemoryBudget": ".core.spill",
+    "ShapeCache": ".core.shape",
+    "ShapePlan": ".core.shape",
+    "shape_fingerprint": ".core.shape",
+    "RelationalResult": ".core.relational",
+    "denormalize": ".core.denormalize",
+    "iter_denormalize": ".core.denormalize",
+    "CdcState": ".core.cdc",
+    "diff_document": ".core.cdc",
+    "diff_batch": ".core.cdc",
+    "diff_results": ".core.cdc",
+    "change_counts": ".core.cdc",
+    "deduplicate_records": ".core.dedup",
+    "deduplicate_relations": ".core.dedup",
+    "find_duplicates": ".core.dedup",
+    "merge_duplicates": ".core.dedup",
+    "JsonNormalizeConfig": ".utils.config",
+    "get_config": ".utils.config",
+    "set_config": ".utils.config",
+    "normalize_keys": ".utils.naming",
+    "to_snake_case": ".utils.naming",
+    "to_camel_case": ".utils.naming",
+    "normalize_key": ".utils.naming",
+    "clean_special_chars": ".utils.naming",
+    "validate_data": ".utils.validation",
+    "validate_record": ".utils.validation",
+    "filter_valid_records": ".utils.validation",
+    "handle_error": ".utils.error_handler",
+    "safe_type_cast": ".utils.error_handler",
+    "validate_nesting_depth": ".utils.error_handler",
+    "log_processing_step": ".utils.error_handler",
+    "create_error_summary": ".utils.error_handler",
+    "JsonNormalizeError": ".utils.error_handler",
+    "SchemaValidationError": ".utils.error_handler",
+    "TypeCastError": ".utils.error_handler",
+    "NestingDepthError": ".utils.error_handler",
+    "Quarantine": ".utils.error_handler",
+    "decode_json": ".utils.decoding",
+    "NormalizeMetrics": ".utils.metrics",
+    "MemoryProfiler": ".utils.profiling",
+    "ResultCache": ".utils.cache",
+    "DataProfile": ".utils.data_profile",
+    "HyperLogLog": ".utils.sketches",
+    "CountMinSketch": ".utils.sketches",
+    "TableSink": ".utils.output",
+    "CsvSink": ".utils.output",
+    "ParquetSink": ".utils.output",
+    "SqliteSink": ".utils.output",
+    "PartitionedSink": ".utils.output",
+    "generate_ddl": ".utils.output",
+    "write_tables": ".utils.output",
+    "normalize_stream": ".extensions.streaming",
+    "stream_to_sink": ".extensions.streaming",
+    "ChunkSizer": ".extensions.streaming",
+    "build_projection": ".extensions.integration",
+    "iter_documents": ".extensions.integration",
+    "normalize_collection": ".extensions.integration",
+    "LineIndex": ".extensions.ndjson",
+    "build_line_index": ".extensions.ndjson",
+    "read_lines": ".extensions.ndjson",
+}
 
 # Define public API
 __all__ = [
@@ -59,9 +100,28 @@ __all__ = [
     "flatten_dict",
     "normalize_nulls",
     "normalize_json",
+    "normalize_batch",
     "apply_type_casting",
     "infer_schema",
     "cast_value",
+    "PathSelector",
+    "compile_selector",
+    "compile_predicate",
+    "CompactTable",
+    "RowView",
+    "SpillTable",
+    "MemoryBudget",
+    "ShapeCache",
+    "ShapePlan",
+    "shape_fingerprint",
+    "RelationalResult",
+    "denormalize",
+    "iter_denormalize",
+    "CdcState",
+    "diff_document",
+    "diff_batch",
+    "diff_results",
+    "change_counts",
 
     # Relations
     "extract_child_table",
@@ -102,10 +162,50 @@ __all__ = [
     "SchemaValidationError",
     "TypeCastError",
     "NestingDepthError",
+    "Quarantine",
+
+    # Decoding and metrics
+    "decode_json",
+    "NormalizeMetrics",
+    "MemoryProfiler",
+    "ResultCache",
+    "DataProfile",
+    "HyperLogLog",
+    "CountMinSketch",
+
+    # Output
+    "TableSink",
+    "CsvSink",
+    "ParquetSink",
+    "SqliteSink",
+    "PartitionedSink",
+    "generate_ddl",
+    "write_tables",
+
+    # Streaming
+    "normalize_stream",
+    "stream_to_sink",
+    "ChunkSizer",
+
+    # Integration
+    "build_projection",
+    "iter_documents",
+    "normalize_collection",
+
+    # NDJSON
+    "LineIndex",
+    "build_line_index",
+    "read_lines",
 ]
 
 def __getattr__(name):
-    """Lazy import for optional dependencies."""
+    """Import public API attributes and optional dependencies on first use."""
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is not None:
+        value = getattr(importlib.import_module(module, __name__), name)
+        # Cache it so later lookups don't go through __getattr__
+        globals()[name] = value
+        return value
     if name == "pd":
         try:
             import pandas as pd
@@ -113,3 +213,6 @@ def __getattr__(name):
         except ImportError:
             raise ImportError("pandas is required for DataFrame operations")
     raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
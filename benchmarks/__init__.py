@@ -0,0 +1 @@
+"""Reproducible benchmarks for the normalization pipeline (see ``python -m benchmarks.run --help``)."""
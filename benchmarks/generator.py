@@ -0,0 +1,153 @@
+"""
+Seeded generator of synthetic documents shaped like the TMDB ``raw_movies`` collection.
+"""
+import copy
+import random
+import string
+from typing import Dict, Iterator, List
+
+_GENRES = ["Action", "Adventure", "Comedy", "Crime", "Drama", "Fantasy", "Horror",
+           "Romance", "Science Fiction", "Thriller", "War", "Western"]
+_COUNTRIES = [("US", "United States of America"), ("GB", "United Kingdom"), ("DE", "Germany"),
+              ("FR", "France"), ("JP", "Japan"), ("IN", "India"), ("VN", "Viet Nam")]
+_LANGUAGES = [("en", "English"), ("fr", "French"), ("de", "German"), ("ja", "Japanese"),
+              ("hi", "Hindi"), ("vi", "Vietnamese")]
+_STATUSES = ["Released", "Released", "Released", "Post Production", "Rumored"]
+_VIDEO_TYPES = ["Trailer", "Teaser", "Featurette", "Clip", "Behind the Scenes"]
+_DEPARTMENTS = ["Directing", "Writing", "Production", "Sound", "Camera", "Editing", "Art"]
+
+def _word(rng: random.Random, length: int = 8) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(length))
+
+def _title(rng: random.Random) -> str:
+    return " ".join(_word(rng, rng.randint(3, 9)).capitalize() for _ in range(rng.randint(1, 4)))
+
+def _date(rng: random.Random) -> str:
+    return f"{rng.randint(1950, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+def _array(rng: random.Random, mean_length: int, make, duplicate_ratio: float) -> List[Dict]:
+    """An array of child objects of length around `mean_length`, with some repeated children."""
+    length = max(0, int(rng.gauss(mean_length, mean_length / 3))) if mean_length else 0
+    items = []
+    for _ in range(length):
+        if items and rng.random() < duplicate_ratio:
+            items.append(copy.deepcopy(rng.choice(items)))
+        else:
+            items.append(make())
+    return items
+
+def _nested(rng: random.Random, depth: int, width: int) -> Dict:
+    """A nested object `depth` levels deep with `width` scalar fields per level."""
+    node = {f"field_{i}": rng.choice([rng.randint(0, 10 ** 6), rng.random(), _word(rng), None, True])
+            for i in range(width)}
+    if depth > 1:
+        node["child"] = _nested(rng, depth - 1, width)
+    return node
+
+def generate_movie(rng: random.Random, movie_id: int, depth: int = 2, width: int = 4,
+                   array_length: int = 5, duplicate_ratio: float = 0.1) -> Dict:
+    """
+    Generate one movie document.
+
+    Args:
+        rng: Random source.
+        movie_id: Value of the ``id`` field.
+        depth: Depth of the extra nested ``metadata`` object.
+        width: Scalar fields per level of ``metadata``.
+        array_length: Mean length of relation arrays (cast and crew are 4x longer).
+        duplicate_ratio: Probability that a child repeats an earlier child of the same array.
+    """
+    def genre():
+        name = rng.choice(_GENRES)
+        return {"id": _GENRES.index(name) + 10, "name": name}
+
+    def company():
+        return {"id": rng.randint(1, 5000), "logo_path": f"/{_word(rng, 27)}.png",
+                "name": _title(rng), "origin_country": rng.choice(_COUNTRIES)[0]}
+
+    def country():
+        code, name = rng.choice(_COUNTRIES)
+        return {"iso_3166_1": code, "name": name}
+
+    def language():
+        code, name = rng.choice(_LANGUAGES)
+        return {"english_name": name, "iso_639_1": code, "name": name}
+
+    def video():
+        return {"iso_639_1": "en", "iso_3166_1": "US", "name": _title(rng), "key": _word(rng, 11),
+                "site": "YouTube", "size": rng.choice([720, 1080, 2160]),
+                "type": rng.choice(_VIDEO_TYPES), "official": rng.random() < 0.7,
+                "published_at": _date(rng) + "T12:00:00.000Z", "id": _word(rng, 24)}
+
+    def cast_member():
+        return {"id": rng.randint(1, 10 ** 6), "name": _title(rng), "character": _title(rng),
+                "gender": rng.randint(0, 2), "order": rng.randint(0, 100), "popularity": rng.random() * 50}
+
+    def crew_member():
+        return {"id": rng.randint(1, 10 ** 6), "name": _title(rng),
+                "department": rng.choice(_DEPARTMENTS), "job": _word(rng)}
+
+    language_code = rng.choice(_LANGUAGES)[0]
+    return {
+        "_id": {"$oid": "%024x" % rng.getrandbits(96)},
+        "adult": rng.random() < 0.05,
+        "backdrop_path": f"/{_word(rng, 27)}.jpg",
+        "belongs_to_collection": None if rng.random() < 0.7 else
+            {"id": rng.randint(1, 10 ** 5), "name": _title(rng), "poster_path": f"/{_word(rng, 27)}.jpg"},
+        "budget": rng.randint(0, 3 * 10 ** 8),
+        "genres": _array(rng, max(1, array_length // 2), genre, duplicate_ratio),
+        "homepage": f"http://www.{_word(rng)}.com/",
+        "id": movie_id,
+        "imdb_id": f"tt{rng.randint(0, 10 ** 7):07d}",
+        "origin_country": [rng.choice(_COUNTRIES)[0]],
+        "original_language": language_code,
+        "original_title": _title(rng),
+        "overview": " ".join(_word(rng, rng.randint(2, 10)) for _ in range(rng.randint(20, 60))),
+        "popularity": round(rng.random() * 100, 3),
+        "poster_path": f"/{_word(rng, 27)}.jpg",
+        "production_companies": _array(rng, array_length, company, duplicate_ratio),
+        "production_countries": _array(rng, max(1, array_length // 2), country, duplicate_ratio),
+        "release_date": _date(rng),
+        "revenue": rng.randint(0, 10 ** 9),
+        "runtime": rng.randint(60, 200),
+        "spoken_languages": _array(rng, max(1, array_length // 3), language, duplicate_ratio),
+        "status": rng.choice(_STATUSES),
+        "tagline": _title(rng) if rng.random() < 0.8 else None,
+        "title": _title(rng),
+        "video": False,
+        "vote_average": round(rng.random() * 10, 3),
+        "vote_count": rng.randint(0, 40000),
+        "videos": {"results": _array(rng, array_length, video, duplicate_ratio)},
+        "credits": {"cast": _array(rng, array_length * 4, cast_member, duplicate_ratio),
+                    "crew": _array(rng, array_length * 4, crew_member, duplicate_ratio)},
+        "metadata": _nested(rng, depth, width),
+    }
+
+def generate_documents(count: int, seed: int = 42, depth: int = 2, width: int = 4,
+                       array_length: int = 5, duplicate_ratio: float = 0.1) -> Iterator[Dict]:
+    """
+    Generate `count` movie documents reproducibly.
+
+    Args:
+        count: Number of documents.
+        seed: Random seed; the same arguments always produce the same documents.
+        depth: Depth of the extra nested object in every document.
+        width: Scalar fields per nesting level.
+        array_length: Mean length of relation arrays.
+        duplicate_ratio: Probability that a document repeats an earlier one (and that
+                         a child repeats an earlier child of its array).
+
+    Yields:
+        dict: Movie documents.
+    """
+    rng = random.Random(seed)
+    generated = []
+    for movie_id in range(1, count + 1):
+        if generated and rng.random() < duplicate_ratio:
+            document = copy.deepcopy(rng.choice(generated))
+        else:
+            document = generate_movie(rng, movie_id, depth, width, array_length, duplicate_ratio)
+            if len(generated) < 1000:
+                # Keep a private copy: consumers may normalize documents in place
+                generated.append(copy.deepcopy(document))
+        yield document
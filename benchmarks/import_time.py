@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Measure the cold import time of the package and check that heavy optional dependencies stay unloaded.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --repeat 20 --budget-ms 150
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow")
+
+# Each target is (label, working directory, import statement)
+TARGETS = [
+    ("package", os.path.dirname(ROOT), f"import {os.path.basename(ROOT)}"),
+    ("core.transformer", ROOT, "import core.transformer"),
+    ("extensions.cli", ROOT, "import extensions.cli"),
+]
+
+_PROBE = """
+import sys, time, json
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def measure(cwd, statement, repeat):
+    """Import `statement` in `repeat` fresh interpreters and return the fastest run."""
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", _PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+                                cwd=cwd, capture_output=True, text=True, check=True).stdout
+        run = json.loads(output.strip().splitlines()[-1])
+        if best is None or run["seconds"] < best["seconds"]:
+            best = run
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="Fresh interpreters per target; the fastest is kept")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Fail if an import takes longer than this many milliseconds")
+    args = parser.parse_args(argv)
+
+    failed = False
+    report = {}
+    for label, cwd, statement in TARGETS:
+        run = measure(cwd, statement, args.repeat)
+        report[label] = run
+        problems = []
+        if run["heavy"]:
+            problems.append("loaded " + ", ".join(run["heavy"]))
+        if args.budget_ms is not None and run["seconds"] * 1000 > args.budget_ms:
+            problems.append(f"over the {args.budget_ms:g} ms budget")
+        failed = failed or bool(problems)
+        print(f"{label:<20} {run['seconds'] * 1000:8.1f} ms  {'; '.join(problems) or 'ok'}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Time every public pipeline stage on synthetic TMDB-shaped documents at several scales.
+
+Usage:
+    python -m benchmarks.run                                  # default scales, print JSON
+    python -m benchmarks.run --scales 100 1000 --output bench.json
+    python -m benchmarks.run --save-baseline                  # store benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from benchmarks.generator import generate_documents
+from core.flattener import flatten_dict
+from core.null_handler import normalize_nulls
+from core.relation import extract_nested_relations
+from core.type_cast import apply_type_casting
+from core.dedup import deduplicate_records, deduplicate_relations
+from core.transformer import normalize_batch
+from utils.config import set_config
+from utils.decoding import DECODER, loads
+from utils.naming import normalize_keys
+
+DEFAULT_SCALES = [100, 1000, 5000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+CAST_SCHEMA = {
+    "budget": "float",
+    "revenue": "float",
+    "release_date": "date",
+    "vote_count": "int",
+    "adult": "bool",
+    "popularity": "str",
+}
+
+def _best_of(repeat, func):
+    """Run `func` `repeat` times and return the fastest wall-clock time in seconds."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run_scale(count, repeat, generator_options):
+    """Benchmark every stage on `count` documents and return stage -> timing."""
+    documents = list(generate_documents(count, **generator_options))
+    raw = [json.dumps(document).encode() for document in documents]
+
+    # Prepare the input of each stage outside of the timed region
+    flattened = [flatten_dict(document)[0] for document in documents]
+    extracted = [extract_nested_relations(row) for row in flattened]
+    mains = [result["main"] for result in extracted]
+    relations = {}
+    for result in extracted:
+        for table_name, rows in result["relations"].items():
+            relations.setdefault(table_name, []).extend(rows)
+    nulls = normalize_nulls(mains)
+    keyed = normalize_keys(nulls)
+
+    stages = {
+        "decode": lambda: [loads(line) for line in raw],
+        "flatten": lambda: [flatten_dict(document) for document in documents],
+        "relations": lambda: [extract_nested_relations(row) for row in flattened],
+        "nulls": lambda: normalize_nulls(mains),
+        "keys": lambda: normalize_keys(nulls),
+        "cast": lambda: apply_type_casting(keyed, CAST_SCHEMA),
+        "dedup": lambda: (deduplicate_records(keyed), deduplicate_relations(relations)),
+        "pipeline": lambda: normalize_batch(documents, output_format="relational"),
+        "pipeline_shapes": lambda: normalize_batch(documents, output_format="relational", shapes=True),
+    }
+    try:
+        import pandas as pd
+        stages["dataframe"] = lambda: [pd.DataFrame(keyed)] + [pd.DataFrame(rows) for rows in relations.values()]
+    except ImportError:
+        pass
+
+    results = {}
+    for name, func in stages.items():
+        seconds = _best_of(repeat, func)
+        results[name] = {
+            "seconds": seconds,
+            "docs_per_second": count / seconds if seconds > 0 else None,
+        }
+    results["_rows"] = {"main": len(keyed), "relations": sum(len(rows) for rows in relations.values()),
+                        "bytes": sum(len(line) for line in raw)}
+    return results
+
+def run(scales, repeat, generator_options):
+    """Run all scales and return the report dictionary."""
+    # Per-step INFO logging would dominate the timings
+    set_config(log_level="WARNING")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "decoder": DECODER,
+            "repeat": repeat,
+            "generator": generator_options,
+        },
+        "results": {str(count): run_scale(count, repeat, generator_options) for count in scales},
+    }
+
+def compare(report, baseline, tolerance):
+    """
+    Compare a report with a baseline report.
+
+    Returns:
+        List of (scale, stage, baseline_seconds, current_seconds, ratio) for every
+        stage present in both, and whether any ratio exceeds ``1 + tolerance``.
+    """
+    rows = []
+    regressed = False
+    for scale, stages in report["results"].items():
+        for stage, timing in stages.items():
+            if stage.startswith("_"):
+                continue
+            base = baseline.get("results", {}).get(scale, {}).get(stage)
+            if not base or not base.get("seconds"):
+                continue
+            ratio = timing["seconds"] / base["seconds"]
+            regressed = regressed or ratio > 1 + tolerance
+            rows.append((scale, stage, base["seconds"], timing["seconds"], ratio))
+    return rows, regressed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="Numbers of documents to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the fastest is kept")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--depth", type=int, default=2, help="Depth of the extra nested object")
+    parser.add_argument("--width", type=int, default=4, help="Scalar fields per nesting level")
+    parser.add_argument("--array-length", type=int, default=5, help="Mean relation array length")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Store the report as {DEFAULT_BASELINE}")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against a stored report")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown ratio before --compare fails (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    generator_options = {
+        "seed": args.seed,
+        "depth": args.depth,
+        "width": args.width,
+        "array_length": args.array_length,
+        "duplicate_ratio": args.duplicate_ratio,
+    }
+    report = run(args.scales, args.repeat, generator_options)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, "w") as f:
+            f.write(text)
+    if not args.output and not args.compare:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows, regressed = compare(report, baseline, args.tolerance)
+        print(f"{'scale':>8} {'stage':<12} {'baseline s':>12} {'current s':>12} {'ratio':>7}")
+        for scale, stage, base, current, ratio in rows:
+            flag = "  <-- slower" if ratio > 1 + args.tolerance else ""
+            print(f"{scale:>8} {stage:<12} {base:>12.4f} {current:>12.4f} {ratio:>7.2f}{flag}")
+        return 1 if regressed else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,16 @@
 from .flattener import flatten_dict
 from .null_handler import normalize_nulls
-from .transformer import normalize_json
+from .transformer import normalize_json, normalize_batch
 from .relation import extract_child_table, extract_nested_relations, extract_junction_table, flatten_nested_array
 from .type_cast import apply_type_casting, infer_schema
 from .dedup import deduplicate_records, deduplicate_relations
+from .selector import PathSelector, compile_selector
+from .predicate import compile_predicate
+from .rows import CompactTable, RowView, compact_rows
+from .spill import MemoryBudget, SpillTable
+from .shape import ShapeCache, ShapePlan, shape_fingerprint
+from .relational import RelationalResult
+from .denormalize import denormalize, iter_denormalize
+from .cdc import CdcState, diff_document, diff_batch, diff_results
 
-__all__ = ["flatten_dict", "normalize_nulls", "normalize_json", "extract_child_table", "extract_nested_relations", "extract_junction_table", "flatten_nested_array", "apply_type_casting", "infer_schema", "deduplicate_records", "deduplicate_relations"]
+__all__ = ["flatten_dict", "normalize_nulls", "normalize_json", "normalize_batch", "extract_child_table", "extract_nested_relations", "extract_junction_table", "flatten_nested_array", "apply_type_casting", "infer_schema", "deduplicate_records", "deduplicate_relations", "PathSelector", "compile_selector", "compile_predicate", "CompactTable", "RowView", "compact_rows", "MemoryBudget", "SpillTable", "ShapeCache", "ShapePlan", "shape_fingerprint", "RelationalResult", "denormalize", "iter_denormalize", "CdcState", "diff_document", "diff_batch", "diff_results"]
@@ -0,0 +1,286 @@
+"""
+Change-data-capture: compare new document versions with the previous state and emit row changes.
+"""
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .transformer import normalize_json
+
+try:
+    from ..utils.config import get_config
+    from ..utils.decoding import decode_json, is_raw_source
+    from ..utils.error_handler import SchemaValidationError, handle_error
+except ImportError:
+    # Imported as top-level modules (core, utils, ...): their parent directory
+    # is already on sys.path, so absolute imports resolve
+    from utils.config import get_config
+    from utils.decoding import decode_json, is_raw_source
+    from utils.error_handler import SchemaValidationError, handle_error
+
+ROW_ID = "_row_id"
+MAIN_TABLE = "main"
+
+# Returned by `_diff` for a document that failed to normalize
+_FAILED = object()
+
+def row_fingerprint(row: Dict[str, Any], ignore: Sequence[str] = ()) -> str:
+    """
+    Hash of a row's content, independent of key order.
+
+    Args:
+        row: A normalized row.
+        ignore: Columns left out of the hash (e.g. positional foreign keys).
+    """
+    items = sorted((key, value) for key, value in row.items() if key not in ignore)
+    return hashlib.md5(repr(items).encode()).hexdigest()
+
+def row_identities(doc_key: Any, table_name: str, rows: Iterable[Dict[str, Any]],
+                   key_columns: Optional[Sequence[str]] = None, fk_name: str = "parent_id"):
+    """
+    Assign stable identities to the rows of one table of one document.
+
+    Main rows are identified by the document key. A relation row is identified
+    by the document key plus its `key_columns` (default: ``id`` when the row has
+    one), or by its content when it has no key; repeats get a ``#n`` suffix. The
+    positional foreign key never takes part, so reordering an array does not
+    change identities.
+
+    Yields:
+        (identity, fingerprint, row) tuples.
+    """
+    seen = {}
+    for row in rows:
+        fingerprint = row_fingerprint(row, ignore=(fk_name, ROW_ID))
+        if table_name == MAIN_TABLE:
+            part = ""
+        else:
+            columns = key_columns if key_columns is not None else (("id",) if "id" in row else ())
+            if columns and all(column in row for column in columns):
+                part = "|".join(str(row[column]) for column in columns)
+            else:
+                part = fingerprint
+        base = f"{doc_key}/{part}" if part else str(doc_key)
+        count = seen.get(base, 0)
+        seen[base] = count + 1
+        yield (base if count == 0 else f"{base}#{count}"), fingerprint, row
+
+class CdcState:
+    """
+    Row fingerprints of the last seen version of every document.
+
+    Attributes:
+        documents (dict): Document key -> table name -> row identity -> fingerprint.
+
+    Example:
+        >>> state = CdcState.load("movies.cdc.json")
+        >>> changes = diff_batch(todays_movies, state, key="id")
+        >>> state.save("movies.cdc.json")
+    """
+
+    def __init__(self, documents: Optional[Dict[str, Dict[str, Dict[str, str]]]] = None):
+        self.documents = documents or {}
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def __contains__(self, doc_key) -> bool:
+        return str(doc_key) in self.documents
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"documents": self.documents}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CdcState":
+        return cls(data.get("documents", {}))
+
+    def save(self, path: str) -> None:
+        """Write the fingerprints as JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> "CdcState":
+        """Read fingerprints saved with `save`; a missing file gives an empty state."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except FileNotFoundError:
+            return cls()
+
+def _fingerprint_tables(doc_key, result, row_keys, fk_name):
+    """Table name -> identity -> (fingerprint, row) for one normalized document."""
+    tables = {MAIN_TABLE: result["main"]}
+    tables.update(result["relations"])
+    return {
+        table_name: {identity: (fingerprint, row) for identity, fingerprint, row
+                     in row_identities(doc_key, table_name, rows, row_keys.get(table_name), fk_name)}
+        for table_name, rows in tables.items()
+    }
+
+def _compare(old: Dict[str, Dict[str, str]], new: Dict[str, Dict[str, tuple]], changes: Dict) -> None:
+    """Add the differences between old fingerprints and new rows to `changes`."""
+    for table_name in set(old) | set(new):
+        old_rows = old.get(table_name, {})
+        new_rows = new.get(table_name, {})
+        inserts, updates = [], []
+        for identity, (fingerprint, row) in new_rows.items():
+            previous = old_rows.get(identity)
+            if previous == fingerprint:
+                continue
+            row[ROW_ID] = identity
+            (inserts if previous is None else updates).append(row)
+        deletes = [identity for identity in old_rows if identity not in new_rows]
+        if inserts or updates or deletes:
+            table = changes.setdefault(table_name, {"inserts": [], "updates": [], "deletes": []})
+            table["inserts"].extend(inserts)
+            table["updates"].extend(updates)
+            table["deletes"].extend(deletes)
+
+def _document_key(result, key):
+    main = result["main"]
+    if not main or key not in main[0]:
+        raise SchemaValidationError(f"Document has no key column '{key}' after normalization")
+    return str(main[0][key])
+
+def _raw_key(document, key) -> Optional[str]:
+    """The key of a document read before normalization, or None if it can't be found."""
+    try:
+        if is_raw_source(document):
+            document = decode_json(document)
+    except Exception:
+        return None
+    if isinstance(document, dict) and document.get(key) is not None:
+        return str(document[key])
+    return None
+
+def _diff(document, state, key, row_keys, changes, kwargs):
+    """
+    Diff one document into `changes`, update `state` and return the document key.
+
+    Returns None for a document rejected by ``where`` and `_FAILED` for one that
+    failed to normalize or has no key. With ``raise_errors`` the error propagates.
+    """
+    kwargs["output_format"] = "relational"
+    kwargs.pop("compact", None)
+    kwargs.pop("dictionary_encode", None)
+    fk_name = kwargs.get("fk_name", "parent_id")
+    result = normalize_json(document, **kwargs)
+    if not result:
+        # normalize_json already reported the error
+        return _FAILED
+    if not result["main"] and kwargs.get("where") is not None:
+        return None
+    try:
+        doc_key = _document_key(result, key)
+    except SchemaValidationError as e:
+        if kwargs.get("raise_errors"):
+            raise
+        handle_error(e, "CDC document key")
+        return _FAILED
+    new = _fingerprint_tables(doc_key, result, row_keys or {}, fk_name)
+    _compare(state.documents.get(doc_key, {}), new, changes)
+    state.documents[doc_key] = {table_name: {identity: fingerprint for identity, (fingerprint, _) in rows.items()}
+                                for table_name, rows in new.items()}
+    return doc_key
+
+def diff_document(document: Dict, state: CdcState, key: str = "id",
+                  row_keys: Optional[Dict[str, Sequence[str]]] = None, **kwargs) -> Dict[str, Dict[str, List]]:
+    """
+    Normalize one document and return its row changes since the version in `state`.
+
+    The state is updated to the new version.
+
+    Args:
+        document: The new version of the document.
+        state: Fingerprints of the previous versions.
+        key: Main-table column identifying the document (after key normalization).
+        row_keys: Table name -> columns identifying a relation row within its document.
+        **kwargs: Options passed to ``normalize_json``.
+
+    Returns:
+        Table name -> {"inserts": [rows], "updates": [rows], "deletes": [row ids]}, for
+        tables with changes only. Emitted rows carry their identity in ``_row_id``.
+    """
+    changes = {}
+    _diff(document, state, key, row_keys, changes, kwargs)
+    return changes
+
+
+def diff_batch(documents: Iterable[Dict], state: CdcState, key: str = "id",
+               row_keys: Optional[Dict[str, Sequence[str]]] = None, full_snapshot: bool = False,
+               **kwargs) -> Dict[str, Dict[str, List]]:
+    """
+    Diff a batch of new document versions against `state` (see `diff_document`).
+
+    Args:
+        documents: New document versions.
+        state: Fingerprints of the previous versions; updated in place.
+        key: Main-table column identifying a document.
+        row_keys: Table name -> columns identifying a relation row within its document.
+        full_snapshot: If True, `documents` is the whole collection: documents in
+                       `state` that are not in the batch (or are rejected by a
+                       ``where`` option) are deleted with all their rows. A document
+                       that fails to normalize keeps its previous rows; if its key
+                       can't be read from the raw document, no deletes are emitted
+                       for this batch.
+        **kwargs: Options passed to ``normalize_json``. ``quarantine=Quarantine()``
+                  records documents that fail to normalize or have no `key`,
+                  as in ``normalize_batch``; otherwise they go through
+                  ``handle_error``. Either way the rest of the batch is diffed.
+
+    Returns:
+        Per-table inserts, updates and deletes.
+    """
+    changes = {}
+    seen = set()
+    unknown_failures = 0
+    quarantine = kwargs.pop("quarantine", None)
+    if quarantine is not None:
+        kwargs["raise_errors"] = True
+    for index, document in enumerate(documents):
+        try:
+            doc_key = _diff(document, state, key, row_keys, changes, dict(kwargs))
+        except Exception as e:
+            if quarantine is None:
+                raise
+            # Nothing of this document was diffed yet, so state and changes stay consistent
+            quarantine.add(index, document, e)
+            doc_key = _FAILED
+        if doc_key is _FAILED:
+            # A bad version must not delete the document downstream
+            doc_key = _raw_key(document, key)
+            if doc_key is None:
+                unknown_failures += 1
+        if doc_key is not None:
+            seen.add(doc_key)
+    if full_snapshot and unknown_failures:
+        get_config().logger.warning(f"{unknown_failures} document(s) failed without a readable '{key}'; "
+                                    "skipping the deletes of this snapshot")
+    elif full_snapshot:
+        for doc_key in [doc_key for doc_key in state.documents if doc_key not in seen]:
+            _compare(state.documents.pop(doc_key), {}, changes)
+    return changes
+
+def diff_results(previous: Dict, current: Dict, key: str = "id",
+                 row_keys: Optional[Dict[str, Sequence[str]]] = None,
+                 fk_name: str = "parent_id") -> Dict[str, Dict[str, List]]:
+    """
+    Compare two relational results of the same document (``normalize_json(..., output_format="relational")``).
+
+    Returns:
+        Per-table inserts, updates and deletes, as in `diff_document`.
+    """
+    state = CdcState()
+    doc_key = _document_key(previous, key)
+    old = _fingerprint_tables(doc_key, previous, row_keys or {}, fk_name)
+    state.documents[doc_key] = {table_name: {identity: fingerprint for identity, (fingerprint, _) in rows.items()}
+                                for table_name, rows in old.items()}
+    changes = {}
+    new = _fingerprint_tables(_document_key(current, key), current, row_keys or {}, fk_name)
+    _compare(state.documents[doc_key], new, changes)
+    return changes
+
+def change_counts(changes: Dict[str, Dict[str, List]]) -> Dict[str, Dict[str, int]]:
+    """Number of inserts, updates and deletes per table."""
+    return {table_name: {kind: len(rows) for kind, rows in table.items()} for table_name, table in changes.items()}
@@ -0,0 +1,225 @@
+"""
+Reverse transformation: rebuild nested documents from relational output.
+"""
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Union
+
+from .relation import root_value
+
+try:
+    from ..utils.error_handler import SchemaValidationError
+except ImportError:
+    # Imported as top-level modules (core, utils, ...): their parent directory
+    # is already on sys.path, so absolute imports resolve
+    from utils.error_handler import SchemaValidationError
+
+TABLE_SUFFIX = "_table"
+_POSITION = re.compile(r"_\d+$")
+_UNRESOLVED = object()
+
+def table_parents(tables: Union[Mapping[str, Iterable[Mapping]], Iterable[str]],
+                  fk_name: str = "parent_id") -> Dict[str, Optional[str]]:
+    """
+    Parent table of every relation table, None for tables hanging off the main row.
+
+    `extract_nested_relations` names a nested table ``<parent base>_<key>_table``,
+    which can't tell ``genres_extra`` (an array of its own) from ``extra`` nested
+    in ``genres``. The foreign keys can: a top-level row's key strips to its own
+    table's base (``"genres_extra_0"`` -> ``"genres_extra"``), and a nested row's
+    key strips to the key of a row of its parent (``"genres_0_1"`` -> ``"genres_0"``).
+
+    Args:
+        tables: Table name -> rows. With table names only (or a table without
+                rows), the parent is guessed from the names: the longest
+                prefix wins.
+        fk_name: Foreign key column of the relation tables.
+
+    Raises:
+        ValueError: When the rows of one table reference different parents, i.e.
+                    two arrays collapsed to the same table name (top-level
+                    ``genres_extra`` and ``extra`` nested in ``genres``).
+    """
+    rows_by_name = tables if isinstance(tables, Mapping) else {}
+    bases = {name: name[:-len(TABLE_SUFFIX)] for name in tables if name.endswith(TABLE_SUFFIX)}
+    fk_values = {}
+    for name in bases:
+        rows = rows_by_name.get(name)
+        fk_values[name] = {row.get(fk_name) for row in rows} if rows else set()
+    tree = {}
+    for name, base in bases.items():
+        candidates = sorted((candidate for candidate, candidate_base in bases.items()
+                             if candidate != name and base.startswith(candidate_base + "_")),
+                            key=lambda candidate: len(bases[candidate]), reverse=True)
+        if not fk_values[name] - {None}:
+            tree[name] = candidates[0] if candidates else None
+            continue
+        parents = set()
+        for fk in fk_values[name] - {None}:
+            key = parent_key(fk)
+            parents.add(None if key == base else next(
+                (candidate for candidate in candidates if key in fk_values[candidate]), _UNRESOLVED))
+        # Keys matching no row of a candidate are orphans and don't decide the parent
+        found = parents - {_UNRESOLVED}
+        if len(found) > 1:
+            raise ValueError(f"Rows of {name} belong to different parents "
+                             f"({', '.join(sorted('main' if parent is None else parent for parent in found))}): "
+                             f"arrays at different paths were extracted to the same table name")
+        tree[name] = found.pop() if found else None
+    return tree
+
+def parent_key(fk: Any) -> Optional[str]:
+    """``"credits.cast_0_2"`` -> ``"credits.cast_0"``: the foreign key of the parent row (or the array key)."""
+    if not isinstance(fk, str):
+        return None
+    return _POSITION.sub("", fk)
+
+class _Assembler:
+    """Builds documents from FK hash indexes over the relation tables."""
+
+    def __init__(self, tables: Mapping[str, Iterable[Mapping]], fk_name: str, root_fk: Optional[str],
+                 sep: Optional[str]):
+        self.tree = table_parents(tables, fk_name)
+        self.children = {}
+        for name, parent in self.tree.items():
+            self.children.setdefault(parent, []).append(name)
+        self.fk_name = fk_name
+        self.root_fk = root_fk
+        self.sep = sep
+
+    def index(self, relations: Mapping[str, Iterable[Mapping]]) -> Dict[str, Dict[tuple, List[Mapping]]]:
+        """Table name -> (document key, parent foreign key) -> rows, in table order."""
+        fk_name, root_fk = self.fk_name, self.root_fk
+        indexes = {}
+        for name, rows in relations.items():
+            index = indexes[name] = {}
+            for row in rows:
+                key = (row.get(root_fk) if root_fk else None, parent_key(row.get(fk_name)))
+                bucket = index.get(key)
+                if bucket is None:
+                    index[key] = [row]
+                else:
+                    bucket.append(row)
+        return indexes
+
+    def _set_path(self, document: Dict[str, Any], key: str, value: Any) -> None:
+        if not self.sep or self.sep not in key:
+            document[key] = value
+            return
+        *parents, last = key.split(self.sep)
+        for part in parents:
+            child = document.get(part)
+            if not isinstance(child, dict):
+                child = document[part] = {}
+            document = child
+        document[last] = value
+
+    def _rows(self, table_name: str, rows: List[Mapping], root: Any, indexes) -> List[Dict[str, Any]]:
+        """Copy child rows without their link columns, attaching their own children."""
+        built = []
+        base = table_name[:-len(TABLE_SUFFIX)]
+        for row in rows:
+            child = {key: value for key, value in row.items() if key != self.fk_name and key != self.root_fk}
+            fk = row.get(self.fk_name)
+            for nested in self.children.get(table_name, ()):
+                nested_rows = indexes[nested].get((root, fk))
+                if nested_rows:
+                    key = nested[len(base) + 1:-len(TABLE_SUFFIX)]
+                    child[key] = self._rows(nested, nested_rows, root, indexes)
+            built.append(child)
+        return built
+
+    def document(self, main_row: Mapping, indexes) -> Dict[str, Any]:
+        """Rebuild the document of one main row."""
+        document = {}
+        for key, value in main_row.items():
+            self._set_path(document, key, value)
+        root = root_value(main_row) if self.root_fk else None
+        for table_name in self.children.get(None, ()):
+            base = table_name[:-len(TABLE_SUFFIX)]
+            rows = indexes[table_name].get((root, base))
+            if rows:
+                self._set_path(document, base, self._rows(table_name, rows, root, indexes))
+        return document
+
+def denormalize(result: Mapping[str, Any], fk_name: str = "parent_id", root_fk: Optional[str] = None,
+                sep: Optional[str] = ".") -> List[Dict[str, Any]]:
+    """
+    Rebuild nested documents from a relational result.
+
+    Every relation table is indexed once on its foreign key (and on the
+    document key when `root_fk` is set), so reassembly is linear in the
+    number of rows instead of scanning child tables per parent.
+
+    Args:
+        result: ``{"main": rows, "relations": {table: rows}}`` as returned by
+                ``normalize_json``/``normalize_batch`` with ``output_format="relational"``.
+        fk_name: Foreign key column of the relation tables.
+        root_fk: Document key column added with ``normalize_json(..., root_fk=...)``.
+                 Required when `result` holds more than one document: relation
+                 foreign keys are positional within a document. The key must
+                 be unique per document.
+        sep: Separator of flattened main keys, expanded back into nested objects
+             (None keeps them flat). Keys renamed by a key convention can't be
+             split; normalize with ``key_convention="keep"`` for a faithful round trip.
+
+    Returns:
+        list[dict]: One document per main row. Arrays that were empty or null in
+        the source come back as the null value of their main column.
+
+    Example:
+        >>> result = normalize_batch(movies, key_convention="keep", root_fk="_root")
+        >>> denormalize(result, root_fk="_root")[0]["genres"]
+        [{'id': 18, 'name': 'Drama'}]
+    """
+    main = result["main"]
+    relations = result.get("relations") or {}
+    if root_fk is None and len(main) > 1 and any(len(rows) for rows in relations.values()):
+        raise SchemaValidationError("denormalize() needs root_fk to split the relation rows of several documents")
+    if root_fk is not None:
+        roots = [root_value(row) for row in main]
+        if len(set(roots)) != len(roots):
+            raise SchemaValidationError("denormalize() needs a unique document key per main row")
+    assembler = _Assembler(relations, fk_name, root_fk, sep)
+    indexes = assembler.index(relations)
+    return [assembler.document(row, indexes) for row in main]
+
+def iter_denormalize(main: Iterable[Mapping], relations: Mapping[str, Iterable[Mapping]], root_fk: str,
+                     fk_name: str = "parent_id", sep: Optional[str] = ".") -> Iterator[Dict[str, Any]]:
+    """
+    Rebuild documents from tables streamed in document order, one document at a time.
+
+    Merge-joins the main rows with every relation table on `root_fk`: the rows
+    of each document must be contiguous and in the order of the main rows, as
+    written by ``normalize_batch``, ``normalize_stream`` and the table sinks.
+    Only one document's rows are held in memory.
+
+    Args:
+        main: Main rows, e.g. read back from ``main.csv``.
+        relations: Table name -> iterable of its rows.
+        root_fk: Document key column (see ``normalize_json(..., root_fk=...)``); consecutive
+                 documents must not share a key.
+        fk_name: Foreign key column of the relation tables.
+        sep: Separator of flattened main keys (see `denormalize`).
+
+    Yields:
+        dict: The document of each main row.
+
+    Raises:
+        SchemaValidationError: If relation rows are left over, i.e. the input was not sorted.
+    """
+    iterators = {name: iter(rows) for name, rows in relations.items()}
+    pending = {name: next(iterator, None) for name, iterator in iterators.items()}
+    for row in main:
+        root = root_value(row)
+        batch = {}
+        for name, iterator in iterators.items():
+            rows = batch[name] = []
+            while pending[name] is not None and pending[name].get(root_fk) == root:
+                rows.append(pending[name])
+                pending[name] = next(iterator, None)
+        # The table tree is read from the foreign keys of the document's own rows
+        assembler = _Assembler(batch, fk_name, root_fk, sep)
+        yield assembler.document(row, assembler.index(batch))
+    leftover = [name for name, row in pending.items() if row is not None]
+    if leftover:
+        raise SchemaValidationError(f"Relation rows not matched in document order: {', '.join(sorted(leftover))}")
@@ -1,4 +1,6 @@
-def flatten_dict(obj, sep=".", explode_arrays=False, flatten_nested=False):
+from .selector import SKIP, DESCEND, KEEP_ALL
+
+def flatten_dict(obj, sep=".", explode_arrays=False, flatten_nested=False, selector=None):
     """
     Flatten a nested dictionary into a flat dictionary or list of dictionaries if exploding arrays.
 
@@ -7,17 +9,29 @@ def flatten_dict(obj, sep=".", explode_arrays=False, flatten_nested=False):
         sep (str): The separator for flattened keys. Default is ".".
         explode_arrays (bool): If True, explode primitive arrays into multiple rows. Default is False.
         flatten_nested (bool): If True, flatten nested arrays. Default is False.
+        selector (PathSelector): Optional compiled include/exclude selector. Subtrees
+                                 that are not selected are never visited.
 
     Returns:
         list[dict]: List of flattened dictionaries.
     """
-    def _flatten(current, prefix="", path=[]):
+    def _flatten(current, prefix="", path=(), check=selector is not None):
         results = []
         if isinstance(current, dict):
             for key, value in current.items():
+                new_path = path + (key,)
+                child_check = check
+                if check:
+                    decision = selector.decide(new_path)
+                    if decision == SKIP:
+                        continue
+                    if not isinstance(value, dict):
+                        if decision == DESCEND and not isinstance(value, list):
+                            continue
+                        value = selector.prune(value, new_path, decision)
+                    child_check = decision != KEEP_ALL
                 new_prefix = f"{prefix}{sep}{key}" if prefix else key
-                new_path = path + [key]
-                sub_results = _flatten(value, new_prefix, new_path)
+                sub_results = _flatten(value, new_prefix, new_path, child_check)
                 if not results:
                     results = sub_results
                 else:
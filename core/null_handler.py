@@ -1,7 +1,7 @@
 import math
 from typing import Any
 
-def normalize_nulls(data, replace_null=False, null_value="Null"):
+def normalize_nulls(data, replace_null=False, null_value="Null", inplace=False):
     """
     Normalize null values and handle missing fields.
 
@@ -10,6 +10,9 @@ def normalize_nulls(data, replace_null=False, null_value="Null"):
         replace_null (bool): If True, replace None/null with `null_value`.
                              If False, keep None.
         null_value (any): Value to replace nulls with (e.g., "Null", float('nan')).
+        inplace (bool): If True, mutate and return the input containers instead
+                        of building new ones. Only use this when the caller owns
+                        `data` and no longer needs the original.
 
     Returns:
         any: Normalized data.
@@ -19,6 +22,17 @@ def normalize_nulls(data, replace_null=False, null_value="Null"):
         return null_value if replace_null else None
 
     if isinstance(data, list):
+        if inplace:
+            # Compact the list in place, keeping the surviving items in order
+            write = 0
+            for read in range(len(data)):
+                normalized = normalize_nulls(data[read], replace_null, null_value, True)
+                if normalized != {} and normalized != []:
+                    data[write] = normalized
+                    write += 1
+            del data[write:]
+            return data
+
         normalized_list = []
         for item in data:
             normalized = normalize_nulls(item, replace_null, null_value)
@@ -28,6 +42,15 @@ def normalize_nulls(data, replace_null=False, null_value="Null"):
         return normalized_list
 
     if isinstance(data, dict):
+        if inplace:
+            # Only values are reassigned, so iterating over the dict is safe
+            for k, v in data.items():
+                normalized = normalize_nulls(v, replace_null, null_value, True)
+                if normalized == {} or normalized == []:
+                    normalized = null_value if replace_null else None
+                data[k] = normalized
+            return data
+
         normalized_dict = {}
         for k, v in data.items():
             normalized = normalize_nulls(v, replace_null, null_value)
@@ -0,0 +1,162 @@
+import operator
+from typing import Any, Callable, Dict, List, Optional, Union
+
+_MISSING = object()
+
+_LOGICAL = ("$and", "$or", "$nor")
+
+_COMPARISONS = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+}
+
+def _resolve(document: Any, parts: List[str]) -> List[Any]:
+    """
+    Collect the values found at a dotted path, looking only at the keys on that path.
+
+    Arrays along the path are transparent: every element is followed, so
+    "genres.name" yields the name of each genre.
+    """
+    values = [document]
+    for part in parts:
+        next_values = []
+        for value in values:
+            if isinstance(value, dict):
+                if part in value:
+                    next_values.append(value[part])
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, dict) and part in item:
+                        next_values.append(item[part])
+        if not next_values:
+            return []
+        values = next_values
+    return values
+
+def _candidates(values: List[Any]) -> List[Any]:
+    """Values to test: the values themselves plus the elements of array values."""
+    candidates = []
+    for value in values:
+        candidates.append(value)
+        if isinstance(value, list):
+            candidates.extend(value)
+    return candidates
+
+def _compile_condition(path: str, condition: Any) -> Callable[[Any], bool]:
+    parts = path.split(".")
+    if not (isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition)):
+        condition = {"$eq": condition}
+
+    checks = []
+    for op, expected in condition.items():
+        if op in _COMPARISONS:
+            compare = _COMPARISONS[op]
+            if op == "$ne":
+                checks.append(lambda values, e=expected: all(v != e for v in _candidates(values)))
+            else:
+                checks.append(lambda values, e=expected, c=compare: any(_safe(c, v, e) for v in _candidates(values)))
+        elif op == "$in":
+            checks.append(lambda values, e=expected: any(_safe(operator.contains, e, v) for v in _candidates(values)))
+        elif op == "$nin":
+            checks.append(lambda values, e=expected: not any(_safe(operator.contains, e, v) for v in _candidates(values)))
+        elif op == "$exists":
+            checks.append(lambda values, e=expected: bool(values) == bool(e))
+        else:
+            raise ValueError(f"Unsupported operator in where clause: {op}")
+
+    def _check(document):
+        values = _resolve(document, parts)
+        return all(check(values) for check in checks)
+    return _check
+
+def _safe(compare: Callable[[Any, Any], bool], left: Any, right: Any) -> bool:
+    """Apply a comparison, treating incomparable types as a non-match."""
+    try:
+        return bool(compare(left, right))
+    except TypeError:
+        return False
+
+def _clauses(op: str, clauses: Any) -> List[Dict[str, Any]]:
+    """Validate the clauses of a logical operator."""
+    if not isinstance(clauses, list) or not clauses or not all(isinstance(c, dict) for c in clauses):
+        raise ValueError(f"{op} in where clause needs a non-empty list of conditions")
+    return clauses
+
+def predicate_paths(where: Dict[str, Any]) -> List[str]:
+    """
+    Dotted document paths a dict `where` clause looks at.
+
+    Logical operators (``$and``, ``$or``, ``$nor``) are expanded into the paths
+    of their clauses.
+    """
+    paths = []
+    for key, condition in where.items():
+        if key in _LOGICAL:
+            for clause in _clauses(key, condition):
+                paths.extend(predicate_paths(clause))
+        elif key.startswith("$"):
+            raise ValueError(f"Unsupported operator in where clause: {key}")
+        else:
+            paths.append(key)
+    return paths
+
+def _compile_clause(where: Dict[str, Any]) -> Callable[[Dict], bool]:
+    """Compile a dict of path conditions and logical operators, combined with AND."""
+    checks = []
+    for key, condition in where.items():
+        if key in _LOGICAL:
+            parts = [_compile_clause(clause) for clause in _clauses(key, condition)]
+            if key == "$and":
+                checks.append(lambda document, p=parts: all(check(document) for check in p))
+            elif key == "$or":
+                checks.append(lambda document, p=parts: any(check(document) for check in p))
+            else:
+                checks.append(lambda document, p=parts: not any(check(document) for check in p))
+        elif key.startswith("$"):
+            raise ValueError(f"Unsupported operator in where clause: {key}")
+        else:
+            checks.append(_compile_condition(key, condition))
+    if len(checks) == 1:
+        return checks[0]
+
+    def _predicate(document):
+        for check in checks:
+            if not check(document):
+                return False
+        return True
+    return _predicate
+
+def compile_predicate(where: Union[None, Callable[[Dict], bool], Dict[str, Any]]) -> Optional[Callable[[Dict], bool]]:
+    """
+    Compile a `where` clause into a predicate on raw documents.
+
+    Args:
+        where: Either a callable taking the raw document and returning a bool, or a
+               Mongo-style filter mapping dotted paths to a value (equality) or to
+               operators: ``$eq``, ``$ne``, ``$gt``, ``$gte``, ``$lt``, ``$lte``,
+               ``$in``, ``$nin``, ``$exists``. Conditions are combined with AND;
+               top-level ``$and``, ``$or`` and ``$nor`` take a list of such
+               filters. Any other top-level ``$`` key raises ValueError.
+               Only the referenced paths of the document are looked at; arrays
+               match if any element matches.
+
+    Returns:
+        A predicate, or None when `where` is None.
+
+    Example:
+        >>> released = compile_predicate({"status": "Released", "vote_count": {"$gt": 100}})
+        >>> released({"status": "Released", "vote_count": 2500})
+        True
+    """
+    if where is None:
+        return None
+    if callable(where):
+        return where
+    if not isinstance(where, dict):
+        raise TypeError("where must be a callable or a dict of path conditions")
+
+    return _compile_clause(where)
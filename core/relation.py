@@ -1,4 +1,11 @@
-def extract_child_table(parent, field, fk_name, remove_duplicates=False):
+def _without_field(parent, field, inplace):
+    """Return `parent` without `field`, deleting it in place if allowed."""
+    if inplace:
+        del parent[field]
+        return parent
+    return {k: v for k, v in parent.items() if k != field}
+
+def extract_child_table(parent, field, fk_name, remove_duplicates=False, inplace=False):
     """
     Extract child table from array of objects in parent.
 
@@ -7,6 +14,9 @@ def extract_child_table(parent, field, fk_name, remove_duplicates=False):
         field (str): The field name of the array of objects.
         fk_name (str): The name of the foreign key to add to child records.
         remove_duplicates (bool): Whether to remove duplicate child records.
+        inplace (bool): If True, remove the field from `parent` and add the
+                        foreign key to the child dicts directly instead of
+                        copying them.
 
     Returns:
         dict: {
@@ -25,7 +35,7 @@ def extract_child_table(parent, field, fk_name, remove_duplicates=False):
     child_records = parent[field]
     if not child_records:
         return {
-            "main": {k: v for k, v in parent.items() if k != field},
+            "main": _without_field(parent, field, inplace),
             "child": [],
             "child_table_name": f"{field}_table"
         }
@@ -37,7 +47,7 @@ def extract_child_table(parent, field, fk_name, remove_duplicates=False):
     processed_children = []
     for child in child_records:
         if isinstance(child, dict):
-            new_child = child.copy()
+            new_child = child if inplace else child.copy()
             new_child[fk_name] = parent_fk_value
             processed_children.append(new_child)
         else:
@@ -57,7 +67,7 @@ def extract_child_table(parent, field, fk_name, remove_duplicates=False):
         processed_children = unique_children
 
     # Remove field from parent
-    main = {k: v for k, v in parent.items() if k != field}
+    main = _without_field(parent, field, inplace)
 
     return {
         "main": main,
@@ -65,7 +75,7 @@ def extract_child_table(parent, field, fk_name, remove_duplicates=False):
         "child_table_name": f"{field}_table"
     }
 
-def extract_nested_relations(obj, fk_name="parent_id", remove_duplicates=False):
+def extract_nested_relations(obj, fk_name="parent_id", remove_duplicates=False, inplace=False):
     """
     Recursively extract nested relations from object.
 
@@ -73,6 +83,9 @@ def extract_nested_relations(obj, fk_name="parent_id", remove_duplicates=False):
         obj (dict): The object to process.
         fk_name (str): Foreign key name for relations.
         remove_duplicates (bool): Whether to remove duplicates.
+        inplace (bool): If True, strip the extracted arrays from `obj` and reuse
+                        the child dicts as relation rows instead of copying them.
+                        `obj` and its children are modified.
 
     Returns:
         dict: {
@@ -81,7 +94,7 @@ def extract_nested_relations(obj, fk_name="parent_id", remove_duplicates=False):
         }
     """
     relations = {}
-    main = obj.copy()
+    main = obj if inplace else obj.copy()
 
     def _extract(obj, prefix="", parent_fk=None):
         for key, value in list(obj.items()):
@@ -92,7 +105,7 @@ def extract_nested_relations(obj, fk_name="parent_id", remove_duplicates=False):
                     relations[table_name] = []
                 for i, child in enumerate(value):
                     child_fk = f"{parent_fk}_{i}" if parent_fk else f"{key}_{i}"
-                    new_child = child.copy()
+                    new_child = child if inplace else child.copy()
                     new_child[fk_name] = child_fk
                     # Recursively extract from child
                     _extract(new_child, f"{prefix}{key}_", child_fk)
@@ -119,7 +132,30 @@ def extract_nested_relations(obj, fk_name="parent_id", remove_duplicates=False):
         "relations": relations
     }
 
-def extract_junction_table(parent, field, fk_name, ref_name, remove_duplicates=False):
+def root_value(main_row):
+    """The key identifying a document by its main row: ``id``, or the first column."""
+    if "id" in main_row:
+        return main_row["id"]
+    return next(iter(main_row.values()), None)
+
+def stamp_root(main_rows, relations, root_fk):
+    """
+    Add the document key of `main_rows` to every relation row as `root_fk`.
+
+    Relation foreign keys are positional within a document ("genres_0"), so
+    rows of many documents can only be told apart with this column.
+
+    Args:
+        main_rows (list[dict]): The main rows of one document.
+        relations (dict): Table name -> rows of the same document; modified in place.
+        root_fk (str): Name of the added column.
+    """
+    root = root_value(main_rows[0]) if main_rows else None
+    for rows in relations.values():
+        for row in rows:
+            row[root_fk] = root
+
+def extract_junction_table(parent, field, fk_name, ref_name, remove_duplicates=False, inplace=False):
     """
     Extract junction table from array of references (N-N relationship).
 
@@ -129,6 +165,8 @@ def extract_junction_table(parent, field, fk_name, ref_name, remove_duplicates=F
         fk_name (str): The name of the foreign key for parent.
         ref_name (str): The name of the foreign key for references.
         remove_duplicates (bool): Whether to remove duplicate junction records.
+        inplace (bool): If True, remove the field from `parent` directly
+                        instead of building a new main dict.
 
     Returns:
         dict: {
@@ -147,7 +185,7 @@ def extract_junction_table(parent, field, fk_name, ref_name, remove_duplicates=F
     refs = parent[field]
     if not refs:
         return {
-            "main": {k: v for k, v in parent.items() if k != field},
+            "main": _without_field(parent, field, inplace),
             "junction": [],
             "junction_table_name": f"{field}_junction"
         }
@@ -177,7 +215,7 @@ def extract_junction_table(parent, field, fk_name, ref_name, remove_duplicates=F
         junction_records = unique_junction
 
     # Remove field from parent
-    main = {k: v for k, v in parent.items() if k != field}
+    main = _without_field(parent, field, inplace)
 
     return {
         "main": main,
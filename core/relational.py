@@ -0,0 +1,205 @@
+"""
+Relational results with lazily built hash indexes and lookup helpers.
+"""
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional
+
+from .denormalize import TABLE_SUFFIX, parent_key, table_parents
+from .relation import root_value
+
+try:
+    from ..utils.error_handler import SchemaValidationError
+except ImportError:
+    # Imported as top-level modules (core, utils, ...): their parent directory
+    # is already on sys.path, so absolute imports resolve
+    from utils.error_handler import SchemaValidationError
+
+MAIN_TABLE = "main"
+
+class RelationalResult(dict):
+    """
+    The ``{"main": ..., "relations": ...}`` result of ``output_format="relational"``.
+
+    Still a plain dict for existing code, plus lookups that don't scan tables:
+    hash indexes on primary and foreign keys, and on any column asked for, are
+    built on first use and kept. Rows are linked the way `extract_nested_relations`
+    links them: a relation row's `fk_name` value (``"genres_0"``) is its key
+    within its document, and `root_fk` (see ``normalize_json(..., root_fk=...)``)
+    tells the documents of a batch apart.
+
+    Indexes are not updated when rows change; call `clear_indexes()` after
+    modifying the tables.
+
+    Attributes:
+        fk_name (str): Foreign key column of the relation tables.
+        root_fk (str): Document key column of the relation rows, or None.
+
+    Example:
+        >>> result = normalize_batch(movies, root_fk="_root")
+        >>> movie = result["main"][0]
+        >>> result.children_of("production_companies_table", movie)
+        >>> result.join("main", "genres_table")
+    """
+
+    def __init__(self, main, relations, fk_name: str = "parent_id", root_fk: Optional[str] = None):
+        super().__init__(main=main, relations=relations)
+        self.fk_name = fk_name
+        self.root_fk = root_fk
+        self._indexes: Dict[tuple, Dict] = {}
+        self._parents: Optional[Dict[str, Optional[str]]] = None
+
+    def table(self, name: str):
+        """Rows of the main table (``"main"``) or of a relation table."""
+        if name == MAIN_TABLE:
+            return self["main"]
+        try:
+            return self["relations"][name]
+        except KeyError:
+            raise KeyError(f"No table '{name}' in the result") from None
+
+    def parent_table(self, name: str) -> Optional[str]:
+        """Name of the table `name` hangs off (``"main"`` for top-level relations, None for main)."""
+        if name == MAIN_TABLE:
+            return None
+        if self._parents is None:
+            self._parents = table_parents(self["relations"], self.fk_name)
+        self.table(name)
+        return self._parents.get(name) or MAIN_TABLE
+
+    def _index(self, key: tuple, table: str, key_func) -> Dict[Any, List[Mapping]]:
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = {}
+            for row in self.table(table):
+                value = key_func(row)
+                bucket = index.get(value)
+                if bucket is None:
+                    index[value] = [row]
+                else:
+                    bucket.append(row)
+        return index
+
+    def index(self, table: str, column: str) -> Dict[Any, List[Mapping]]:
+        """Hash index of `table` on `column`: value -> rows, in table order. Rows without the column are under None."""
+        return self._index(("column", table, column), table, lambda row: row.get(column))
+
+    def lookup(self, table: str, column: str, value: Any) -> List[Mapping]:
+        """Rows of `table` whose `column` equals `value`, through `index`."""
+        return self.index(table, column).get(value, [])
+
+    def _root(self, row: Mapping) -> Any:
+        return row.get(self.root_fk) if self.root_fk else None
+
+    def _primary_index(self, table: str) -> Dict[Any, List[Mapping]]:
+        """Main rows by document key, relation rows by (document key, own foreign key)."""
+        if table == MAIN_TABLE:
+            return self._index(("primary", table), table, root_value)
+        fk_name = self.fk_name
+        return self._index(("primary", table), table, lambda row: (self._root(row), row.get(fk_name)))
+
+    def _link_index(self, table: str) -> Dict[Any, List[Mapping]]:
+        """Relation rows by (document key, foreign key of their parent row)."""
+        fk_name = self.fk_name
+        return self._index(("link", table), table, lambda row: (self._root(row), parent_key(row.get(fk_name))))
+
+    def _single_document(self) -> None:
+        if self.root_fk is None and len(self["main"]) > 1:
+            raise SchemaValidationError("Linking the rows of several documents needs root_fk "
+                                        "(normalize with root_fk=...)")
+
+    def children_of(self, table: str, parent: Any) -> List[Mapping]:
+        """
+        Rows of `table` that belong to one parent row, in their original order.
+
+        Args:
+            table: The child relation table.
+            parent: The parent row (a main row for top-level tables, a row of the
+                    parent table otherwise), or for top-level tables the document key.
+        """
+        parent_table = self.parent_table(table)
+        if parent_table == MAIN_TABLE:
+            self._single_document()
+            if isinstance(parent, Mapping):
+                root = root_value(parent) if self.root_fk else None
+            else:
+                root = parent if self.root_fk else None
+            link = table[:-len(TABLE_SUFFIX)]
+        else:
+            if not isinstance(parent, Mapping):
+                raise TypeError(f"children_of('{table}', ...) needs a row of '{parent_table}'")
+            root, link = self._root(parent), parent.get(self.fk_name)
+        return self._link_index(table).get((root, link), [])
+
+    def parent_of(self, table: str, row: Mapping) -> Optional[Mapping]:
+        """The row `row` of `table` hangs off: a main row or a row of the parent table, or None."""
+        parent_table = self.parent_table(table)
+        if parent_table is None:
+            return None
+        root = self._root(row)
+        if parent_table == MAIN_TABLE:
+            self._single_document()
+            main = self["main"]
+            if self.root_fk is None:
+                return main[0] if main else None
+            matches = self._primary_index(MAIN_TABLE).get(root)
+        else:
+            matches = self._primary_index(parent_table).get((root, parent_key(row.get(self.fk_name))))
+        return matches[0] if matches else None
+
+    def join(self, left: str, right: str, on: Optional[str] = None, left_on: Optional[str] = None,
+             right_on: Optional[str] = None, how: str = "inner") -> List[Dict[str, Any]]:
+        """
+        Equi-join two tables through a hash index on the right table.
+
+        Without columns, a parent table and its child table are joined on their
+        FK link. Right columns whose name is already taken are prefixed with
+        ``"<right>."``.
+
+        Args:
+            left: Left table.
+            right: Right table.
+            on: Column of both tables to join on.
+            left_on: Column of the left table (with `right_on`).
+            right_on: Column of the right table.
+            how: "inner", or "left" to keep left rows without a match.
+
+        Returns:
+            list[dict]: One merged row per matching pair.
+        """
+        if how not in ("inner", "left"):
+            raise ValueError(f"Unsupported join: {how} please use 'inner' or 'left' instead.")
+        left_on = left_on or on
+        right_on = right_on or on
+        if left_on is None and right_on is None:
+            if self.parent_table(right) == left:
+                matches = lambda row: self.children_of(right, row)
+            elif self.parent_table(left) == right:
+                def matches(row):
+                    parent = self.parent_of(left, row)
+                    return [parent] if parent is not None else []
+            else:
+                raise SchemaValidationError(f"'{left}' and '{right}' are not linked; pass the join columns")
+        elif left_on is None or right_on is None:
+            raise ValueError("Pass both left_on and right_on, or on")
+        else:
+            index = self.index(right, right_on)
+            matches = lambda row: index.get(row.get(left_on), [])
+
+        joined = []
+        for row in self.table(left):
+            found = matches(row)
+            if not found:
+                if how == "left":
+                    joined.append(dict(row))
+                continue
+            for match in found:
+                merged = dict(row)
+                for key, value in match.items():
+                    merged[f"{right}.{key}" if key in merged else key] = value
+                joined.append(merged)
+        return joined
+
+    def clear_indexes(self) -> None:
+        """Drop the built indexes, e.g. after rows were added or changed."""
+        self._indexes.clear()
+        self._parents = None
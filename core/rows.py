@@ -0,0 +1,293 @@
+"""
+Compact row storage: one shared key schema per row shape, values stored as tuples.
+"""
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+class RowView(Mapping):
+    """
+    Read-only mapping view of one compact row.
+
+    Behaves like the row dict it replaces (``row["id"]``, ``row.get()``,
+    iteration, ``==`` with a dict) while holding only a reference to the
+    shared key index of its shape and a tuple of values. Dictionary-encoded
+    values are decoded on access. A view reflects the table when it was
+    created; don't keep views across appends to an encoded table.
+    """
+
+    __slots__ = ("_index", "_values", "_decoders")
+
+    def __init__(self, index: Dict[str, int], values: tuple, decoders: Optional[Dict[str, List[str]]] = None):
+        self._index = index
+        self._values = values
+        self._decoders = decoders
+
+    def __getitem__(self, key):
+        value = self._values[self._index[key]]
+        if self._decoders and value is not None:
+            categories = self._decoders.get(key)
+            if categories is not None:
+                return categories[value]
+        return value
+
+    def get(self, key, default=None):
+        if key not in self._index:
+            return default
+        return self[key]
+
+    def raw(self, key):
+        """The stored value of `key`: the category code for dictionary-encoded columns."""
+        return self._values[self._index[key]]
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def values(self):
+        if self._decoders:
+            return tuple(self[key] for key in self._index)
+        return self._values
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Copy the row into a regular dict."""
+        return dict(zip(self._index, self.values()))
+
+    def __repr__(self):
+        return f"RowView({self.to_dict()!r})"
+
+class CompactTable(Sequence):
+    """
+    A table of flat rows stored by shape.
+
+    Rows produced by the normalizer mostly share a handful of key sets. Instead
+    of one dict (keys + hash table) per row, every distinct key tuple is stored
+    once as a *shape*, and a row is a tuple of values plus the 4-byte id of its
+    shape. Indexing returns a `RowView`, so code written for lists of dicts keeps
+    working; `to_dicts()` converts back.
+
+    With ``encode=True`` string columns are dictionary-encoded as rows arrive:
+    each distinct string is stored once in ``categories[column]`` and rows hold
+    its integer code. A column falls back to plain values as soon as it holds a
+    non-string value, exceeds `max_categories` distinct strings, or has more than
+    `max_ratio` distinct strings per value after `min_values` values. The codes
+    are handed to pandas ``Categorical`` and Arrow dictionary arrays as they are.
+
+    Attributes:
+        shapes (list[tuple[str, ...]]): The distinct key tuples, in first-seen order.
+        categories (dict): Encoded column -> its strings, indexed by code.
+
+    Example:
+        >>> table = CompactTable(result["relations"]["genres_table"])
+        >>> table[0]["name"], len(table.shapes)
+        >>> pd.DataFrame(table.to_columns())
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]] = (), encode: bool = False,
+                 max_categories: int = 1000, max_ratio: float = 0.5, min_values: int = 100):
+        self.shapes: List[Tuple[str, ...]] = []
+        self._shape_ids: Dict[Tuple[str, ...], int] = {}
+        self._indexes: List[Dict[str, int]] = []
+        self._row_shapes = array("I")
+        self._rows: List[tuple] = []
+        self.encode = encode
+        self.max_categories = max_categories
+        self.max_ratio = max_ratio
+        self.min_values = min_values
+        self.categories: Dict[str, List[str]] = {}
+        self._codes: Dict[str, Dict[str, int]] = {}
+        self._counts: Dict[str, int] = {}
+        self._plain = set()
+        self.extend(rows)
+
+    def _shape_id(self, keys: Tuple[str, ...]) -> int:
+        shape_id = self._shape_ids.get(keys)
+        if shape_id is None:
+            shape_id = len(self.shapes)
+            self._shape_ids[keys] = shape_id
+            self.shapes.append(keys)
+            self._indexes.append({key: position for position, key in enumerate(keys)})
+        return shape_id
+
+    def _encode(self, keys: Tuple[str, ...], values: Iterable[Any]) -> tuple:
+        """Replace the strings of encoded columns by their codes."""
+        plain = self._plain
+        encoded = []
+        for key, value in zip(keys, values):
+            if value is None or key in plain:
+                encoded.append(value)
+                continue
+            if type(value) is not str:
+                self._decode_column(key)
+                encoded.append(value)
+                continue
+            codes = self._codes.get(key)
+            if codes is None:
+                codes = self._codes[key] = {}
+                self.categories[key] = []
+                self._counts[key] = 0
+            code = codes.get(value)
+            count = self._counts[key] = self._counts[key] + 1
+            distinct = len(codes) + (code is None)
+            if distinct > self.max_categories or (count >= self.min_values
+                                                  and distinct > self.max_ratio * count):
+                # High cardinality: storing codes would not save anything
+                self._decode_column(key)
+                encoded.append(value)
+                continue
+            if code is None:
+                code = codes[value] = len(codes)
+                self.categories[key].append(value)
+            encoded.append(code)
+        return tuple(encoded)
+
+    def _decode_column(self, key: str) -> None:
+        """Stop encoding `key` and put the plain strings back into the stored rows."""
+        self._plain.add(key)
+        categories = self.categories.pop(key, None)
+        self._codes.pop(key, None)
+        self._counts.pop(key, None)
+        if not categories:
+            return
+        positions = {shape_id: keys.index(key) for shape_id, keys in enumerate(self.shapes) if key in keys}
+        rows = self._rows
+        for row_number, shape_id in enumerate(self._row_shapes):
+            position = positions.get(shape_id)
+            if position is not None and rows[row_number][position] is not None:
+                values = list(rows[row_number])
+                values[position] = categories[values[position]]
+                rows[row_number] = tuple(values)
+
+    def append(self, row: Dict[str, Any]) -> None:
+        """Add one row (a dict or any mapping)."""
+        keys = tuple(row)
+        values = self._encode(keys, row.values()) if self.encode else tuple(row.values())
+        self._row_shapes.append(self._shape_id(keys))
+        self._rows.append(values)
+
+    def extend(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Add rows; another CompactTable is merged shape by shape without building dicts."""
+        if isinstance(rows, CompactTable) and not (self.encode or rows.categories):
+            remap = [self._shape_id(keys) for keys in rows.shapes]
+            self._row_shapes.extend(remap[shape_id] for shape_id in rows._row_shapes)
+            self._rows.extend(rows._rows)
+            return
+        shape_id = self._shape_id
+        append_shape = self._row_shapes.append
+        append_row = self._rows.append
+        encode = self._encode if self.encode else None
+        last_keys = None
+        last_id = 0
+        for row in rows:
+            keys = tuple(row)
+            # Encode first: it may rewrite the rows already stored
+            values = encode(keys, row.values()) if encode else tuple(row.values())
+            # Consecutive rows usually share a shape; skip the lookup then
+            if keys != last_keys:
+                last_keys, last_id = keys, shape_id(keys)
+            append_shape(last_id)
+            append_row(values)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+        return RowView(self._indexes[self._row_shapes[item]], self._rows[item], self.categories)
+
+    def __iter__(self) -> Iterator[RowView]:
+        indexes = self._indexes
+        categories = self.categories
+        for shape_id, values in zip(self._row_shapes, self._rows):
+            yield RowView(indexes[shape_id], values, categories)
+
+    def __eq__(self, other):
+        if isinstance(other, (CompactTable, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"CompactTable({len(self)} rows, {len(self.shapes)} shapes)"
+
+    def memory_usage(self) -> int:
+        """Approximate bytes held by the table, counted like `utils.profiling.retained_size`."""
+        getsizeof = sys.getsizeof
+        total = getsizeof(self._rows) + getsizeof(self._row_shapes)
+        for values in self._rows:
+            total += getsizeof(values)
+            for value in values:
+                total += getsizeof(value)
+        for keys, index in zip(self.shapes, self._indexes):
+            total += getsizeof(keys) + getsizeof(index)
+        for column, categories in self.categories.items():
+            total += getsizeof(categories) + getsizeof(self._codes[column])
+            total += sum(getsizeof(value) for value in categories)
+        return total
+
+    def columns(self) -> List[str]:
+        """All keys, in first-seen order."""
+        seen = {}
+        for keys in self.shapes:
+            for key in keys:
+                seen.setdefault(key, None)
+        return list(seen)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Convert to a list of regular dicts."""
+        if self.categories:
+            return [row.to_dict() for row in self]
+        shapes = self.shapes
+        return [dict(zip(shapes[shape_id], values)) for shape_id, values in zip(self._row_shapes, self._rows)]
+
+    def to_columns(self, missing: Any = None, decode: bool = True) -> Dict[str, List[Any]]:
+        """
+        Convert to column lists, e.g. for ``pd.DataFrame``. No per-row dict is created.
+
+        Args:
+            missing: Value for keys a row does not have.
+            decode: If False, dictionary-encoded columns hold codes (see `categories`).
+        """
+        columns = self.columns()
+        count = len(self)
+        result = {column: [missing] * count for column in columns}
+        # Position lists per shape: column lists to write into for each value
+        targets = [[result[key] for key in keys] for keys in self.shapes]
+        for row_number, (shape_id, values) in enumerate(zip(self._row_shapes, self._rows)):
+            for column, value in zip(targets[shape_id], values):
+                column[row_number] = value
+        if decode:
+            for column, categories in self.categories.items():
+                result[column] = [categories[v] if type(v) is int else v for v in result[column]]
+        return result
+
+def encoded_column(rows: Iterable[Any], column: str) -> Optional[Tuple[List[Optional[int]], List[str]]]:
+    """
+    Return the category codes of `column` if every row is a `RowView` sharing one dictionary for it.
+
+    Returns:
+        ``(codes, categories)`` with None codes for nulls and missing keys, or None
+        if the column is not uniformly dictionary-encoded across `rows`.
+    """
+    categories = None
+    codes = []
+    for row in rows:
+        decoders = row._decoders if isinstance(row, RowView) else None
+        current = decoders.get(column) if decoders else None
+        if current is None or (categories is not None and current is not categories):
+            return None
+        categories = current
+        codes.append(row.raw(column) if column in row._index else None)
+    if categories is None:
+        return None
+    return codes, categories
+
+def compact_rows(rows: Iterable[Dict[str, Any]]) -> CompactTable:
+    """Store rows in a `CompactTable` (returned unchanged if it already is one)."""
+    return rows if isinstance(rows, CompactTable) else CompactTable(rows)
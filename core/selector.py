@@ -0,0 +1,190 @@
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable, List, Optional, Tuple
+
+# Decisions for a document path
+SKIP = 0       # Path is not selected; its subtree is never visited
+DESCEND = 1    # Some descendants are selected; only containers are walked into
+INCLUDE = 2    # Path is selected, but excluded descendants must still be pruned
+KEEP_ALL = 3   # Path and its whole subtree are selected
+
+_MAX_CACHED_PATHS = 100000
+
+def _match(pattern: Tuple[str, ...], path: Tuple[str, ...], i: int = 0, j: int = 0) -> Tuple[bool, bool]:
+    """
+    Match a path against a pattern.
+
+    Returns:
+        (full, prefix): whether the pattern matches the path itself, and whether
+        it could match a descendant of the path.
+    """
+    if j == len(path):
+        rest = pattern[i:]
+        return all(seg == "**" for seg in rest), bool(rest)
+    if i == len(pattern):
+        return False, False
+    seg = pattern[i]
+    if seg == "**":
+        # "**" matches zero or more segments
+        full_skip, prefix_skip = _match(pattern, path, i + 1, j)
+        full_eat, prefix_eat = _match(pattern, path, i, j + 1)
+        return full_skip or full_eat, prefix_skip or prefix_eat
+    if seg == path[j] or fnmatchcase(path[j], seg):
+        return _match(pattern, path, i + 1, j + 1)
+    return False, False
+
+class PathSelector:
+    """
+    Compiled include/exclude selectors over dotted document paths.
+
+    Paths name keys of the raw document joined by "." (arrays are transparent,
+    so "genres.name" addresses the "name" field of every genre). A segment may
+    use shell-style wildcards ("video*", "*"), and "**" matches any number of
+    segments. A selected path keeps its whole subtree; excluded paths win over
+    included ones.
+
+    Decisions are cached per path, so documents of the same shape only pay
+    for the pattern matching once.
+
+    Args:
+        include: Patterns to keep. None keeps everything.
+        exclude: Patterns to drop.
+
+    Example:
+        >>> selector = PathSelector(include=["id", "title", "genres", "videos.results.key"],
+        ...                         exclude=["**.iso_*"])
+    """
+
+    def __init__(self, include: Optional[Iterable[str]] = None, exclude: Optional[Iterable[str]] = None):
+        self.include = None if include is None else [tuple(p.split(".")) for p in include]
+        self.exclude = [tuple(p.split(".")) for p in exclude or ()]
+        self._cache = {}
+
+    def decide(self, path: Tuple[str, ...]) -> int:
+        """Return SKIP, DESCEND, INCLUDE or KEEP_ALL for a document path."""
+        decision = self._cache.get(path)
+        if decision is None:
+            decision = self._decide(path)
+            if len(self._cache) >= _MAX_CACHED_PATHS:
+                self._cache.clear()
+            self._cache[path] = decision
+        return decision
+
+    def _decide(self, path: Tuple[str, ...]) -> int:
+        below_exclude = False
+        for pattern in self.exclude:
+            full, prefix = _match(pattern, path)
+            if full:
+                return SKIP
+            below_exclude = below_exclude or prefix
+
+        if self.include is None:
+            return INCLUDE if below_exclude else KEEP_ALL
+
+        partial = False
+        for pattern in self.include:
+            full, prefix = _match(pattern, path)
+            # A selected path keeps its whole subtree
+            full = full or any(_match(pattern, path[:k])[0] for k in range(1, len(path)))
+            if full:
+                return INCLUDE if below_exclude else KEEP_ALL
+            partial = partial or prefix
+        return DESCEND if partial else SKIP
+
+    def prune(self, value, path: Tuple[str, ...], decision: int):
+        """
+        Return `value` restricted to the selected paths below `path`.
+
+        Args:
+            value: The value found at `path`.
+            path: Its document path.
+            decision: The decision for `path` (not SKIP).
+
+        Returns:
+            The value itself when nothing below it is dropped, otherwise a
+            pruned copy of its containers.
+        """
+        if decision == KEEP_ALL:
+            return value
+        # Containers are copied from their first change on: patterns such as
+        # "**.iso_*" make every path INCLUDE, yet most subtrees lose nothing
+        if isinstance(value, list):
+            pruned = None
+            for index, item in enumerate(value):
+                if isinstance(item, (dict, list)):
+                    kept, new = True, self.prune(item, path, decision)
+                else:
+                    kept, new = decision != DESCEND, item
+                if pruned is None:
+                    if kept and new is item:
+                        continue
+                    pruned = value[:index]
+                if kept:
+                    pruned.append(new)
+            return value if pruned is None else pruned
+        if isinstance(value, dict):
+            pruned = None
+            for index, (key, item) in enumerate(value.items()):
+                child_path = path + (key,)
+                child_decision = self.decide(child_path)
+                kept = child_decision != SKIP and not (
+                    child_decision == DESCEND and not isinstance(item, (dict, list)))
+                new = self.prune(item, child_path, child_decision) if kept else None
+                if pruned is None:
+                    if kept and new is item:
+                        continue
+                    pruned = dict(islice(value.items(), index))
+                if kept:
+                    pruned[key] = new
+            return value if pruned is None else pruned
+        return value
+
+    def projection_paths(self) -> Optional[List[str]]:
+        """
+        Dotted paths a source can fetch to cover the include patterns.
+
+        Each pattern is cut at its first wildcard segment. Returns None when
+        everything is included.
+        """
+        if self.include is None:
+            return None
+        paths = []
+        for pattern in self.include:
+            fixed = []
+            for seg in pattern:
+                if any(ch in seg for ch in "*?["):
+                    break
+                fixed.append(seg)
+            if not fixed:
+                return None
+            paths.append(".".join(fixed))
+        return paths
+
+@lru_cache(maxsize=64)
+def _compile(include: Optional[Tuple[str, ...]], exclude: Tuple[str, ...]) -> PathSelector:
+    return PathSelector(include, exclude)
+
+def compile_selector(include: Optional[Iterable[str]] = None,
+                     exclude: Optional[Iterable[str]] = None) -> Optional[PathSelector]:
+    """
+    Compile include/exclude patterns into a `PathSelector`, reusing earlier compilations.
+
+    Args:
+        include: Patterns to keep, or None for everything.
+        exclude: Patterns to drop.
+
+    Returns:
+        PathSelector, or None when there is nothing to select. A `PathSelector`
+        passed as `include` is returned as is, or with `exclude` added to its
+        own exclude patterns.
+    """
+    if isinstance(include, PathSelector):
+        if not exclude:
+            return include
+        selector = include
+        include = None if selector.include is None else [".".join(p) for p in selector.include]
+        exclude = [".".join(p) for p in selector.exclude] + list(exclude)
+    if include is None and not exclude:
+        return None
+    return _compile(None if include is None else tuple(include), tuple(exclude or ()))
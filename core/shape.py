@@ -0,0 +1,223 @@
+"""
+Structural shape fingerprints and per-shape specializations of the normalization pipeline.
+"""
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from .null_handler import normalize_nulls
+from .relation import extract_nested_relations
+from .type_cast import cast_value
+
+try:
+    from ..utils.naming import normalize_key
+except ImportError:
+    # Imported as top-level modules (core, utils, ...): their parent directory
+    # is already on sys.path, so absolute imports resolve
+    from utils.naming import normalize_key
+
+# Leaf kinds of a fingerprint
+SCALAR = 0
+ARRAY = 1     # empty array or array of primitives
+OBJECTS = 2   # array whose first item is an object: a relation
+
+def shape_fingerprint(document: Dict[str, Any]) -> Tuple:
+    """
+    Structural fingerprint of a document: its keys, in order, and how each value nests.
+
+    Nested objects contribute their own fingerprint; any other value only its
+    kind (scalar, array, array of objects). Values and the content of arrays
+    are never looked at, so the fingerprint costs one pass over the keys.
+
+    Returns:
+        tuple: Hashable ``((key, kind_or_nested_fingerprint), ...)``.
+    """
+    parts = []
+    for key, value in document.items():
+        if isinstance(value, dict):
+            parts.append((key, shape_fingerprint(value)))
+        elif isinstance(value, list):
+            parts.append((key, OBJECTS if value and isinstance(value[0], dict) else ARRAY))
+        else:
+            parts.append((key, SCALAR))
+    return tuple(parts)
+
+def _leaves(fingerprint: Tuple, path: Tuple = ()):
+    """Yield ``(path, kind)`` for every leaf, in the order `flatten_dict` emits them."""
+    for key, kind in fingerprint:
+        if isinstance(kind, tuple):
+            yield from _leaves(kind, path + (key,))
+        else:
+            yield path + (key,), kind
+
+def _value(document: Dict[str, Any], path: Tuple) -> Any:
+    for key in path:
+        document = document[key]
+    return document
+
+class ShapePlan:
+    """
+    Normalization specialized for one document shape.
+
+    Everything that depends only on the structure is worked out once: the
+    flattened column order, the renamed key of every column and which arrays
+    are routed to relation tables. Documents of the shape are then read column
+    by column without flattening them.
+
+    Attributes:
+        fingerprint (tuple): The shape, see `shape_fingerprint`.
+        columns (list[str]): Main table columns, renamed, in output order.
+        relation_keys (list[str]): Flattened keys of the arrays extracted as relations.
+    """
+
+    def __init__(self, fingerprint: Tuple, paths: List[Tuple], columns: List[str], kinds: List[int],
+                 relation_paths: List[Tuple], relation_keys: List[str]):
+        self.fingerprint = fingerprint
+        self.paths = paths
+        self.columns = columns
+        self.kinds = kinds
+        self.relation_paths = relation_paths
+        self.relation_keys = relation_keys
+
+    @classmethod
+    def build(cls, fingerprint: Tuple, sep: str = ".", key_convention: str = "snake",
+              extract_relations: bool = True) -> Optional["ShapePlan"]:
+        """
+        Compile a plan, or return None if the shape needs the generic pipeline.
+
+        That is the case when two paths flatten to the same key (e.g. ``"a.b"``
+        and ``{"a": {"b": ...}}``), where the result depends on value order.
+        """
+        paths, columns, kinds, relation_paths, relation_keys = [], [], [], [], []
+        flat_keys = set()
+        for path, kind in _leaves(fingerprint):
+            flat_key = sep.join(path)
+            if flat_key in flat_keys:
+                return None
+            flat_keys.add(flat_key)
+            if kind == OBJECTS and extract_relations:
+                relation_paths.append(path)
+                relation_keys.append(flat_key)
+            else:
+                paths.append(path)
+                columns.append(normalize_key(flat_key, key_convention) if key_convention != "keep" else flat_key)
+                kinds.append(kind)
+        return cls(fingerprint, paths, columns, kinds, relation_paths, relation_keys)
+
+    def column_values(self, documents: Sequence[Dict[str, Any]]) -> List[List[Any]]:
+        """Read every main column of `documents`, one list per column."""
+        columns = []
+        for path in self.paths:
+            if len(path) == 1:
+                key = path[0]
+                columns.append([document[key] for document in documents])
+            else:
+                columns.append([_value(document, path) for document in documents])
+        return columns
+
+    def main_rows(self, documents: Sequence[Dict[str, Any]], null_value: Any = "", schema: Optional[Dict] = None,
+                  inplace: bool = False) -> List[Dict[str, Any]]:
+        """
+        Build the main rows of `documents` column-wise: nulls, then type casts, then one dict per row.
+
+        Equivalent to flattening, ``normalize_nulls``, ``normalize_keys`` and
+        ``apply_type_casting`` row by row. A shape without main columns has no
+        main rows, as in the generic pipeline.
+        """
+        replace_null = null_value != ""
+        missing = null_value if replace_null else None
+        columns = self.column_values(documents)
+        for position, (kind, values) in enumerate(zip(self.kinds, columns)):
+            if kind == SCALAR:
+                if replace_null:
+                    columns[position] = [null_value if value is None else value for value in values]
+            else:
+                normalized = []
+                for value in values:
+                    value = normalize_nulls(value, replace_null, null_value, inplace)
+                    normalized.append(missing if value == [] or value == {} else value)
+                columns[position] = normalized
+        if schema:
+            for position, column in enumerate(self.columns):
+                target_type = schema.get(column)
+                if target_type is not None:
+                    columns[position] = [cast_value(value, target_type) for value in columns[position]]
+        keys = self.columns
+        return [dict(zip(keys, values)) for values in zip(*columns)]
+
+    def relations(self, document: Dict[str, Any], fk_name: str = "parent_id", remove_duplicates: bool = False,
+                  inplace: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+        """Extract the relation tables of one document of this shape."""
+        if not self.relation_paths:
+            return {}
+        arrays = {key: _value(document, path) for key, path in zip(self.relation_keys, self.relation_paths)}
+        result = extract_nested_relations(arrays, fk_name=fk_name, remove_duplicates=remove_duplicates,
+                                          inplace=inplace)
+        return result["relations"]
+
+    def __repr__(self):
+        return f"ShapePlan({len(self.columns)} columns, {len(self.relation_keys)} relations)"
+
+class ShapeCache:
+    """
+    Compiled `ShapePlan`s by document fingerprint.
+
+    Pass one to ``normalize_batch(..., shapes=cache)`` (or ``normalize_stream``)
+    to group same-shaped documents and normalize each group column-wise through
+    its plan. Plans are kept across batches; a collection with more distinct
+    shapes than `max_shapes` is normalized generically beyond that.
+
+    Attributes:
+        hits (int): Documents that found a compiled plan.
+        misses (int): Documents whose shape was compiled on first sight.
+        unplanned (int): Documents left to the generic pipeline.
+
+    Example:
+        >>> shapes = ShapeCache()
+        >>> for chunk in normalize_stream(documents, chunk_size=5000, shapes=shapes):
+        ...     sink.write(chunk)
+        >>> shapes.stats()
+    """
+
+    def __init__(self, max_shapes: int = 1000):
+        self.max_shapes = max_shapes
+        self._plans: Dict[Hashable, Optional[ShapePlan]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.unplanned = 0
+
+    def plan(self, document: Any, sep: str = ".", key_convention: str = "snake",
+             extract_relations: bool = True) -> Optional[ShapePlan]:
+        """Return the plan for the shape of `document`, compiling it on first sight, or None."""
+        if not isinstance(document, dict):
+            self.unplanned += 1
+            return None
+        key = (shape_fingerprint(document), sep, key_convention, extract_relations)
+        if key in self._plans:
+            plan = self._plans[key]
+            if plan is not None:
+                self.hits += 1
+        elif len(self._plans) < self.max_shapes:
+            self.misses += 1
+            plan = self._plans[key] = ShapePlan.build(key[0], sep, key_convention, extract_relations)
+        else:
+            plan = None
+        if plan is None:
+            self.unplanned += 1
+        return plan
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def stats(self) -> Dict[str, int]:
+        """Number of shapes and of documents with and without a plan."""
+        return {
+            'shapes': len(self._plans),
+            'hits': self.hits,
+            'misses': self.misses,
+            'unplanned': self.unplanned,
+        }
+
+    @staticmethod
+    def supports(options: Dict[str, Any]) -> bool:
+        """Whether the `normalize_json` options can be served by shape plans."""
+        return not any(options.get(name) for name in ("explode_arrays", "flatten_nested", "include",
+                                                       "exclude", "cache"))
@@ -0,0 +1,246 @@
+"""
+Memory-budgeted table buffers that spill their rows to temporary files.
+"""
+import os
+import pickle
+import re
+import sys
+import tempfile
+import weakref
+from array import array
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Every row of a buffer is measured until this many were, then only the first
+# row of each extend; the average estimates the buffer's size
+_SAMPLE_ROWS = 32
+
+def row_size(row: Dict[str, Any]) -> int:
+    """Approximate bytes held by one row dict, counted like `utils.profiling.retained_size`."""
+    getsizeof = sys.getsizeof
+    return getsizeof(row) + sum(getsizeof(value) for value in row.values())
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class SpillTable:
+    """
+    Row buffer of one table that moves its rows to a temporary file when over budget.
+
+    Rows are appended like to a list. `spill` writes the buffered rows to the
+    table's spill file as one pickled frame (every key tuple stored once, rows
+    as value tuples) and frees them. Reading streams the frames back one at a
+    time, then the rows still in memory, so a spilled table is never loaded
+    whole again: iterate it, or use `chunks` or `dataframes`. The file is
+    deleted with the table or by `close`.
+
+    Attributes:
+        name (str): Table name.
+        spilled_rows (int): Rows moved to disk.
+        frames (int): Frames written to the spill file.
+        path (str): The spill file, or None while nothing was spilled.
+    """
+
+    def __init__(self, name: str, budget: Optional["MemoryBudget"] = None, directory: Optional[str] = None):
+        self.name = name
+        self.budget = budget
+        self.directory = directory
+        self.path: Optional[str] = None
+        self.spilled_rows = 0
+        self.frames = 0
+        self._rows: List[Dict[str, Any]] = []
+        self._sampled = 0
+        self._sampled_bytes = 0
+        self._finalizer = None
+
+    def _sample(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows[:max(1, _SAMPLE_ROWS - self._sampled)]:
+            self._sampled += 1
+            self._sampled_bytes += row_size(row)
+
+    def append(self, row: Dict[str, Any]) -> None:
+        """Add one row."""
+        self.extend((row,))
+
+    def extend(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Add rows, spilling tables of the budget if it is exceeded."""
+        buffered = self._rows
+        start = len(buffered)
+        buffered.extend(rows)
+        if len(buffered) > start:
+            self._sample(buffered[start:start + _SAMPLE_ROWS])
+            if self.budget is not None:
+                self.budget.check()
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated bytes of the rows held in memory."""
+        if not self._sampled:
+            return 0
+        return len(self._rows) * self._sampled_bytes // self._sampled
+
+    @property
+    def spilled(self) -> bool:
+        return self.frames > 0
+
+    def spill(self) -> int:
+        """Move the buffered rows to the spill file; returns the number of rows moved."""
+        rows = self._rows
+        if not rows:
+            return 0
+        if self.path is None:
+            prefix = re.sub(r"[^\w.-]", "_", self.name) + "-"
+            fd, self.path = tempfile.mkstemp(prefix=prefix, suffix=".spill", dir=self.directory)
+            os.close(fd)
+            self._finalizer = weakref.finalize(self, _remove, self.path)
+        shape_ids: Dict[tuple, int] = {}
+        row_shapes = array("I")
+        values = []
+        for row in rows:
+            keys = tuple(row)
+            shape_id = shape_ids.get(keys)
+            if shape_id is None:
+                shape_id = shape_ids[keys] = len(shape_ids)
+            row_shapes.append(shape_id)
+            values.append(tuple(row.values()))
+        with open(self.path, "ab") as f:
+            pickle.dump((list(shape_ids), row_shapes, values), f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.spilled_rows += len(rows)
+        self.frames += 1
+        self._rows = []
+        return len(rows)
+
+    def _read_frames(self) -> Iterator[List[Dict[str, Any]]]:
+        if not self.frames:
+            return
+        with open(self.path, "rb") as f:
+            for _ in range(self.frames):
+                shapes, row_shapes, values = pickle.load(f)
+                yield [dict(zip(shapes[shape_id], row)) for shape_id, row in zip(row_shapes, values)]
+
+    def chunks(self, size: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield the rows as lists: one per spilled frame, then the rows in memory.
+
+        Args:
+            size: Re-chunk into lists of this many rows instead.
+        """
+        chunks = self._read_frames()
+        if size is None:
+            yield from chunks
+            if self._rows:
+                yield self._rows
+            return
+        rows = iter(self)
+        while True:
+            chunk = list(islice(rows, size))
+            if not chunk:
+                return
+            yield chunk
+
+    def dataframes(self, size: Optional[int] = None) -> Iterator[Any]:
+        """Yield the table as pandas DataFrames, one per chunk (see `chunks`)."""
+        import pandas as pd
+        for chunk in self.chunks(size):
+            yield pd.DataFrame(chunk)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for chunk in self._read_frames():
+            yield from chunk
+        yield from self._rows
+
+    def __len__(self) -> int:
+        return self.spilled_rows + len(self._rows)
+
+    def __getitem__(self, item):
+        """Row by position; rows on disk are found by reading the frames up to them."""
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError("SpillTable index out of range")
+        if item >= self.spilled_rows:
+            return self._rows[item - self.spilled_rows]
+        for chunk in self._read_frames():
+            if item < len(chunk):
+                return chunk[item]
+            item -= len(chunk)
+
+    def __eq__(self, other):
+        if isinstance(other, (SpillTable, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Load all rows into a list."""
+        return list(self)
+
+    def close(self) -> None:
+        """Delete the spill file and drop all rows."""
+        if self._finalizer is not None:
+            self._finalizer()
+        self.path = None
+        self.frames = self.spilled_rows = 0
+        self._rows = []
+
+    def __repr__(self):
+        return f"SpillTable({self.name!r}, {len(self)} rows, {self.spilled_rows} spilled)"
+
+class MemoryBudget:
+    """
+    Memory limit shared by the table buffers of a batch.
+
+    Pass one (or a number of bytes) as ``normalize_batch(..., memory_budget=...)``.
+    Every table is buffered in a `SpillTable`; when the buffers together exceed
+    `limit_bytes`, each table holding more than its share (the limit divided by
+    the number of tables) spills to disk, largest first. Huge child tables such as
+    cast and crew then go to disk while the main table stays in memory.
+
+    Sizes are estimated from sampled rows, like ``MemoryProfiler``'s retained
+    sizes: the budget bounds the buffered rows, not the whole process.
+
+    Args:
+        limit_bytes: Bytes the buffered rows of all tables may take.
+        directory: Directory of the spill files (default: the system temp directory).
+        metrics (NormalizeMetrics): Optional; counts ``spilled_rows`` and ``spill_frames``.
+
+    Example:
+        >>> result = normalize_batch(movies, memory_budget=256 << 20)
+        >>> for frame in result["relations"]["credits.cast_table"].dataframes():
+        ...     load(frame)
+    """
+
+    def __init__(self, limit_bytes: int, directory: Optional[str] = None, metrics=None):
+        if limit_bytes <= 0:
+            raise ValueError("limit_bytes must be positive")
+        self.limit_bytes = limit_bytes
+        self.directory = directory
+        self.metrics = metrics
+        self.tables: Dict[str, SpillTable] = {}
+
+    def table(self, name: str) -> SpillTable:
+        """A new buffer for table `name`, replacing a previous batch's buffer of that name."""
+        table = self.tables[name] = SpillTable(name, self, self.directory)
+        return table
+
+    @property
+    def used(self) -> int:
+        """Estimated bytes buffered in memory by all tables."""
+        return sum(table.nbytes for table in self.tables.values())
+
+    def check(self) -> None:
+        """Spill the tables over their share if the budget is exceeded."""
+        if self.used <= self.limit_bytes:
+            return
+        share = self.limit_bytes / len(self.tables)
+        for table in sorted(self.tables.values(), key=lambda table: table.nbytes, reverse=True):
+            if table.nbytes <= share:
+                break
+            moved = table.spill()
+            if self.metrics is not None:
+                self.metrics.count("spilled_rows", moved)
+                self.metrics.count("spill_frames")
@@ -1,144 +1,609 @@
+import mmap
+import os
+from functools import partial
+
 from .flattener import flatten_dict
 from .null_handler import normalize_nulls
 from .type_cast import apply_type_casting
+from .selector import PathSelector, compile_selector
+from .predicate import compile_predicate
+from .rows import CompactTable
+from .spill import MemoryBudget, SpillTable
+from .shape import ShapeCache
+from .relation import stamp_root
+from .relational import RelationalResult
 
 try:
     from ..utils.naming import normalize_keys
 except ImportError:
-    # Fallback if relative import fails
-    import sys
-    import os
-    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    # Imported as top-level modules (core, utils, ...): their parent directory
+    # is already on sys.path, so absolute imports resolve
     from utils.naming import normalize_keys
 
 try:
     from ..utils.config import get_config
     from ..utils.error_handler import log_processing_step, handle_error
+    from ..utils.decoding import decode_json, is_raw_source, raw_size
+    from ..utils.metrics import stage_timer
+    from ..utils.profiling import MemoryProfiler
     from ..core.dedup import deduplicate_records
 except ImportError:
-    # Fallback
-    import sys
-    import os
-    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    # Imported as top-level modules (core, utils, ...): their parent directory
+    # is already on sys.path, so absolute imports resolve
     from utils.config import get_config
     from utils.error_handler import log_processing_step, handle_error
+    from utils.decoding import decode_json, is_raw_source, raw_size
+    from utils.metrics import stage_timer
+    from utils.profiling import MemoryProfiler
     from core.dedup import deduplicate_records
 
-try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
+def _import_pandas():
+    """Import pandas on first DataFrame output; other formats never load it."""
+    try:
+        import pandas
+    except ImportError:
+        return None
+    return pandas
+
+_STR_INPUT = ("A str is neither decoded as JSON text nor opened as a file path: pass raw JSON as bytes "
+              "(text.encode()) and files as pathlib.Path")
 
 def normalize_json(obj, sep=".", explode_arrays=False, flatten_nested=False,
                   schema=None, key_convention='snake', output_format="dataframe",
-                  config=None, extract_relations=True, fk_name="parent_id", null_value=""):
+                  config=None, extract_relations=True, fk_name="parent_id", null_value="",
+                  inplace=False, include=None, exclude=None, where=None, metrics=None,
+                  profile_memory=False, compact=False, dictionary_encode=False, cache=None,
+                  raise_errors=False, root_fk=None, data_profile=None, memory_budget=None):
     """
     Normalize a JSON object with comprehensive options and error handling.
 
     Args:
-        obj (dict): The JSON object to normalize.
+        obj (dict | bytes | memoryview | mmap | os.PathLike): The JSON object to
+                        normalize, or raw JSON to decode first: a buffer, an mmap, or a
+                        file path as ``os.PathLike`` (e.g. ``pathlib.Path``). A plain
+                        str is rejected with a TypeError, never opened as a path.
+                        Raw input is decoded with the fastest available decoder and
+                        normalized in place; a JSON array is normalized as a batch.
         sep (str): Separator for flattened keys.
         explode_arrays (bool): Whether to explode primitive arrays.
         flatten_nested (bool): Whether to flatten nested arrays.
         schema (dict): Schema for type casting and validation.
         key_convention (str): Key naming convention ('snake', 'camel', 'keep').
-        output_format (str): "dataframe" for pandas.DataFrame, "relational" for dict with main and relations.
+        output_format (str): "dataframe" for pandas.DataFrame, "relational" for a `RelationalResult`
+                             (dict with main and relations, plus indexed lookups).
         config: Configuration object or dict.
         extract_relations (bool): Whether to extract nested relations into separate tables.
         fk_name (str): Foreign key name for extracted relations.
+        null_value: Replacement for null values ("" keeps None).
+        inplace (bool): If True, take ownership of `obj` and reuse its containers
+                        for the output (child dicts become relation rows, lists are
+                        compacted in place) instead of copying them. Use this for
+                        freshly parsed JSON the caller no longer needs.
+        include (list[str] | PathSelector): Dotted document paths to keep, with "*" and
+                        "**" wildcards (e.g. ["id", "title", "genres", "videos.results.key"]).
+                        Unselected subtrees are never visited and their relation
+                        tables are not built. None keeps everything.
+        exclude (list[str]): Dotted document paths to drop; wins over `include`.
+        where (callable | dict): Predicate evaluated on the raw document before any
+                        normalization work: a callable returning a bool, or a Mongo-style
+                        filter such as {"status": "Released", "vote_count": {"$gt": 100}}.
+                        A rejected document yields empty tables.
+        metrics (NormalizeMetrics): Optional collector for per-stage timings
+                        (decode, flatten, relations, nulls, keys, cast, dedup, output)
+                        and document/row counters.
+        profile_memory (bool): If True, trace allocations with tracemalloc and return
+                        ``(output, report)`` where the report holds the peak and net
+                        bytes of every stage and table and the top allocation sites
+                        (see `MemoryProfiler`). Slow; meant for diagnosing memory use.
+        compact (bool): If True, return the main and relation tables as `CompactTable`s
+                        (one shared key tuple per row shape, rows stored as value
+                        tuples, indexed as read-only mappings) instead of lists of dicts.
+        dictionary_encode (bool): Like `compact`, and additionally store low-cardinality
+                        string columns as category codes; DataFrame output then uses
+                        pandas Categorical columns for them.
+        cache (ResultCache): Optional content-addressed result cache. A document whose
+                        raw bytes (or canonical serialization) and options were seen
+                        before returns the stored rows without normalizing again.
+                        Not used with a callable `where`.
+        raise_errors (bool): If True, exceptions propagate to the caller instead of going
+                        through `handle_error` (used for per-document isolation).
+        root_fk (str): If set, every relation row gets this column holding the document's
+                        main key (its ``id``, or first column), so that tables of many
+                        documents can be joined back to them (see `denormalize`).
+        data_profile (DataProfile): Optional column profile collector; the output
+                        tables are profiled (null counts, types, min/max, distinct
+                        and heavy hitter sketches) as they are produced.
+        memory_budget (int | MemoryBudget): For a list of documents, bytes the table
+                        buffers may hold before large tables spill to temporary
+                        files (see `normalize_batch`).
 
     Returns:
-        list[dict] or pandas.DataFrame or dict: Normalized data.
+        list[dict] or pandas.DataFrame or dict: Normalized data, or a
+        ``(data, memory_report)`` tuple with `profile_memory`.
     """
-    # Get configuration
-    if config is None:
-        cfg = get_config()
-    elif isinstance(config, dict):
-        cfg = get_config()
-        cfg.update(**config)
-    else:
-        cfg = config
+    if profile_memory:
+        return _run_profiled(normalize_json, obj, metrics, sep=sep, explode_arrays=explode_arrays,
+                             flatten_nested=flatten_nested, schema=schema, key_convention=key_convention,
+                             output_format=output_format, config=config, extract_relations=extract_relations,
+                             fk_name=fk_name, null_value=null_value, inplace=inplace, include=include,
+                             exclude=exclude, where=where, compact=compact,
+                             dictionary_encode=dictionary_encode, cache=cache, raise_errors=raise_errors,
+                             root_fk=root_fk, data_profile=data_profile, memory_budget=memory_budget)
+
+    if cache is not None and not callable(where):
+        options = dict(sep=sep, explode_arrays=explode_arrays, flatten_nested=flatten_nested, schema=schema,
+                       key_convention=key_convention, config=config, extract_relations=extract_relations,
+                       fk_name=fk_name, null_value=null_value, inplace=inplace, include=include,
+                       exclude=exclude, where=where, raise_errors=raise_errors, root_fk=root_fk)
+        return _run_cached(cache, obj, options, output_format, compact, dictionary_encode, metrics, data_profile)
+
+    stage = stage_timer(metrics)
+
+    # Decode raw input; the decoded objects belong to us, so they can be reused in place
+    decoded = False
+    if is_raw_source(obj):
+        try:
+            with stage("decode"):
+                if metrics is not None:
+                    metrics.count("bytes_decoded", raw_size(obj))
+                obj = decode_json(obj)
+        except Exception as e:
+            if raise_errors:
+                raise
+            handle_error(e, "JSON decoding")
+            return []
+        inplace = decoded = True
+    elif isinstance(obj, str):
+        if raise_errors:
+            raise TypeError(_STR_INPUT)
+        handle_error(TypeError(_STR_INPUT), "JSON decoding")
+        return []
+    if isinstance(obj, list) and (decoded or memory_budget is not None):
+        return normalize_batch(obj, output_format=output_format, extract_relations=extract_relations,
+                               sep=sep, explode_arrays=explode_arrays, flatten_nested=flatten_nested,
+                               schema=schema, key_convention=key_convention, config=config,
+                               fk_name=fk_name, null_value=null_value, inplace=inplace,
+                               include=include, exclude=exclude, where=where, metrics=metrics,
+                               compact=compact, dictionary_encode=dictionary_encode,
+                               raise_errors=raise_errors, root_fk=root_fk, data_profile=data_profile,
+                               memory_budget=memory_budget)
+
+    # Reject filtered-out documents before doing any work
+    if where is not None and not compile_predicate(where)(obj):
+        if metrics is not None:
+            metrics.count("documents_rejected")
+        return _build_output([], {}, output_format, extract_relations, fk_name=fk_name, root_fk=root_fk)
+    if metrics is not None:
+        metrics.count("documents")
+
+    cfg = _resolve_config(config)
 
     log_processing_step("Starting JSON normalization", {"input_type": type(obj).__name__})
 
     try:
-        # Flatten the object
-        flattened = flatten_dict(obj, sep=sep, explode_arrays=explode_arrays, flatten_nested=flatten_nested)
+        # Flatten the object, skipping unselected subtrees
+        selector = compile_selector(include, exclude)
+        with stage("flatten"):
+            flattened = flatten_dict(obj, sep=sep, explode_arrays=explode_arrays, flatten_nested=flatten_nested,
+                                     selector=selector)
         log_processing_step("Flattened object", {"records_count": len(flattened)})
 
         # Initialize relations dict
         relations = {}
 
         # Extract nested relations if enabled
-        if extract_relations:
-            if len(flattened) == 1:  # Single record case
-                from .relation import extract_nested_relations
-                result = extract_nested_relations(flattened[0], fk_name=fk_name, remove_duplicates=cfg.remove_duplicates)
-                flattened = [result["main"]]
-                relations = result["relations"]
-                log_processing_step("Extracted relations", {"relations_count": len(relations)})
-            else:
-                # For multiple records, extract relations from each
-                all_relations = {}
-                for i, record in enumerate(flattened):
+        with stage("relations"):
+            if extract_relations:
+                if len(flattened) == 1:  # Single record case
                     from .relation import extract_nested_relations
-                    result = extract_nested_relations(record, fk_name=fk_name, remove_duplicates=cfg.remove_duplicates)
-                    flattened[i] = result["main"]
-                    # Merge relations
-                    for table_name, records in result["relations"].items():
-                        if table_name not in all_relations:
-                            all_relations[table_name] = []
-                        all_relations[table_name].extend(records)
-                relations = all_relations
-                log_processing_step("Extracted relations from multiple records", {"relations_count": len(relations)})
+                    result = extract_nested_relations(flattened[0], fk_name=fk_name, remove_duplicates=cfg.remove_duplicates,
+                                                      inplace=inplace)
+                    flattened = [result["main"]]
+                    relations = result["relations"]
+                    log_processing_step("Extracted relations", {"relations_count": len(relations)})
+                else:
+                    # For multiple records, extract relations from each.
+                    # Exploded rows share the same child lists, so children are
+                    # always copied here even in inplace mode.
+                    all_relations = {}
+                    for i, record in enumerate(flattened):
+                        from .relation import extract_nested_relations
+                        result = extract_nested_relations(record, fk_name=fk_name, remove_duplicates=cfg.remove_duplicates)
+                        flattened[i] = result["main"]
+                        # Merge relations
+                        for table_name, records in result["relations"].items():
+                            if table_name not in all_relations:
+                                all_relations[table_name] = []
+                            all_relations[table_name].extend(records)
+                    relations = all_relations
+                    log_processing_step("Extracted relations from multiple records", {"relations_count": len(relations)})
 
         # Normalize nulls
-        if null_value != "":
-            normalized = normalize_nulls(flattened, replace_null= True, null_value=null_value)
-        else:
-            normalized = normalize_nulls(flattened)
+        with stage("nulls"):
+            if null_value != "":
+                normalized = normalize_nulls(flattened, replace_null= True, null_value=null_value, inplace=inplace)
+            else:
+                normalized = normalize_nulls(flattened, inplace=inplace)
 
         # Normalize keys
         if key_convention != 'keep':
-            normalized = normalize_keys(normalized, key_convention)
+            with stage("keys"):
+                normalized = normalize_keys(normalized, key_convention, inplace=inplace)
 
         # Apply type casting if schema provided
         if schema:
-            normalized = apply_type_casting(normalized, schema)
+            with stage("cast"):
+                normalized = apply_type_casting(normalized, schema, inplace=inplace)
             log_processing_step("Applied type casting", {"schema_fields": len(schema)})
 
         # Global deduplication if configured
         if cfg.remove_duplicates:
             original_count = len(normalized)
-            normalized = deduplicate_records(normalized)
+            with stage("dedup"):
+                normalized = deduplicate_records(normalized)
             log_processing_step("Removed duplicates", {
                 "original_count": original_count,
                 "final_count": len(normalized)
             })
 
-        if output_format == "dataframe":
-            if not PANDAS_AVAILABLE:
-                handle_error(ImportError("pandas is required for DataFrame output"), "output_format")
-            else:
-                if extract_relations and relations:
-                    # Return dict of DataFrames (main + relation tables)
-                    result = {"main": pd.DataFrame(normalized)}
-                    for table_name, records in relations.items():
-                        result[table_name] = pd.DataFrame(records) if records else pd.DataFrame()
-                    return result
-                else:
-                    # Return single DataFrame for main data
-                    return pd.DataFrame(normalized)
-        elif output_format == "relational":
-            # Return both main data and relations
-            return {
-                "main": normalized,
-                "relations": relations if extract_relations else {}
-            }
-        else:
-            raise ValueError(f"Unsupported output format: {output_format} please use 'dataframe' or 'relational' instead.")
+        if root_fk and relations:
+            stamp_root(normalized, relations, root_fk)
+
+        if metrics is not None:
+            metrics.count("main_rows", len(normalized))
+            metrics.count("relation_rows", sum(len(records) for records in relations.values()))
+        return _finish(normalized, relations, output_format, extract_relations, compact, dictionary_encode, metrics,
+                       fk_name=fk_name, root_fk=root_fk, data_profile=data_profile)
 
     except Exception as e:
+        if raise_errors:
+            raise
         handle_error(e, "JSON normalization")
         return []
+
+def normalize_batch(documents, output_format="relational", extract_relations=True, sink=None, **kwargs):
+    """
+    Normalize a batch of JSON documents into one set of tables.
+
+    Every document goes through `normalize_json` with the same options, then the
+    main rows and the rows of each relation table are concatenated.
+
+    Args:
+        documents (iterable[dict] | bytes | os.PathLike): The JSON documents to
+                        normalize, or raw JSON holding an array of documents (a single
+                        object is a batch of one). Items may themselves be raw buffers
+                        (e.g. NDJSON lines as bytes) or ``os.PathLike`` files; a plain
+                        str, as the batch or an item, is rejected with a TypeError.
+        output_format (str): "relational" for a `RelationalResult` (dict with main and relations),
+                             "dataframe" for pandas DataFrames.
+        extract_relations (bool): Whether to extract nested relations into separate tables.
+        sink (TableSink): Optional output sink (CSV, Parquet, ...) the batch tables are
+                          written to. The sink is not closed.
+        **kwargs: Any other `normalize_json` option (sep, schema, fk_name, inplace, where,
+                  profile_memory, compact, dictionary_encode, ...). With ``compact=True``
+                  rows are moved into `CompactTable`s document by document, so
+                  the batch never holds more than one document's row dicts;
+                  ``dictionary_encode=True`` also encodes their strings as they
+                  accumulate.
+                  ``quarantine=Quarantine()`` isolates documents: a document
+                  that fails is recorded there with its index (counted from
+                  ``start_index``) and error, and the rest of the batch completes.
+                  ``shapes=ShapeCache()`` (or True for a cache of this batch
+                  only) groups documents by structural fingerprint and builds
+                  the main rows of each group column-wise through a plan
+                  compiled once per shape; the output is the same. Ignored with
+                  explode_arrays, flatten_nested, include, exclude or cache.
+                  ``data_profile=DataProfile()`` profiles the batch tables once,
+                  not document by document.
+                  ``memory_budget=bytes`` (or a `MemoryBudget`) buffers every
+                  table in a `SpillTable`: once the buffers exceed the budget,
+                  tables over their share spill to temporary files. Spilled
+                  tables are returned as `SpillTable`s (iterate them, or use
+                  ``chunks()``) and, with ``output_format="dataframe"``, as
+                  iterators of DataFrames, one per chunk. Not combinable with
+                  compact or dictionary_encode.
+
+    Returns:
+        dict or pandas.DataFrame: Normalized tables for the whole batch, or a
+        ``(tables, memory_report)`` tuple with ``profile_memory=True``.
+    """
+    if kwargs.pop("profile_memory", False):
+        metrics = kwargs.pop("metrics", None)
+        return _run_profiled(normalize_batch, documents, metrics, output_format=output_format,
+                             extract_relations=extract_relations, sink=sink, **kwargs)
+
+    predicate = compile_predicate(kwargs.pop("where", None))
+    metrics = kwargs.get("metrics")
+    stage = stage_timer(metrics)
+    if isinstance(documents, str):
+        raise TypeError(_STR_INPUT)
+    if is_raw_source(documents):
+        with stage("decode"):
+            if metrics is not None:
+                metrics.count("bytes_decoded", raw_size(documents))
+            documents = decode_json(documents)
+        if isinstance(documents, dict):
+            # A single JSON object is a batch of one
+            documents = [documents]
+        kwargs["inplace"] = True
+
+    compact = kwargs.pop("compact", False)
+    dictionary_encode = kwargs.pop("dictionary_encode", False)
+    memory_budget = kwargs.pop("memory_budget", None)
+    if memory_budget is not None:
+        if compact or dictionary_encode:
+            raise ValueError("memory_budget can't be combined with compact or dictionary_encode")
+        if not isinstance(memory_budget, MemoryBudget):
+            memory_budget = MemoryBudget(memory_budget, metrics=metrics)
+        new_table = memory_budget.table
+    else:
+        factory = partial(CompactTable, encode=True) if dictionary_encode else CompactTable if compact else list
+
+        def new_table(table_name):
+            return factory()
+    quarantine = kwargs.pop("quarantine", None)
+    start_index = kwargs.pop("start_index", 0)
+    shapes = kwargs.pop("shapes", None)
+    data_profile = kwargs.pop("data_profile", None)
+    if shapes is True:
+        shapes = ShapeCache()
+    elif shapes is False:
+        shapes = None
+    if shapes is not None and not ShapeCache.supports(kwargs):
+        shapes = None
+    if quarantine is not None:
+        kwargs["raise_errors"] = True
+    main = new_table("main")
+    relations = {}
+
+    def add(result):
+        main.extend(result["main"])
+        for table_name, records in result["relations"].items():
+            if table_name not in relations:
+                relations[table_name] = new_table(table_name)
+            relations[table_name].extend(records)
+
+    # With shapes, results are collected in document order and same-shaped
+    # documents are set aside per plan, to be normalized together afterwards
+    ordered = []
+    groups = {}
+    for index, document in enumerate(documents, start_index):
+        try:
+            owned = False
+            if isinstance(document, str):
+                raise TypeError(_STR_INPUT)
+            if predicate is not None or shapes is not None:
+                if is_raw_source(document):
+                    with stage("decode"):
+                        if metrics is not None:
+                            metrics.count("bytes_decoded", raw_size(document))
+                        document = decode_json(document)
+                    owned = True
+                if predicate is not None and not predicate(document):
+                    if metrics is not None:
+                        metrics.count("documents_rejected")
+                    continue
+            if shapes is not None:
+                with stage("shapes"):
+                    plan = shapes.plan(document, kwargs.get("sep", "."), kwargs.get("key_convention", "snake"),
+                                       extract_relations)
+                if plan is not None:
+                    groups.setdefault(plan, []).append((len(ordered), index, document, owned))
+                    ordered.append(None)
+                    continue
+            options = dict(kwargs, inplace=True) if owned else kwargs
+            result = normalize_json(document, output_format="relational",
+                                    extract_relations=extract_relations, **options)
+        except Exception as e:
+            if quarantine is None:
+                raise
+            # Nothing of this document was added yet, so the batch stays consistent
+            quarantine.add(index, document, e)
+            if metrics is not None:
+                metrics.count("documents_failed")
+            continue
+        if not result:
+            # normalize_json already reported the error
+            continue
+        if shapes is None:
+            add(result)
+        else:
+            ordered.append(result)
+
+    if shapes is not None:
+        _normalize_shape_groups(groups, ordered, kwargs, extract_relations, quarantine, metrics)
+        for result in ordered:
+            if result is not None:
+                add(result)
+
+    if data_profile is not None:
+        with stage("profile"):
+            data_profile.update(main, relations if extract_relations else {})
+
+    if sink is not None:
+        sink.write({"main": main, "relations": relations})
+
+    try:
+        with stage("output"):
+            return _build_output(main, relations, output_format, extract_relations, metrics,
+                                 fk_name=kwargs.get("fk_name", "parent_id"), root_fk=kwargs.get("root_fk"))
+    except Exception as e:
+        handle_error(e, "batch normalization")
+        return []
+
+def _normalize_shape_groups(groups, ordered, options, extract_relations, quarantine, metrics):
+    """Normalize each group of same-shaped documents through its plan, filling their slots in `ordered`."""
+    stage = stage_timer(metrics)
+    cfg = _resolve_config(options.get("config"))
+    fk_name = options.get("fk_name", "parent_id")
+    root_fk = options.get("root_fk")
+    inplace = options.get("inplace", False)
+    for plan, members in groups.items():
+        documents = [document for _, _, document, _ in members]
+        # Decoded raw documents belong to us and can be reused in place
+        owned = inplace or all(member[3] for member in members)
+        if metrics is not None:
+            metrics.count("documents", len(documents))
+            metrics.count("shape_documents", len(documents))
+        null_value, schema = options.get("null_value", ""), options.get("schema")
+        with stage("columns"):
+            try:
+                rows = plan.main_rows(documents, null_value, schema, owned)
+            except Exception:
+                # Some document fails: its rows are built one by one below, where it is isolated
+                rows = None
+            else:
+                # One row per document, or none when the shape has no main columns
+                rows = [[row] for row in rows] if plan.columns else [[] for _ in documents]
+        with stage("relations"):
+            for member, (position, index, document, document_owned) in enumerate(members):
+                try:
+                    if rows is None:
+                        main = plan.main_rows([document], null_value, schema, inplace or document_owned)
+                    else:
+                        main = rows[member]
+                    tables = plan.relations(document, fk_name, cfg.remove_duplicates, inplace or document_owned) \
+                        if extract_relations else {}
+                except Exception as e:
+                    if quarantine is not None:
+                        quarantine.add(index, document, e)
+                        if metrics is not None:
+                            metrics.count("documents_failed")
+                    elif options.get("raise_errors"):
+                        raise
+                    else:
+                        handle_error(e, "JSON normalization")
+                    continue
+                if root_fk and tables:
+                    stamp_root(main, tables, root_fk)
+                ordered[position] = {"main": main, "relations": tables}
+                if metrics is not None:
+                    metrics.count("main_rows", len(main))
+                    metrics.count("relation_rows", sum(len(records) for records in tables.values()))
+
+def _resolve_config(config):
+    """The effective JsonNormalizeConfig for a `config` argument (None, dict of overrides or config)."""
+    if config is None:
+        return get_config()
+    if isinstance(config, dict):
+        cfg = get_config()
+        cfg.update(**config)
+        return cfg
+    return config
+
+def _finish(normalized, relations, output_format, extract_relations, compact, dictionary_encode, metrics,
+            fk_name="parent_id", root_fk=None, data_profile=None):
+    """Profile the tables, then convert them to the requested storage and output format."""
+    if data_profile is not None:
+        with stage_timer(metrics)("profile"):
+            data_profile.update(normalized, relations if extract_relations else {})
+    if compact or dictionary_encode:
+        normalized = CompactTable(normalized, encode=dictionary_encode)
+        relations = {table_name: CompactTable(records, encode=dictionary_encode)
+                     for table_name, records in relations.items()}
+    if isinstance(metrics, MemoryProfiler):
+        metrics.record_tables(normalized, relations)
+    with stage_timer(metrics)("output"):
+        return _build_output(normalized, relations, output_format, extract_relations, metrics,
+                             fk_name=fk_name, root_fk=root_fk)
+
+def _cache_options(options):
+    """The options that determine a result, in a stable serializable form."""
+    config = options["config"]
+    if config is None or isinstance(config, dict):
+        effective = get_config().to_dict()
+        effective.update(config or {})
+    else:
+        effective = config.to_dict()
+    key = {name: value for name, value in options.items() if name not in ("config", "inplace", "raise_errors")}
+    key["config"] = effective
+    for name in ("include", "exclude"):
+        # A compiled PathSelector is keyed by its patterns
+        selector = key[name]
+        if isinstance(selector, PathSelector):
+            key[name] = [".".join(path) for path in getattr(selector, name) or ()]
+    return key
+
+def _run_cached(cache, obj, options, output_format, compact, dictionary_encode, metrics, data_profile=None):
+    """normalize_json through a ResultCache: return stored rows on a hit, store them on a miss."""
+    if isinstance(obj, (str, os.PathLike)):
+        # Hash the file content, not its name
+        with open(obj, "rb") as f:
+            obj = f.read()
+    elif isinstance(obj, mmap.mmap):
+        obj = memoryview(obj)
+    key = cache.key(obj, _cache_options(options))
+    hit = cache.get(key)
+    if metrics is not None:
+        metrics.count("cache_hits" if hit is not None else "cache_misses")
+    if hit is not None:
+        main, relations = hit
+    else:
+        result = normalize_json(obj, output_format="relational", metrics=metrics, **options)
+        if not result:
+            # normalize_json already reported the error
+            return []
+        main, relations = result["main"], result["relations"]
+        cache.put(key, main, relations)
+    return _finish(main, relations, output_format, options["extract_relations"], compact, dictionary_encode, metrics,
+                   fk_name=options["fk_name"], root_fk=options["root_fk"], data_profile=data_profile)
+
+def _run_profiled(func, obj, metrics, **kwargs):
+    """Run `func` under a MemoryProfiler and return ``(output, report)``."""
+    profiler = MemoryProfiler()
+    with profiler.tracing():
+        output = func(obj, metrics=profiler, **kwargs)
+    if metrics is not None:
+        metrics.merge(profiler)
+    return output, profiler.report()
+
+def _to_dataframe(rows):
+    """Build a DataFrame from a list of dicts or, column by column, from a CompactTable."""
+    pd = _import_pandas()
+    if isinstance(rows, CompactTable):
+        # Missing keys become NaN, as with a list of dicts
+        columns = rows.to_columns(missing=float("nan"), decode=False)
+        for column, categories in rows.categories.items():
+            # Hand the codes to pandas as they are; nulls and missing keys are -1
+            codes = [v if type(v) is int else -1 for v in columns[column]]
+            columns[column] = pd.Categorical.from_codes(codes, categories=categories)
+        return pd.DataFrame(columns, columns=rows.columns())
+    if isinstance(rows, SpillTable):
+        rows = rows.to_list()
+    return pd.DataFrame(rows)
+
+def _build_output(normalized, relations, output_format, extract_relations, metrics=None,
+                  fk_name="parent_id", root_fk=None):
+    """Shape normalized main rows and relation tables into the requested output format."""
+    if output_format == "dataframe":
+        pd = _import_pandas()
+        if pd is None:
+            handle_error(ImportError("pandas is required for DataFrame output"), "output_format")
+        else:
+            # Measure each DataFrame separately when profiling memory
+            table = metrics.table if isinstance(metrics, MemoryProfiler) else stage_timer(None)
+            if extract_relations and relations:
+                # Return dict of DataFrames (main + relation tables)
+                with table("main"):
+                    if isinstance(normalized, SpillTable) and normalized.spilled:
+                        result = {"main": normalized.dataframes()}
+                    else:
+                        result = {"main": _to_dataframe(normalized)}
+                for table_name, records in relations.items():
+                    with table(table_name):
+                        if isinstance(records, SpillTable) and records.spilled:
+                            result[table_name] = records.dataframes()
+                        else:
+                            result[table_name] = _to_dataframe(records) if records else pd.DataFrame()
+                return result
+            else:
+                # Return single DataFrame for main data
+                with table("main"):
+                    if isinstance(normalized, SpillTable) and normalized.spilled:
+                        return normalized.dataframes()
+                    return _to_dataframe(normalized)
+    elif output_format == "relational":
+        # Return both main data and relations, with lazily indexed lookups
+        return RelationalResult(normalized, relations if extract_relations else {}, fk_name=fk_name, root_fk=root_fk)
+    else:
+        raise ValueError(f"Unsupported output format: {output_format} please use 'dataframe' or 'relational' instead.")
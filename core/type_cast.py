@@ -48,17 +48,26 @@ def cast_value(value: Any, target_type: str) -> Any:
     except (ValueError, TypeError):
         return value
 
-def apply_type_casting(data: List[Dict], schema: Dict[str, str]) -> List[Dict]:
+def apply_type_casting(data: List[Dict], schema: Dict[str, str], inplace: bool = False) -> List[Dict]:
     """
     Apply type casting to data based on schema.
 
     Args:
         data: List of dictionaries to cast.
         schema: Dictionary mapping field names to target types.
+        inplace: If True, overwrite the values in the input records instead
+                 of building new ones.
 
     Returns:
         List of dictionaries with casted values.
     """
+    if inplace:
+        for record in data:
+            for key, target_type in schema.items():
+                if key in record:
+                    record[key] = cast_value(record[key], target_type)
+        return data
+
     casted_data = []
     for record in data:
         casted_record = {}
@@ -0,0 +1,256 @@
+"""
+``json-normalize`` command line tool: NDJSON in, one CSV/Parquet/SQLite table per relation out.
+
+Usage:
+    json-normalize movies.ndjson.gz --format parquet --output out/ --workers 4
+    cat movies.ndjson | json-normalize --format sqlite --output movies.db
+    json-normalize a.ndjson b.ndjson --schema schema.json --include id title genres
+    json-normalize movies.ndjson --output out/ --column-profile profile.json
+    json-normalize movies.ndjson --output out/ --workers 4 --chunk-size auto --chunk-mb 32
+"""
+import argparse
+import gzip
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Dict, Iterable, Iterator, List, Optional
+
+try:
+    from ..core.transformer import normalize_batch
+    from ..utils.config import set_config
+    from ..utils.data_profile import DataProfile
+    from ..utils.error_handler import Quarantine
+    from ..utils.metrics import NormalizeMetrics
+    from ..utils.output import CsvSink, ParquetSink, PartitionedSink, SqliteSink
+    from .streaming import ChunkSizer, iter_chunks
+except ImportError:
+    # Imported as top-level modules (core, utils, ...): their parent directory
+    # is already on sys.path, so absolute imports resolve
+    from core.transformer import normalize_batch
+    from utils.config import set_config
+    from utils.data_profile import DataProfile
+    from utils.error_handler import Quarantine
+    from utils.metrics import NormalizeMetrics
+    from utils.output import CsvSink, ParquetSink, PartitionedSink, SqliteSink
+    from extensions.streaming import ChunkSizer, iter_chunks
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+def open_input(path: str) -> IO[bytes]:
+    """Open an NDJSON file ("-" for stdin) as a binary stream, decompressing gzip transparently."""
+    if path == "-":
+        stream = sys.stdin.buffer
+        if stream.peek(2)[:2] == _GZIP_MAGIC:
+            return gzip.GzipFile(fileobj=stream)
+        return stream
+    with open(path, "rb") as f:
+        compressed = f.read(2) == _GZIP_MAGIC
+    return gzip.open(path, "rb") if compressed else open(path, "rb")
+
+def read_lines(paths: Iterable[str], counter: Dict[str, int]) -> Iterator[bytes]:
+    """Yield the non-blank lines of every input, counting bytes read in `counter`."""
+    for path in paths:
+        stream = open_input(path)
+        try:
+            for line in stream:
+                counter["bytes"] += len(line)
+                if line.strip():
+                    yield line
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+def _normalize_chunk(lines: List[bytes], start_index: int, options: Dict, log_level: str, profile: bool = False):
+    """Worker entry point: normalize raw NDJSON lines and return tables, metrics, failures and column profile."""
+    set_config(log_level=log_level)
+    metrics = NormalizeMetrics()
+    quarantine = Quarantine()
+    data_profile = DataProfile() if profile else None
+    result = normalize_batch(lines, metrics=metrics, quarantine=quarantine, start_index=start_index,
+                             data_profile=data_profile, **options)
+    return result, metrics, quarantine.records, data_profile
+
+def _chunk_size(value: str):
+    """``--chunk-size``: a number of documents or "auto"."""
+    if value == "auto":
+        return value
+    try:
+        size = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid chunk size: {value!r} (a number or 'auto')") from None
+    if size < 1:
+        raise argparse.ArgumentTypeError("chunk size must be at least 1")
+    return size
+
+def _partition_by(entries: Optional[List[str]]):
+    """``["id", "genres_table=_root"]`` -> ``{"*": "id", "genres_table": "_root"}``."""
+    if not entries:
+        return None
+    partition_by = {}
+    for entry in entries:
+        table_name, _, column = entry.rpartition("=")
+        partition_by[table_name or "*"] = column
+    return partition_by
+
+def _open_sink(args, schema: Optional[Dict[str, str]]):
+    schemas = {"main": schema} if schema else None
+    if args.partition_by or args.buckets:
+        if args.format == "sqlite":
+            raise SystemExit("json-normalize: partitioned output needs --format csv or parquet")
+        if not args.partition_by:
+            raise SystemExit("json-normalize: --buckets needs --partition-by")
+        max_file_bytes = int(args.max_file_mb * (1 << 20)) if args.max_file_mb else None
+        return PartitionedSink(args.output, args.format, partition_by=_partition_by(args.partition_by),
+                               buckets=args.buckets, max_file_bytes=max_file_bytes, schemas=schemas)
+    if args.format == "csv":
+        return CsvSink(args.output)
+    if args.format == "parquet":
+        return ParquetSink(args.output, schemas=schemas)
+    return SqliteSink(args.output, schemas=schemas, fk_columns=(args.fk_name,))
+
+def _results(args, chunks: Iterator[List[bytes]], options: Dict) -> Iterator[tuple]:
+    """Normalize chunks in order, in-process or on a bounded window of worker processes."""
+    if args.workers <= 1:
+        start = 0
+        for chunk in chunks:
+            yield _normalize_chunk(chunk, start, options, args.log_level, bool(args.column_profile))
+            start += len(chunk)
+        return
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        pending = deque()
+        start = 0
+        for chunk in chunks:
+            pending.append(pool.submit(_normalize_chunk, chunk, start, options, args.log_level,
+                                       bool(args.column_profile)))
+            start += len(chunk)
+            # Keep a couple of chunks per worker in flight so that input is not read ahead unboundedly
+            if len(pending) >= 2 * args.workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="json-normalize", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="*", default=["-"],
+                        help="NDJSON files, optionally gzip-compressed (default: stdin)")
+    parser.add_argument("-f", "--format", choices=["csv", "parquet", "sqlite"], default="csv")
+    parser.add_argument("-o", "--output", required=True,
+                        help="Output directory (csv, parquet) or database file (sqlite)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--chunk-size", type=_chunk_size, default=1000,
+                        help='Documents per worker task, or "auto" to adapt it to the observed '
+                             'bytes, rows and time per document')
+    parser.add_argument("--chunk-mb", type=float, default=64,
+                        help="Memory target of the chunks in flight with --chunk-size auto "
+                             "(split among the 2 chunks per worker)")
+    parser.add_argument("--schema", help="JSON file with a type_cast schema for the main table")
+    parser.add_argument("--sep", default=".", help="Separator of flattened keys")
+    parser.add_argument("--key-convention", choices=["snake", "camel", "keep"], default="snake")
+    parser.add_argument("--fk-name", default="parent_id", help="Foreign key column of relation tables")
+    parser.add_argument("--root-fk", help="Column added to relation rows with their document's id")
+    parser.add_argument("--no-relations", action="store_true", help="Keep nested arrays in the main table")
+    parser.add_argument("--include", nargs="+", help="Dotted paths to keep")
+    parser.add_argument("--exclude", nargs="+", help="Dotted paths to drop")
+    parser.add_argument("--where", help='Mongo-style filter as JSON, e.g. \'{"status": "Released"}\'')
+    parser.add_argument("--partition-by", nargs="+", metavar="[TABLE=]COLUMN",
+                        help="Hive-style partition column, for all tables or per table")
+    parser.add_argument("--buckets", type=int, help="Hash the partition column into this many buckets")
+    parser.add_argument("--max-file-mb", type=float, default=128,
+                        help="Roll partition files at this size (0: never)")
+    parser.add_argument("--shapes", action="store_true",
+                        help="Group same-shaped documents and normalize them column-wise")
+    parser.add_argument("--column-profile", metavar="FILE",
+                        help="Write per-column statistics of every table (nulls, types, min/max, "
+                             "distinct estimate, top values) to this JSON file")
+    parser.add_argument("--quarantine", help="NDJSON file receiving documents that fail to normalize")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't print the run summary")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    set_config(log_level=args.log_level)
+    schema = None
+    if args.schema:
+        with open(args.schema) as f:
+            schema = json.load(f)
+    options = {
+        "output_format": "relational",
+        "extract_relations": not args.no_relations,
+        "sep": args.sep,
+        "key_convention": args.key_convention,
+        "fk_name": args.fk_name,
+        "root_fk": args.root_fk,
+        "schema": schema,
+        "include": args.include,
+        "exclude": args.exclude,
+        "where": json.loads(args.where) if args.where else None,
+        "shapes": args.shapes,
+    }
+
+    counter = {"bytes": 0}
+    metrics = NormalizeMetrics()
+    quarantine = Quarantine(args.quarantine)
+    data_profile = DataProfile() if args.column_profile else None
+    sizer = None
+    if args.chunk_size == "auto":
+        # --chunk-mb bounds all chunks in flight: with workers, up to 2 * workers of them
+        in_flight = 2 * args.workers if args.workers > 1 else 1
+        sizer = ChunkSizer(target_bytes=int(args.chunk_mb * (1 << 20)) // in_flight, metrics=metrics)
+    started = time.perf_counter()
+    sink = _open_sink(args, schema)
+    try:
+        chunks = iter_chunks(read_lines(args.inputs, counter), sizer or args.chunk_size)
+        for result, chunk_metrics, failures, chunk_profile in _results(args, chunks, options):
+            metrics.merge(chunk_metrics)
+            if sizer is not None:
+                counters = chunk_metrics.counters
+                documents = counters.get("documents", 0) + counters.get("documents_rejected", 0)
+                sizer.observe(documents, result, counters.get("bytes_decoded", 0),
+                              sum(chunk_metrics.timings.values()))
+            if chunk_profile is not None:
+                data_profile.merge(chunk_profile)
+            for record in failures:
+                quarantine.add_record(record)
+            with metrics.stage("write"):
+                sink.write(result)
+    finally:
+        sink.close()
+    elapsed = time.perf_counter() - started
+
+    if data_profile is not None:
+        with open(args.column_profile, "w", encoding="utf-8") as f:
+            json.dump(data_profile.to_dict(), f, indent=2, ensure_ascii=False, default=str)
+    if not args.quiet:
+        print_summary(metrics, counter["bytes"], elapsed, quarantine, sink, file=sys.stderr)
+    return 1 if len(quarantine) else 0
+
+def print_summary(metrics: NormalizeMetrics, bytes_read: int, elapsed: float, quarantine: Quarantine,
+                  sink, file=sys.stderr) -> None:
+    """Print throughput, per-stage timings and row counts."""
+    documents = metrics.counters.get("documents", 0)
+    rate = elapsed if elapsed > 0 else float("inf")
+    print(f"documents: {documents} in {elapsed:.2f}s "
+          f"({documents / rate:,.0f} docs/s, {bytes_read / rate / 1e6:,.1f} MB/s)", file=file)
+    for name in ("documents_rejected", "documents_failed"):
+        if metrics.counters.get(name):
+            print(f"{name}: {metrics.counters[name]}", file=file)
+    if len(quarantine):
+        print(f"quarantined: {len(quarantine)} {quarantine.summary()['error_types']}", file=file)
+    print("stage timings (seconds, summed over workers):", file=file)
+    for name, seconds in sorted(metrics.timings.items(), key=lambda item: -item[1]):
+        print(f"  {name:<10} {seconds:10.3f}  ({metrics.calls[name]} calls)", file=file)
+    if "chunk_size" in metrics.gauges:
+        print(f"adaptive chunk size: {metrics.gauges['chunk_size']} "
+              f"({metrics.gauges['bytes_per_document']:,.0f} bytes, "
+              f"{metrics.gauges['rows_per_document']:.1f} rows per document)", file=file)
+    if hasattr(sink, "row_counts"):
+        print("rows written:", file=file)
+        for table_name, count in sink.row_counts().items():
+            print(f"  {table_name:<30} {count}", file=file)
+
+if __name__ == "__main__":
+    sys.exit(main())
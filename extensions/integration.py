@@ -0,0 +1,113 @@
+"""
+Source integrations: read documents from external stores in batches and normalize them.
+"""
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+try:
+    from ..core.transformer import normalize_batch
+    from ..core.selector import compile_selector
+    from ..core.predicate import predicate_paths
+    from .streaming import iter_chunks
+except ImportError:
+    # Imported as top-level modules (core, utils, ...): their parent directory
+    # is already on sys.path, so absolute imports resolve
+    from core.transformer import normalize_batch
+    from core.selector import compile_selector
+    from core.predicate import predicate_paths
+    from extensions.streaming import iter_chunks
+
+def build_projection(paths: Optional[Iterable[str]]) -> Optional[Dict[str, int]]:
+    """
+    Build a Mongo projection that only returns the given dotted paths.
+
+    Paths nested under another requested path are dropped, since Mongo rejects
+    overlapping projections. `_id` is excluded unless requested.
+
+    Args:
+        paths: Dotted document paths, e.g. ["title", "genres.name", "videos"].
+               None means the whole document.
+
+    Returns:
+        Projection dict, or None to fetch whole documents.
+    """
+    if paths is None:
+        return None
+    projection = {}
+    for path in sorted(set(paths), key=lambda p: (p.count("."), p)):
+        parts = path.split(".")
+        if any(".".join(parts[:i]) in projection for i in range(1, len(parts))):
+            continue
+        projection[path] = 1
+    if "_id" not in projection:
+        projection["_id"] = 0
+    return projection
+
+def iter_documents(collection: Any, query: Optional[Dict] = None, paths: Optional[Iterable[str]] = None,
+                   batch_size: int = 1000) -> Iterator[Dict]:
+    """
+    Iterate over the documents of a Mongo-like collection with a batched cursor.
+
+    Works with any object exposing ``find(filter, projection, batch_size=...)``
+    that returns an iterable of dicts (pymongo, mongomock, in-process fakes).
+
+    Args:
+        collection: The collection to read.
+        query: Filter document passed to ``find``.
+        paths: Dotted paths to fetch; pushed down as a projection.
+        batch_size: Number of documents fetched per round trip.
+
+    Yields:
+        dict: Documents as returned by the cursor.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    cursor = collection.find(query or {}, build_projection(paths), batch_size=batch_size)
+    try:
+        for document in cursor:
+            yield document
+    finally:
+        close = getattr(cursor, "close", None)
+        if close is not None:
+            close()
+
+def normalize_collection(collection: Any, query: Optional[Dict] = None,
+                         paths: Optional[Iterable[str]] = None, batch_size: int = 1000,
+                         **kwargs) -> Iterator[Dict]:
+    """
+    Normalize a Mongo-like collection batch by batch.
+
+    Each cursor batch is handed straight to ``normalize_batch``, replacing the
+    ``find_one()`` + ``normalize_json`` loop. Documents come fresh from the
+    driver, so ``inplace=True`` is safe and avoids copying them.
+
+    Args:
+        collection: The collection to read.
+        query: Filter document passed to ``find``. Defaults to a dict ``where`` clause.
+        paths: Dotted paths to fetch; pushed down as a projection. Defaults to the
+               paths covered by the ``include`` selector, if any. The paths of a
+               dict ``where`` clause are always fetched too.
+        batch_size: Documents per cursor round trip and per normalized batch.
+        **kwargs: Options passed to ``normalize_batch``/``normalize_json``
+                  (e.g. ``sink``, ``schema``, ``inplace``).
+
+    Yields:
+        dict: Relational result per batch (or DataFrames with output_format="dataframe").
+
+    Example:
+        >>> from pymongo import MongoClient
+        >>> movies = MongoClient()["tmdb_data"]["raw_movies"]
+        >>> for batch in normalize_collection(movies, paths=["id", "title", "genres"],
+        ...                                   batch_size=5000, inplace=True):
+        ...     load(batch)
+    """
+    if query is None and isinstance(kwargs.get("where"), dict):
+        # A dict where clause is also a valid Mongo filter: let the server apply it
+        query = kwargs["where"]
+    if paths is None and kwargs.get("include") is not None:
+        paths = compile_selector(kwargs["include"], kwargs.get("exclude")).projection_paths()
+    if paths is not None and isinstance(kwargs.get("where"), dict):
+        # The predicate is re-checked locally, so its fields must be fetched
+        paths = list(paths) + predicate_paths(kwargs["where"])
+    documents = iter_documents(collection, query, paths, batch_size)
+    for chunk in iter_chunks(documents, batch_size):
+        yield normalize_batch(chunk, **kwargs)
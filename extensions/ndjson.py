@@ -0,0 +1,205 @@
+"""
+Line-offset index for NDJSON files: random access, resumable reads and balanced shards.
+"""
+import bisect
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from typing import Iterator, List, Optional, Tuple
+
+_MAGIC = b"JNIDX001"
+_HEADER = struct.Struct("<8sQQQ")  # magic, data size, data mtime_ns, line count
+
+def index_path_for(path: str) -> str:
+    """Path of the sidecar index stored next to an NDJSON file."""
+    return os.fspath(path) + ".idx"
+
+def _scan_offsets(path: str) -> array:
+    """Return the start offset of every line followed by the file size."""
+    offsets = array("Q")
+    size = os.path.getsize(path)
+    if size == 0:
+        offsets.append(0)
+        return offsets
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        find = mapped.find
+        append = offsets.append
+        position = 0
+        while position < size:
+            append(position)
+            newline = find(b"\n", position)
+            if newline == -1:
+                break
+            position = newline + 1
+    offsets.append(size)
+    return offsets
+
+class LineIndex:
+    """
+    Byte offsets of the lines of an NDJSON file.
+
+    The index is built once with a scan over the memory-mapped file and saved to
+    a sidecar ``<path>.idx``; later loads only read the sidecar, and rebuild it if
+    the data file changed size or modification time. With the index, reading line
+    ``i``, resuming from line ``i`` or splitting the file into byte-balanced shards
+    are seeks rather than scans.
+
+    Attributes:
+        path (str): The NDJSON file.
+        offsets (array): Start offset of every line, followed by the file size.
+
+    Example:
+        >>> index = LineIndex.load("movies.ndjson")
+        >>> len(index), index.read(41_999)
+        >>> for start, stop in index.shards(8):
+        ...     pool.submit(normalize_lines, "movies.ndjson", start, stop)
+    """
+
+    def __init__(self, path: str, offsets: array):
+        self.path = os.fspath(path)
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, path: str, save: bool = True) -> "LineIndex":
+        """Scan `path` and optionally persist the sidecar index."""
+        index = cls(path, _scan_offsets(path))
+        if save:
+            index.save()
+        return index
+
+    @classmethod
+    def load(cls, path: str, rebuild: bool = True) -> "LineIndex":
+        """
+        Load the sidecar index of `path`, building it if missing or stale.
+
+        Args:
+            path: The NDJSON file.
+            rebuild: If False, raise FileNotFoundError/ValueError instead of rebuilding.
+        """
+        stat = os.stat(path)
+        try:
+            with open(index_path_for(path), "rb") as f:
+                magic, size, mtime_ns, count = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != _MAGIC:
+                    raise ValueError(f"Not a line index: {index_path_for(path)}")
+                if size != stat.st_size or mtime_ns != stat.st_mtime_ns:
+                    raise ValueError(f"Line index is stale for {path}")
+                offsets = array("Q")
+                offsets.frombytes(f.read((count + 1) * offsets.itemsize))
+                if sys.byteorder != "little":
+                    offsets.byteswap()
+                if len(offsets) != count + 1:
+                    raise ValueError(f"Line index is truncated: {index_path_for(path)}")
+                return cls(path, offsets)
+        except (FileNotFoundError, ValueError, struct.error):
+            if not rebuild:
+                raise
+            return cls.build(path)
+
+    def save(self) -> str:
+        """Write the sidecar index atomically and return its path."""
+        stat = os.stat(self.path)
+        target = index_path_for(self.path)
+        offsets = self.offsets
+        if sys.byteorder != "little":
+            offsets = array("Q", offsets)
+            offsets.byteswap()
+        tmp = target + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, stat.st_size, stat.st_mtime_ns, len(self)))
+            f.write(offsets.tobytes())
+        os.replace(tmp, target)
+        return target
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def size(self) -> int:
+        """Size of the indexed file in bytes."""
+        return self.offsets[-1]
+
+    def line_range(self, line: int) -> Tuple[int, int]:
+        """Byte range ``[start, end)`` of a line, including its newline."""
+        if not 0 <= line < len(self):
+            raise IndexError("line index out of range")
+        return self.offsets[line], self.offsets[line + 1]
+
+    def read(self, line: int) -> bytes:
+        """Read one line (without the line terminator) with a single seek."""
+        start, end = self.line_range(line)
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            return f.read(end - start).rstrip(b"\r\n")
+
+    def iter_lines(self, start: int = 0, stop: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Yield the non-blank lines ``[start, stop)`` as bytes, ready for decoding.
+
+        Only the byte range of those lines is touched, so resuming from line
+        `start` costs one seek.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        offsets = self.offsets
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for line in range(start, stop):
+                data = mapped[offsets[line]:offsets[line + 1]].rstrip(b"\r\n")
+                if data.strip():
+                    yield data
+
+    def shards(self, count: int) -> List[Tuple[int, int]]:
+        """
+        Split the lines into at most `count` contiguous ranges of roughly equal bytes.
+
+        Returns:
+            List of ``(start_line, stop_line)`` pairs covering every line.
+        """
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        total = len(self)
+        if total == 0:
+            return []
+        shards = []
+        start = 0
+        for i in range(1, count + 1):
+            if i == count:
+                stop = total
+            else:
+                target = self.size * i // count
+                stop = min(max(bisect.bisect_left(self.offsets, target, 0, total), start + 1), total)
+            if stop > start:
+                shards.append((start, stop))
+                start = stop
+            if start >= total:
+                break
+        return shards
+
+    def sample(self, k: int, seed: Optional[int] = None) -> List[bytes]:
+        """Read `k` distinct random lines, each with one seek."""
+        rng = random.Random(seed)
+        lines = sorted(rng.sample(range(len(self)), min(k, len(self))))
+        with open(self.path, "rb") as f:
+            result = []
+            for line in lines:
+                start, end = self.line_range(line)
+                f.seek(start)
+                result.append(f.read(end - start).rstrip(b"\r\n"))
+            return result
+
+def build_line_index(path: str, save: bool = True) -> LineIndex:
+    """Build the line-offset index of an NDJSON file (see `LineIndex`)."""
+    return LineIndex.build(path, save=save)
+
+def read_lines(path: str, start: int = 0, stop: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Yield lines ``[start, stop)`` of an NDJSON file using its sidecar index.
+
+    Suitable as a worker entry point: only the path and the line range need to
+    be sent to the worker.
+    """
+    return LineIndex.load(path).iter_lines(start, stop)
@@ -0,0 +1,235 @@
+"""
+Streaming normalization: process an unbounded iterable of documents chunk by chunk.
+"""
+import time
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+try:
+    from ..core.shape import ShapeCache
+    from ..core.spill import row_size
+    from ..core.transformer import normalize_batch
+    from ..utils.output import TableSink, write_tables
+except ImportError:
+    # Imported as top-level modules (core, utils, ...): their parent directory
+    # is already on sys.path, so absolute imports resolve
+    from core.shape import ShapeCache
+    from core.spill import row_size
+    from core.transformer import normalize_batch
+    from utils.output import TableSink, write_tables
+
+# Rows measured per table to estimate the size of a chunk's output
+_SAMPLE_ROWS = 16
+
+def _table_size(table: Any) -> Tuple[int, int]:
+    """Rows and estimated bytes of one table: a list of rows, a buffer or a DataFrame."""
+    if not hasattr(table, "__len__"):
+        # Spilled tables come back as a generator of DataFrames, which can't be measured
+        return 0, 0
+    count = len(table)
+    if not count:
+        return 0, 0
+    if hasattr(table, "memory_usage"):
+        sample = table.head(_SAMPLE_ROWS)
+        return count, count * int(sample.memory_usage(index=False, deep=True).sum()) // len(sample)
+    sample = [row_size(row) for row in islice(iter(table), _SAMPLE_ROWS)]
+    return count, count * sum(sample) // len(sample)
+
+def result_size(result: Any) -> Tuple[int, int]:
+    """
+    Rows and estimated bytes (from sampled rows) of the tables of a batch result.
+
+    Handles every shape `normalize_batch` returns: a relational result, a
+    DataFrame, or a dict of DataFrames keyed by table name.
+    """
+    if result is None:
+        return 0, 0
+    if not isinstance(result, Mapping):
+        return _table_size(result)
+    if "relations" in result:
+        tables = [result.get("main")] + list((result.get("relations") or {}).values())
+    else:
+        tables = list(result.values())
+    rows = total = 0
+    for table in tables:
+        if table is None:
+            continue
+        count, size = _table_size(table)
+        rows += count
+        total += size
+    return rows, total
+
+class ChunkSizer:
+    """
+    Chooses chunk sizes from what the previous chunks cost.
+
+    After every chunk, `observe` records its documents, raw input bytes, rows
+    emitted and the estimated bytes of its tables, and how long it took. The
+    next size fills `target_bytes` at the observed bytes per document (input
+    plus output), and is capped so that a chunk takes about `target_seconds`.
+    Small documents thus get large chunks, which amortize the per-chunk
+    overhead, and documents with huge child arrays get small ones. Observations
+    are smoothed and a size grows at most `max_growth` times per chunk, so one
+    odd chunk doesn't swing it.
+
+    Args:
+        target_bytes: Memory ceiling for one chunk in flight: its documents and tables.
+        target_seconds: Time one chunk should take (None: no cap), which keeps
+                        streaming consumers and worker processes responsive.
+        min_size: Smallest chunk size.
+        max_size: Largest chunk size.
+        initial_size: Size of the first chunk, before anything was observed.
+        max_growth: Largest factor between consecutive sizes.
+        metrics (NormalizeMetrics): Optional; the decisions are set as gauges
+                        (``chunk_size``, ``bytes_per_document``, ``rows_per_document``,
+                        ``seconds_per_document``) and counted as ``chunks``.
+
+    Attributes:
+        size (int): The current chunk size.
+        decisions (list[dict]): Every size chosen, with the estimates it was based on.
+
+    Example:
+        >>> sizer = ChunkSizer(target_bytes=256 << 20)
+        >>> for chunk in normalize_stream(documents, chunk_size=sizer):
+        ...     sink.write(chunk)
+        >>> sizer.decisions[-1]
+    """
+
+    def __init__(self, target_bytes: int = 64 << 20, target_seconds: Optional[float] = 2.0, min_size: int = 100,
+                 max_size: int = 50000, initial_size: int = 1000, max_growth: float = 4.0, metrics=None):
+        if not 1 <= min_size <= max_size:
+            raise ValueError("chunk sizes must satisfy 1 <= min_size <= max_size")
+        self.target_bytes = target_bytes
+        self.target_seconds = target_seconds
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_growth = max_growth
+        self.metrics = metrics
+        self.size = min(max(initial_size, min_size), max_size)
+        self.decisions: List[Dict[str, Any]] = []
+        self._bytes = None
+        self._rows = None
+        self._seconds = None
+
+    @staticmethod
+    def _smooth(previous: Optional[float], value: float) -> float:
+        return value if previous is None else (previous + value) / 2
+
+    def observe(self, documents: int, result: Any, input_bytes: int = 0,
+                seconds: Optional[float] = None) -> int:
+        """
+        Record a normalized chunk and return the size of the next one.
+
+        Args:
+            documents: Documents in the chunk.
+            result: Its result, relational or DataFrames.
+            input_bytes: Raw bytes of its documents, if they were read as raw JSON.
+            seconds: Time it took to normalize.
+        """
+        if documents <= 0:
+            return self.size
+        rows, output_bytes = result_size(result)
+        self._bytes = self._smooth(self._bytes, (input_bytes + output_bytes) / documents)
+        self._rows = self._smooth(self._rows, rows / documents)
+        if seconds is not None:
+            self._seconds = self._smooth(self._seconds, seconds / documents)
+
+        size = self.target_bytes / self._bytes if self._bytes else self.max_size
+        if self.target_seconds and self._seconds:
+            size = min(size, self.target_seconds / self._seconds)
+        size = min(size, self.size * self.max_growth)
+        self.size = int(min(max(size, self.min_size), self.max_size))
+
+        decision = {
+            'size': self.size,
+            'bytes_per_document': round(self._bytes),
+            'rows_per_document': round(self._rows, 2),
+            'seconds_per_document': self._seconds,
+        }
+        self.decisions.append(decision)
+        if self.metrics is not None:
+            self.metrics.count("chunks")
+            self.metrics.set_gauge("chunk_size", self.size)
+            for name in ("bytes_per_document", "rows_per_document", "seconds_per_document"):
+                if decision[name] is not None:
+                    self.metrics.set_gauge(name, decision[name])
+        return self.size
+
+def iter_chunks(iterable: Iterable, chunk_size: Union[int, ChunkSizer]) -> Iterator[List]:
+    """
+    Split an iterable into lists of at most `chunk_size` items.
+
+    Args:
+        iterable: Any iterable, consumed lazily.
+        chunk_size: Maximum number of items per chunk, or a `ChunkSizer` whose
+                    current size is read before every chunk.
+
+    Yields:
+        Lists of consecutive items.
+    """
+    sizer = chunk_size if isinstance(chunk_size, ChunkSizer) else None
+    if sizer is None and chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, sizer.size if sizer is not None else chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def normalize_stream(documents: Iterable[Dict], chunk_size: Union[int, str, ChunkSizer] = 1000,
+                     **kwargs) -> Iterator[Dict]:
+    """
+    Normalize documents lazily, one chunk at a time.
+
+    Only one chunk of documents and its normalized tables are in memory at once.
+
+    Args:
+        documents: Iterable of JSON documents (generator, cursor, file reader, ...).
+        chunk_size: Number of documents normalized together. ``"auto"`` (or a
+                    `ChunkSizer`) adapts it after every chunk to the observed
+                    bytes and rows per document and the time per document; the
+                    decisions are recorded as gauges of ``metrics=``.
+        **kwargs: Options passed to ``normalize_batch``/``normalize_json``. With
+                  ``quarantine=Quarantine()`` failing documents are recorded with
+                  their index in the whole stream and the stream continues.
+                  ``shapes=True`` shares one `ShapeCache` across all chunks.
+
+    Yields:
+        dict: Relational result ``{"main": [...], "relations": {...}}`` per chunk.
+    """
+    kwargs.setdefault("output_format", "relational")
+    if kwargs.get("shapes") is True:
+        kwargs["shapes"] = ShapeCache()
+    if chunk_size == "auto":
+        chunk_size = ChunkSizer(metrics=kwargs.get("metrics"))
+    sizer = chunk_size if isinstance(chunk_size, ChunkSizer) else None
+    start_index = 0
+    for chunk in iter_chunks(documents, chunk_size):
+        if sizer is None:
+            yield normalize_batch(chunk, start_index=start_index, **kwargs)
+        else:
+            input_bytes = sum(len(document) for document in chunk if isinstance(document, (bytes, bytearray)))
+            started = time.perf_counter()
+            result = normalize_batch(chunk, start_index=start_index, **kwargs)
+            sizer.observe(len(chunk), result, input_bytes, time.perf_counter() - started)
+            yield result
+        start_index += len(chunk)
+
+def stream_to_sink(documents: Iterable[Dict], sink: TableSink, chunk_size: Union[int, str, ChunkSizer] = 1000,
+                   **kwargs) -> Dict[str, int]:
+    """
+    Normalize documents chunk by chunk and write every chunk to a sink.
+
+    Args:
+        documents: Iterable of JSON documents.
+        sink: Output sink, e.g. ``CsvSink``. It is closed when the stream ends.
+        chunk_size: Number of documents normalized together, or ``"auto"``/a `ChunkSizer`
+                    (see `normalize_stream`).
+        **kwargs: Options passed to ``normalize_json``.
+
+    Returns:
+        Number of rows written per table.
+    """
+    kwargs["output_format"] = "relational"
+    return write_tables(normalize_stream(documents, chunk_size, **kwargs), sink)
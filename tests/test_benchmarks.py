@@ -0,0 +1,18 @@
+import json
+
+from benchmarks.run import main
+from utils.config import get_config, set_config
+
+
+class TestBenchmarks:
+    def test_tiny_scale_writes_json_report(self, tmp_path):
+        output = tmp_path / "bench.json"
+        log_level = get_config().log_level
+        try:
+            assert main(["--scales", "3", "--repeat", "1", "--output", str(output)]) == 0
+        finally:
+            set_config(log_level=log_level)
+        report = json.loads(output.read_text())
+        stages = report["results"]["3"]
+        assert {"decode", "flatten"} <= set(stages)
+        assert all(timing["seconds"] >= 0 for stage, timing in stages.items() if not stage.startswith("_"))
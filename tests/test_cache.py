@@ -0,0 +1,80 @@
+import datetime
+import json
+import os
+from decimal import Decimal
+
+from core.transformer import normalize_batch, normalize_json
+from utils.cache import ResultCache
+from utils.metrics import NormalizeMetrics
+
+
+DOC = {"id": 550, "title": "Fight Club", "genres": [{"id": 18, "name": "Drama"}]}
+RAW = json.dumps(DOC).encode()
+
+
+class TestResultCache:
+    def test_memory_hits(self):
+        cache = ResultCache(max_entries=10)
+        metrics = NormalizeMetrics()
+        expected = normalize_json(dict(DOC), output_format="relational")
+        first = normalize_json(RAW, output_format="relational", cache=cache, metrics=metrics)
+        second = normalize_json(RAW, output_format="relational", cache=cache, metrics=metrics)
+        assert first == second == expected
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+        assert metrics.counters["cache_hits"] == 1
+        # Results handed out are copies
+        second["main"][0]["title"] = "changed"
+        assert normalize_json(RAW, output_format="relational", cache=cache) == expected
+
+    def test_options_are_part_of_the_key(self):
+        cache = ResultCache()
+        normalize_json(dict(DOC), output_format="relational", cache=cache)
+        normalize_json(dict(DOC), output_format="relational", cache=cache, schema={"id": "str"})
+        normalize_json(dict(DOC), output_format="relational", cache=cache, key_convention="camel")
+        assert cache.misses == 3 and cache.hits == 0
+
+    def test_lru_eviction_and_disk_tier(self, tmp_path):
+        cache = ResultCache(max_entries=1, directory=tmp_path)
+        docs = [dict(DOC, id=i) for i in range(3)]
+        normalize_batch(docs, cache=cache)
+        assert len(cache) == 1
+        reopened = ResultCache(max_entries=1, directory=tmp_path)
+        result = normalize_batch(docs, cache=reopened)
+        assert [row["id"] for row in result["main"]] == [0, 1, 2]
+        assert reopened.stats()["disk_hits"] == 3
+
+    def test_key_tags_non_json_values(self):
+        options = {}
+        assert ResultCache.key({"v": Decimal("1")}, options) != ResultCache.key({"v": "1"}, options)
+        day = datetime.date(2020, 1, 2)
+        assert ResultCache.key({"v": day}, options) != ResultCache.key({"v": "2020-01-02"}, options)
+        assert ResultCache.key({"v": day}, options) == ResultCache.key({"v": datetime.date(2020, 1, 2)}, options)
+
+    def test_nested_values_are_not_shared(self):
+        cache = ResultCache()
+        main = [{"id": 1, "tags": ["a", "b"], "meta": {"k": [1]}}]
+        cache.put("k", main, {})
+        main[0]["tags"].append("c")
+        cached, _ = cache.get("k")
+        assert cached == [{"id": 1, "tags": ["a", "b"], "meta": {"k": [1]}}]
+        cached[0]["meta"]["k"].append(2)
+        assert cache.get("k")[0][0]["meta"] == {"k": [1]}
+
+    def test_disk_tier_is_json_checked_against_the_key(self, tmp_path):
+        cache = ResultCache(directory=tmp_path)
+        main = [{"id": 1, "day": datetime.date(2020, 1, 2), "price": Decimal("1.50"), "tags": ["a"]}]
+        cache.put("k1", main, {"t": [{"parent_id": "t_0"}]})
+        cache.put("k2", [{"id": 2, "other": object()}], {})
+        reopened = ResultCache(directory=tmp_path)
+        assert reopened.get("k1") == (main, {"t": [{"parent_id": "t_0"}]})
+        assert reopened.get("k2") is None
+
+        # An entry copied under another key, or a foreign file, is a miss
+        path = reopened._path("k3")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(reopened._path("k1"), "rb") as f, open(path, "wb") as g:
+            g.write(f.read())
+        assert ResultCache(directory=tmp_path).get("k3") is None
+        with open(path, "wb") as f:
+            f.write(b"\x80\x04not json")
+        assert ResultCache(directory=tmp_path).get("k3") is None
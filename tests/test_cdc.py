@@ -0,0 +1,93 @@
+import copy
+
+from core.cdc import CdcState, change_counts, diff_batch, diff_document, diff_results
+from core.transformer import normalize_json
+from utils.error_handler import Quarantine
+
+
+MOVIE = {
+    "id": 550,
+    "title": "Fight Club",
+    "status": "Released",
+    "genres": [{"id": 18, "name": "Drama"}, {"id": 53, "name": "Thriller"}],
+    "spoken_languages": [{"iso_639_1": "en", "name": "English"}],
+}
+
+
+class TestCdc:
+    def test_unchanged_document_emits_nothing(self):
+        state = CdcState()
+        first = diff_document(copy.deepcopy(MOVIE), state)
+        assert change_counts(first)["main"] == {"inserts": 1, "updates": 0, "deletes": 0}
+        assert change_counts(first)["genres_table"]["inserts"] == 2
+        assert diff_document(copy.deepcopy(MOVIE), state) == {}
+
+    def test_updates_inserts_and_deletes(self, tmp_path):
+        state = CdcState()
+        diff_document(copy.deepcopy(MOVIE), state)
+        path = tmp_path / "state.json"
+        state.save(path)
+        state = CdcState.load(path)
+
+        new = copy.deepcopy(MOVIE)
+        new["title"] = "Fight Club (1999)"
+        new["genres"] = [{"id": 53, "name": "Thriller"}, {"id": 18, "name": "Drama (film)"},
+                         {"id": 80, "name": "Crime"}]
+        new["spoken_languages"] = []
+        changes = diff_document(new, state)
+
+        assert [row["title"] for row in changes["main"]["updates"]] == ["Fight Club (1999)"]
+        genres = changes["genres_table"]
+        # Reordering alone is not a change; identities come from the child "id"
+        assert [row["_row_id"] for row in genres["updates"]] == ["550/18"]
+        assert [row["name"] for row in genres["inserts"]] == ["Crime"]
+        assert genres["deletes"] == []
+        assert len(changes["spoken_languages_table"]["deletes"]) == 1
+
+    def test_full_snapshot_deletes_missing_documents(self):
+        state = CdcState()
+        other = dict(copy.deepcopy(MOVIE), id=13, title="Forrest Gump")
+        diff_batch([copy.deepcopy(MOVIE), other], state)
+        changes = diff_batch([copy.deepcopy(MOVIE)], state, full_snapshot=True)
+        assert changes["main"]["deletes"] == ["13"]
+        assert "13" not in state
+
+    def test_diff_results(self):
+        before = normalize_json(copy.deepcopy(MOVIE), output_format="relational")
+        changed = copy.deepcopy(MOVIE)
+        changed["status"] = "Rumored"
+        after = normalize_json(changed, output_format="relational")
+        assert change_counts(diff_results(before, after)) == {"main": {"inserts": 0, "updates": 1, "deletes": 0}}
+
+    def test_failed_document_is_not_deleted_by_snapshot(self):
+        state = CdcState()
+        other = dict(copy.deepcopy(MOVIE), id=13, title="Forrest Gump")
+        diff_batch([copy.deepcopy(MOVIE), other], state)
+        broken = {"id": 13, "genres": [{"id": 1}, 5]}
+        changes = diff_batch([copy.deepcopy(MOVIE), broken], state, full_snapshot=True)
+        assert changes == {} and "13" in state
+        # Without a readable key, the snapshot emits no deletes at all
+        changes = diff_batch([copy.deepcopy(MOVIE), b"{broken"], state, full_snapshot=True)
+        assert changes == {} and "13" in state
+
+    def test_where_rejected_documents_are_skipped(self):
+        state = CdcState()
+        rumored = dict(copy.deepcopy(MOVIE), id=13, status="Rumored")
+        changes = diff_batch([copy.deepcopy(MOVIE), rumored], state, where={"status": "Released"})
+        assert change_counts(changes)["main"]["inserts"] == 1
+        assert "13" not in state
+
+    def test_document_without_key_is_isolated(self):
+        state = CdcState()
+        other = dict(copy.deepcopy(MOVIE), id=13, title="Forrest Gump")
+        diff_batch([copy.deepcopy(MOVIE), other], state)
+        changed = dict(copy.deepcopy(MOVIE), title="Fight Club (1999)")
+        keyless = {"title": "No key"}
+        changes = diff_batch([keyless, changed], state, full_snapshot=True)
+        assert change_counts(changes) == {"main": {"inserts": 0, "updates": 1, "deletes": 0}}
+        assert "13" in state
+
+        quarantine = Quarantine()
+        changes = diff_batch([copy.deepcopy(MOVIE), keyless, copy.deepcopy(other)], state, quarantine=quarantine)
+        assert change_counts(changes)["main"]["updates"] == 1
+        assert [(record["index"], record["error_type"]) for record in quarantine] == [(1, "SchemaValidationError")]
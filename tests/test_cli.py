@@ -0,0 +1,73 @@
+import csv
+import gzip
+import json
+
+from extensions.cli import main
+
+
+DOCS = [
+    {"id": 550, "title": "Fight Club", "genres": [{"id": 18, "name": "Drama"}]},
+    {"id": 13, "title": "Forrest Gump", "genres": [{"id": 35, "name": "Comedy"}, {"id": 18, "name": "Drama"}]},
+    {"id": 680, "title": "Pulp Fiction", "genres": []},
+]
+
+
+def read_csv(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def write_gzip(path, docs, extra=()):
+    with gzip.open(path, "wt") as f:
+        for doc in docs:
+            f.write(json.dumps(doc) + "\n")
+        for line in extra:
+            f.write(line + "\n")
+
+
+class TestCli:
+    def test_gzip_input_to_csv(self, tmp_path, capsys):
+        source = tmp_path / "movies.ndjson.gz"
+        write_gzip(source, DOCS)
+        assert main([str(source), "-o", str(tmp_path / "out"), "--chunk-size", "2"]) == 0
+        main_rows = read_csv(tmp_path / "out" / "main.csv")
+        assert [row["id"] for row in main_rows] == ["550", "13", "680"]
+        assert len(read_csv(tmp_path / "out" / "genres_table.csv")) == 3
+        summary = capsys.readouterr().err
+        assert "documents: 3" in summary and "docs/s" in summary and "MB/s" in summary
+
+    def test_workers_keep_order_and_quarantine_failures(self, tmp_path):
+        source = tmp_path / "movies.ndjson.gz"
+        docs = [dict(DOCS[0], id=i) for i in range(20)]
+        write_gzip(source, docs, extra=["{broken"])
+        quarantine = tmp_path / "failed.ndjson"
+        code = main([str(source), "-o", str(tmp_path / "out"), "--workers", "2", "--chunk-size", "3",
+                     "--quarantine", str(quarantine), "--quiet"])
+        assert code == 1
+        assert [row["id"] for row in read_csv(tmp_path / "out" / "main.csv")] == [str(i) for i in range(20)]
+        record = json.loads(quarantine.read_text())
+        assert record["index"] == 20 and record["error_type"] == "JSONDecodeError"
+
+    def test_where_filter(self, tmp_path):
+        source = tmp_path / "movies.ndjson"
+        source.write_text("".join(json.dumps(doc) + "\n" for doc in DOCS))
+        main([str(source), "-o", str(tmp_path / "out"), "--where", '{"id": {"$gt": 100}}', "--quiet"])
+        assert [row["id"] for row in read_csv(tmp_path / "out" / "main.csv")] == ["550", "680"]
+
+    def test_column_profile_merged_across_workers(self, tmp_path):
+        source = tmp_path / "movies.ndjson"
+        source.write_text("".join(json.dumps(dict(DOCS[i % 3], id=i)) + "\n" for i in range(30)))
+        profile_path = tmp_path / "profile.json"
+        main([str(source), "-o", str(tmp_path / "out"), "--workers", "2", "--chunk-size", "4",
+              "--column-profile", str(profile_path), "--quiet"])
+        profile = json.loads(profile_path.read_text())
+        assert profile["main"]["rows"] == 30
+        assert profile["main"]["columns"]["id"]["min"] == 0 and profile["main"]["columns"]["id"]["max"] == 29
+        assert profile["genres_table"]["columns"]["name"]["top"][0] == ["Drama", 20]
+
+    def test_auto_chunk_size(self, tmp_path, capsys):
+        source = tmp_path / "movies.ndjson"
+        source.write_text("".join(json.dumps(dict(DOCS[i % 3], id=i)) + "\n" for i in range(50)))
+        assert main([str(source), "-o", str(tmp_path / "out"), "--chunk-size", "auto"]) == 0
+        assert len(read_csv(tmp_path / "out" / "main.csv")) == 50
+        assert "adaptive chunk size" in capsys.readouterr().err
@@ -0,0 +1,103 @@
+import pytest
+
+from core.transformer import normalize_batch, normalize_json
+from utils.data_profile import DataProfile
+from utils.sketches import CountMinSketch, HyperLogLog, stable_hash
+
+
+DOCS = [
+    {"id": i, "status": "Released" if i % 4 else "Rumored", "budget": None if i % 5 == 0 else i * 1.5,
+     "genres": [{"id": 18, "name": "Drama"}] + ([{"id": 35, "name": "Comedy"}] if i % 2 else [])}
+    for i in range(200)
+]
+
+
+class TestSketches:
+    def test_stable_hash_keeps_types_apart(self):
+        assert stable_hash("1") != stable_hash(1)
+        assert stable_hash("movie") == stable_hash("movie")
+        assert len({stable_hash(v) for v in (1, 1.0, True)}) == 3
+        assert stable_hash(-1) != stable_hash(-2)
+        assert stable_hash(2 ** 64 + 1) != stable_hash(1)
+        assert stable_hash(0.1) == stable_hash(0.1) != stable_hash(0.30000000000000004 - 0.2)
+
+    def test_hyperloglog_estimate_and_merge(self):
+        left, right = HyperLogLog(), HyperLogLog()
+        for i in range(20000):
+            left.add(f"user-{i}")
+            right.add(f"user-{i + 10000}")
+        assert abs(left.estimate() - 20000) < 20000 * 0.05
+        assert abs(left.merge(right).estimate() - 30000) < 30000 * 0.05
+
+    def test_hyperloglog_precision_must_match(self):
+        with pytest.raises(ValueError):
+            HyperLogLog(10).merge(HyperLogLog(12))
+
+    def test_count_min_heavy_hitters(self):
+        sketch = CountMinSketch(top_k=3)
+        for i in range(5000):
+            sketch.add(f"rare-{i}")
+        for value, count in (("a", 500), ("b", 300), ("c", 200)):
+            sketch.add(value, count)
+        assert [value for value, _ in sketch.top()] == ["a", "b", "c"]
+        assert sketch.estimate("a") >= 500
+
+    def test_count_min_merge_adds_counts(self):
+        left, right = CountMinSketch(top_k=2), CountMinSketch(top_k=2)
+        left.add("x", 10)
+        right.add("x", 5)
+        right.add("y", 7)
+        left.merge(right)
+        assert left.total == 22
+        assert left.top() == [("x", 15), ("y", 7)]
+
+
+class TestDataProfile:
+    def test_batch_profile(self):
+        profile = DataProfile()
+        normalize_batch(DOCS, data_profile=profile)
+        tables = profile.to_dict()
+        budget = tables["main"]["columns"]["budget"]
+        assert tables["main"]["rows"] == 200
+        assert budget["nulls"] == 40 and budget["non_null"] == 160
+        assert budget["min"] == 1.5 and budget["max"] == 199 * 1.5
+        assert budget["types"] == {"float": 160}
+        assert tables["main"]["columns"]["status"]["top"] == [["Released", 150], ["Rumored", 50]]
+        assert abs(tables["main"]["columns"]["id"]["distinct"] - 200) <= 10
+        assert tables["genres_table"]["columns"]["name"]["distinct"] == 2
+
+    def test_chunk_profiles_merge_to_batch_profile(self):
+        whole, first, second = DataProfile(), DataProfile(), DataProfile()
+        normalize_batch(DOCS, data_profile=whole)
+        normalize_batch(DOCS[:77], data_profile=first)
+        normalize_batch(DOCS[77:], data_profile=second)
+        assert first.merge(second).to_dict() == whole.to_dict()
+
+    def test_normalize_json_profiles_each_call(self):
+        profile = DataProfile()
+        for doc in DOCS[:10]:
+            normalize_json(doc, data_profile=profile)
+        assert profile.to_dict()["main"]["rows"] == 10
+
+    def test_merge_needs_same_sketch_options(self):
+        with pytest.raises(ValueError):
+            DataProfile(top_k=5).merge(DataProfile())
+
+    def test_equal_values_of_different_types_stay_apart(self):
+        profile = DataProfile()
+        profile.update_table("t", [{"v": value} for value in (1, 1.0, True, "1", 1)])
+        column = profile.to_dict()["t"]["columns"]["v"]
+        assert column["distinct"] == 4
+        assert sorted(map(repr, column["top"])) == ["['1', 1]", "[1, 2]", "[1.0, 1]", "[True, 1]"]
+
+    def test_merge_copies_new_tables_and_columns(self):
+        merged, worker, other = DataProfile(), DataProfile(), DataProfile()
+        worker.update_table("t", [{"a": 1}])
+        other.update_table("t", [{"a": 2, "b": 3}])
+        merged.merge(worker)
+        merged.merge(other)
+        assert worker.to_dict()["t"]["rows"] == 1
+        assert worker.to_dict()["t"]["columns"]["a"]["non_null"] == 1
+        merged.update_table("t", [{"b": 4}])
+        assert other.to_dict()["t"]["columns"]["b"]["non_null"] == 1
+        assert merged.to_dict()["t"]["columns"]["b"]["non_null"] == 2
@@ -0,0 +1,74 @@
+import json
+import mmap
+
+import pytest
+
+from core.transformer import normalize_batch, normalize_json
+from utils.error_handler import Quarantine
+from utils.decoding import decode_json, loads
+from utils.metrics import NormalizeMetrics
+
+
+DOC = {"id": 550, "title": "Fight Club", "genres": [{"id": 18, "name": "Drama"}]}
+RAW = json.dumps(DOC).encode()
+
+
+class TestDecoding:
+    def test_buffer_types(self, tmp_path):
+        path = tmp_path / "doc.json"
+        path.write_bytes(RAW)
+        assert loads(RAW) == DOC
+        assert loads(memoryview(RAW)) == DOC
+        assert decode_json(bytearray(RAW)) == DOC
+        assert decode_json(path) == DOC
+        assert decode_json(str(path)) == DOC
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            assert decode_json(mapped) == DOC
+        assert decode_json(DOC) is DOC
+
+    def test_normalize_raw_input_matches_decoded(self, tmp_path):
+        expected = normalize_json(json.loads(RAW), output_format="relational")
+        assert normalize_json(RAW, output_format="relational") == expected
+        assert normalize_json(memoryview(RAW), output_format="relational") == expected
+
+    def test_json_array_file_is_a_batch(self, tmp_path):
+        path = tmp_path / "docs.json"
+        path.write_text(json.dumps([DOC, dict(DOC, id=551)]))
+        result = normalize_json(path, output_format="relational")
+        assert [row["id"] for row in result["main"]] == [550, 551]
+
+    def test_metrics_report_decode_separately(self):
+        metrics = NormalizeMetrics()
+        lines = [RAW, json.dumps(dict(DOC, id=2)).encode()]
+        normalize_batch(lines, metrics=metrics, where={"id": {"$gt": 100}})
+        assert metrics.counters["documents"] == 1
+        assert metrics.counters["documents_rejected"] == 1
+        assert metrics.counters["bytes_decoded"] == sum(len(line) for line in lines)
+        assert metrics.calls["decode"] == 2
+        assert {"flatten", "relations", "nulls", "keys", "output"} <= set(metrics.timings)
+
+    def test_raw_single_object_is_a_batch_of_one(self, tmp_path):
+        result = normalize_batch(b'{"id": 1, "a": 2}', output_format="relational")
+        assert result["main"] == [{"id": 1, "a": 2}]
+        path = tmp_path / "doc.json"
+        path.write_bytes(RAW)
+        assert [row["id"] for row in normalize_batch(path, output_format="relational")["main"]] == [550]
+
+    def test_str_items_are_not_file_paths(self, tmp_path):
+        path = tmp_path / "doc.json"
+        path.write_bytes(RAW)
+        with pytest.raises(TypeError, match="pathlib.Path"):
+            normalize_batch([str(path)], output_format="relational")
+        quarantine = Quarantine()
+        result = normalize_batch([str(path), path], output_format="relational", quarantine=quarantine)
+        assert [row["id"] for row in result["main"]] == [550]
+        assert len(quarantine) == 1
+
+    def test_str_input_is_not_a_file_path(self, tmp_path, monkeypatch):
+        (tmp_path / "doc.json").write_bytes(RAW)
+        monkeypatch.chdir(tmp_path)
+        with pytest.raises(TypeError, match="pathlib.Path"):
+            normalize_json("doc.json", output_format="relational", raise_errors=True)
+        assert normalize_json('{"id": 1}', output_format="relational") == []
+        with pytest.raises(TypeError):
+            normalize_batch("doc.json", output_format="relational")
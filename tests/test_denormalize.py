@@ -0,0 +1,72 @@
+import copy
+
+import pytest
+
+from core.denormalize import denormalize, iter_denormalize
+from core.transformer import normalize_batch, normalize_json
+from utils.error_handler import SchemaValidationError
+
+
+MOVIES = [
+    {
+        "id": 550,
+        "title": "Fight Club",
+        "collection": {"id": 10, "name": "Fincher"},
+        "genres": [{"id": 18, "name": "Drama"}],
+        "credits": {"cast": [{"name": "Brad Pitt", "roles": [{"name": "Tyler"}, {"name": "Narrator"}]}]},
+    },
+    {"id": 13, "title": "Forrest Gump", "genres": [{"id": 35, "name": "Comedy"}, {"id": 18, "name": "Drama"}]},
+    {"id": 680, "title": "Pulp Fiction", "credits": {"cast": [{"name": "Uma Thurman"}]}},
+]
+
+
+class TestDenormalize:
+    def test_single_document_round_trip(self):
+        result = normalize_json(copy.deepcopy(MOVIES[0]), output_format="relational", key_convention="keep")
+        assert denormalize(result) == [MOVIES[0]]
+
+    def test_batch_round_trip_with_root_fk(self):
+        result = normalize_batch(copy.deepcopy(MOVIES), key_convention="keep", root_fk="_root")
+        assert all(row["_root"] == 550 for row in result["relations"]["credits.cast_roles_table"])
+        assert denormalize(result, root_fk="_root") == MOVIES
+
+    def test_batch_needs_root_fk(self):
+        result = normalize_batch(copy.deepcopy(MOVIES), key_convention="keep")
+        with pytest.raises(SchemaValidationError):
+            denormalize(result)
+
+    def test_streaming_reassembly(self):
+        result = normalize_batch(copy.deepcopy(MOVIES), key_convention="keep", root_fk="_root")
+        documents = iter_denormalize(iter(result["main"]),
+                                     {name: iter(rows) for name, rows in result["relations"].items()},
+                                     root_fk="_root")
+        assert list(documents) == MOVIES
+
+    def test_streaming_rejects_unsorted_input(self):
+        result = normalize_batch(copy.deepcopy(MOVIES), key_convention="keep", root_fk="_root")
+        with pytest.raises(SchemaValidationError):
+            list(iter_denormalize(reversed(result["main"]), result["relations"], root_fk="_root"))
+
+    def test_prefix_sharing_sibling_arrays(self):
+        movies = [
+            {"id": 1, "genres": [{"name": "Drama", "tags": [{"tag": "a"}]}], "genres_extra": [{"name": "Noir"}]},
+            {"id": 2, "genres": [{"name": "Comedy"}], "genres_extra": [{"name": "Satire"}, {"name": "Farce"}]},
+        ]
+        result = normalize_batch(copy.deepcopy(movies), key_convention="keep", root_fk="_root")
+        assert result.parent_table("genres_extra_table") == "main"
+        assert result.parent_table("genres_tags_table") == "genres_table"
+        assert denormalize(result, root_fk="_root") == movies
+        documents = iter_denormalize(result["main"], result["relations"], root_fk="_root")
+        assert list(documents) == movies
+
+    def test_colliding_table_names_raise(self):
+        movies = [
+            {"id": 1, "genres": [{"name": "Drama", "extra": [{"tag": "a"}]}], "genres_extra": [{"name": "Noir"}]},
+            {"id": 2, "genres": [{"name": "Comedy"}], "genres_extra": [{"name": "Satire"}]},
+        ]
+        result = normalize_batch(copy.deepcopy(movies), key_convention="keep", root_fk="_root")
+        assert len(result["relations"]["genres_extra_table"]) == 3
+        with pytest.raises(ValueError, match="genres_extra_table"):
+            denormalize(result, root_fk="_root")
+        with pytest.raises(ValueError, match="genres_extra_table"):
+            list(iter_denormalize(result["main"], result["relations"], root_fk="_root"))
@@ -0,0 +1,47 @@
+import copy
+
+from core.null_handler import normalize_nulls
+from core.relation import extract_child_table, extract_junction_table, extract_nested_relations
+from core.transformer import normalize_json
+
+
+MOVIE = {
+    "id": 550,
+    "title": "Fight Club",
+    "tagline": None,
+    "genres": [{"id": 18, "name": "Drama"}, {"id": 53, "name": "Thriller"}],
+    "keywords": [],
+    "videos": {"results": [{"key": "abc", "tags": [{"t": 1}]}]},
+}
+
+
+class TestInplaceMode:
+    def test_normalize_nulls_matches_copying_mode(self):
+        data = [{"a": None, "b": {}, "c": [1, None, {}, []]}, {}, []]
+        expected = normalize_nulls(copy.deepcopy(data), replace_null=True, null_value="N/A")
+        result = normalize_nulls(data, replace_null=True, null_value="N/A", inplace=True)
+        assert result == expected
+        assert result is data
+
+    def test_extract_nested_relations_reuses_children(self):
+        obj = copy.deepcopy(MOVIE)
+        first_genre = obj["genres"][0]
+        expected = extract_nested_relations(copy.deepcopy(MOVIE))
+        result = extract_nested_relations(obj, inplace=True)
+        assert result == expected
+        assert result["main"] is obj
+        assert result["relations"]["genres_table"][0] is first_genre
+
+    def test_child_and_junction_tables_drop_field_in_place(self):
+        parent = {"id": 1, "orders": [{"order_id": 100}], "tags": [1, 2]}
+        child = extract_child_table(parent, "orders", "user_id", inplace=True)
+        junction = extract_junction_table(child["main"], "tags", "user_id", "tag_id", inplace=True)
+        assert junction["main"] is parent
+        assert parent == {"id": 1}
+        assert child["child"] == [{"order_id": 100, "user_id": 1}]
+        assert junction["junction"] == [{"user_id": 1, "tag_id": 1}, {"user_id": 1, "tag_id": 2}]
+
+    def test_normalize_json_same_output(self):
+        kwargs = dict(output_format="relational", schema={"id": "str"}, null_value="N/A")
+        expected = normalize_json(copy.deepcopy(MOVIE), **kwargs)
+        assert normalize_json(copy.deepcopy(MOVIE), inplace=True, **kwargs) == expected
@@ -0,0 +1,83 @@
+from extensions.integration import build_projection, iter_documents, normalize_collection
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.documents)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCollection:
+    """In-process stand-in for a pymongo collection supporting top-level projections."""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.calls = []
+        self.cursor = None
+
+    def find(self, filter=None, projection=None, batch_size=0):
+        self.calls.append({"filter": filter, "projection": projection, "batch_size": batch_size})
+        # Operators are left to the local where check: the fake returns a superset
+        matched = [d for d in self.documents
+                   if all(d.get(k) == v for k, v in (filter or {}).items() if not k.startswith("$"))]
+        if projection:
+            keep = {path.split(".")[0] for path, flag in projection.items() if flag}
+            matched = [{k: v for k, v in d.items() if k in keep} for d in matched]
+        self.cursor = FakeCursor(matched)
+        return self.cursor
+
+
+DOCS = [
+    {"_id": i, "id": i, "title": "T%d" % i, "status": "Released" if i % 2 else "Rumored",
+     "overview": "x" * 10, "genres": [{"id": 18, "name": "Drama"}]}
+    for i in range(5)
+]
+
+
+class TestMongoIntegration:
+    def test_build_projection_drops_overlapping_paths(self):
+        assert build_projection(["genres.name", "genres", "title"]) == {"genres": 1, "title": 1, "_id": 0}
+        assert build_projection(["_id", "id"]) == {"_id": 1, "id": 1}
+        assert build_projection(None) is None
+
+    def test_iter_documents_uses_batched_cursor(self):
+        collection = FakeCollection(DOCS)
+        documents = list(iter_documents(collection, {"status": "Released"}, ["id"], batch_size=2))
+        assert documents == [{"id": 1}, {"id": 3}]
+        assert collection.calls == [{"filter": {"status": "Released"},
+                                     "projection": {"id": 1, "_id": 0}, "batch_size": 2}]
+        assert collection.cursor.closed
+
+    def test_normalize_collection_batches(self):
+        collection = FakeCollection(DOCS)
+        batches = list(normalize_collection(collection, paths=["id", "title", "genres"],
+                                            batch_size=2, inplace=True))
+        assert [len(batch["main"]) for batch in batches] == [2, 2, 1]
+        assert batches[0]["main"][0] == {"id": 0, "title": "T0"}
+        assert len(batches[0]["relations"]["genres_table"]) == 2
+
+    def test_normalize_collection_fetches_where_fields_with_paths(self):
+        collection = FakeCollection(DOCS)
+        batches = list(normalize_collection(collection, paths=["id", "title"], where={"status": "Released"}))
+        assert [row["id"] for row in batches[0]["main"]] == [1, 3]
+        assert collection.calls[0]["projection"] == {"id": 1, "status": 1, "title": 1, "_id": 0}
+
+    def test_predicate_paths_expand_logical_operators(self):
+        from core.predicate import predicate_paths
+        where = {"status": "Released", "$or": [{"vote_count": {"$gt": 10}}, {"$and": [{"genres.name": "Drama"}]}]}
+        assert predicate_paths(where) == ["status", "vote_count", "genres.name"]
+
+    def test_normalize_collection_logical_operators(self):
+        where = {"$or": [{"status": "Rumored"}, {"id": {"$gt": 3}}], "$nor": [{"id": 0}],
+                 "$and": [{"genres.name": "Drama"}]}
+        collection = FakeCollection(DOCS)
+        batches = list(normalize_collection(collection, paths=["id"], where=where))
+        assert [row["id"] for row in batches[0]["main"]] == [2, 4]
+        assert collection.calls[0]["filter"] == where
+        assert collection.calls[0]["projection"] == {"genres.name": 1, "id": 1, "status": 1, "_id": 0}
@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _loaded_after(cwd, code):
+    probe = f"import sys\n{code}\nprint(','.join(m for m in ('pandas', 'pyarrow') if m in sys.modules))"
+    return subprocess.run([sys.executable, "-c", probe], cwd=cwd, capture_output=True,
+                          text=True, check=True).stdout.strip().splitlines()[-1:] or [""]
+
+
+class TestLazyImport:
+    def test_package_import_loads_no_optional_dependency(self):
+        package = os.path.basename(ROOT)
+        assert _loaded_after(os.path.dirname(ROOT), f"import {package}") == [""]
+
+    def test_relational_output_does_not_need_pandas(self):
+        code = "from core.transformer import normalize_json\nnormalize_json({'a': 1}, output_format='relational')"
+        assert _loaded_after(ROOT, code) == [""]
+
+    def test_public_api_resolves_lazily(self):
+        package = os.path.basename(ROOT)
+        code = f"import {package} as p\nassert callable(p.normalize_json) and 'normalize_stream' in dir(p)"
+        _loaded_after(os.path.dirname(ROOT), code)
@@ -0,0 +1,54 @@
+import json
+import os
+
+from core.transformer import normalize_batch
+from extensions.ndjson import LineIndex, build_line_index, index_path_for, read_lines
+
+
+def write_ndjson(path, count):
+    lines = [json.dumps({"id": i, "title": "x" * (i % 7)}) for i in range(count)]
+    path.write_text("\n".join(lines) + "\n")
+    return [line.encode() for line in lines]
+
+
+class TestLineIndex:
+    def test_build_persist_and_read(self, tmp_path):
+        path = tmp_path / "docs.ndjson"
+        lines = write_ndjson(path, 50)
+        index = build_line_index(str(path))
+        assert os.path.exists(index_path_for(str(path)))
+        assert len(index) == 50
+        assert index.read(17) == lines[17]
+
+        loaded = LineIndex.load(str(path))
+        assert list(loaded.offsets) == list(index.offsets)
+        assert list(loaded.iter_lines(48)) == lines[48:]
+
+    def test_stale_index_is_rebuilt(self, tmp_path):
+        path = tmp_path / "docs.ndjson"
+        write_ndjson(path, 3)
+        build_line_index(str(path))
+        lines = write_ndjson(path, 5)
+        os.utime(path, ns=(1, 1))
+        assert list(read_lines(str(path), 3)) == lines[3:]
+
+    def test_shards_cover_all_lines_with_balanced_bytes(self, tmp_path):
+        path = tmp_path / "docs.ndjson"
+        lines = write_ndjson(path, 1000)
+        index = LineIndex.load(str(path))
+        shards = index.shards(4)
+        assert shards[0][0] == 0 and shards[-1][1] == 1000
+        assert all(a[1] == b[0] for a, b in zip(shards, shards[1:]))
+        sizes = [index.offsets[stop] - index.offsets[start] for start, stop in shards]
+        assert max(sizes) - min(sizes) < 2 * max(len(line) for line in lines)
+
+        result = normalize_batch(index.iter_lines(*shards[1]))
+        assert result["main"][0]["id"] == shards[1][0]
+
+    def test_sample_and_no_trailing_newline(self, tmp_path):
+        path = tmp_path / "docs.ndjson"
+        path.write_bytes(b'{"id": 1}\n\n{"id": 2}')
+        index = LineIndex.load(str(path))
+        assert len(index) == 3
+        assert list(index.iter_lines()) == [b'{"id": 1}', b'{"id": 2}']
+        assert sorted(index.sample(3, seed=1)) == [b"", b'{"id": 1}', b'{"id": 2}']
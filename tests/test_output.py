@@ -0,0 +1,178 @@
+import csv
+import os
+import sqlite3
+
+import pytest
+
+from core.transformer import normalize_batch
+from extensions.streaming import normalize_stream, stream_to_sink
+from utils.output import CsvSink, ParquetSink, PartitionedSink, SqliteSink, generate_ddl
+
+
+DOCS = [
+    {"id": 1, "title": "A", "genres": [{"id": 18, "name": "Drama"}]},
+    {"id": 2, "title": "B", "genres": [{"id": 53, "name": "Thriller", "slug": "thr"}], "budget": 10},
+]
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+class TestCsvSink:
+    def test_normalize_batch_concatenates_tables(self):
+        result = normalize_batch(DOCS)
+        assert [row["id"] for row in result["main"]] == [1, 2]
+        assert len(result["relations"]["genres_table"]) == 2
+
+    def test_stream_to_sink_widens_header(self, tmp_path):
+        counts = stream_to_sink(DOCS, CsvSink(str(tmp_path)), chunk_size=1)
+        assert counts == {"main": 2, "genres_table": 2}
+
+        main = read_csv(os.path.join(tmp_path, "main.csv"))
+        assert list(main[0].keys()) == ["id", "title", "budget"]
+        assert main[0]["budget"] is None
+        assert main[1]["budget"] == "10"
+
+        genres = read_csv(os.path.join(tmp_path, "genres_table.csv"))
+        assert [row["slug"] for row in genres] == [None, "thr"]
+
+    def test_nested_values_and_nulls(self, tmp_path):
+        with CsvSink(str(tmp_path)) as sink:
+            sink.write_rows("t", [{"a": None, "b": [1, 2], "c": {"x": "é"}}])
+        rows = read_csv(os.path.join(tmp_path, "t.csv"))
+        assert rows == [{"a": "", "b": "[1, 2]", "c": '{"x": "é"}'}]
+
+    def test_writing_after_close_appends(self, tmp_path):
+        sink = CsvSink(str(tmp_path))
+        sink.write_rows("t", [{"a": 1, "b": "é"}])
+        sink.close()
+        sink.write_rows("t", [{"a": 2, "c": 3}])
+        sink.close()
+        rows = read_csv(os.path.join(tmp_path, "t.csv"))
+        assert rows == [{"a": "1", "b": "é", "c": None}, {"a": "2", "b": "", "c": "3"}]
+        assert sink.tables["t"].size == os.path.getsize(os.path.join(tmp_path, "t.csv"))
+
+    def test_normalize_stream_yields_chunks(self):
+        chunks = list(normalize_stream(iter(DOCS), chunk_size=1))
+        assert [len(chunk["main"]) for chunk in chunks] == [1, 1]
+
+
+class TestParquetSink:
+    def test_declared_and_inferred_types(self, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        docs = [{"id": i, "score": i / 2, "release_date": "2020-01-0%d" % (i % 9 + 1),
+                 "genres": [{"id": i, "name": "Drama"}]} for i in range(5)]
+        sink = ParquetSink(str(tmp_path), schemas={"main": {"release_date": "date"}}, row_group_size=2)
+        with sink:
+            normalize_batch(docs[:3], sink=sink)
+            normalize_batch(docs[3:], sink=sink)
+
+        main = pq.ParquetFile(os.path.join(tmp_path, "main.parquet"))
+        assert main.metadata.num_rows == 5
+        assert main.metadata.num_row_groups == 3
+        types = {field.name: str(field.type) for field in main.schema_arrow}
+        assert types == {"release_date": "date32[day]", "id": "int64", "score": "double"}
+
+        genres = pq.read_table(os.path.join(tmp_path, "genres_table.parquet"))
+        assert genres.column("name").to_pylist() == ["Drama"] * 5
+        assert genres.column("parent_id").to_pylist()[0] == "genres_0"
+
+    def test_late_columns_roll_to_a_wider_file(self, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        with ParquetSink(str(tmp_path), row_group_size=1) as sink:
+            sink.write_rows("t", [{"a": 1}])
+            sink.write_rows("t", [{"a": 2, "b": "late"}])
+            sink.write_rows("t", [{"a": 3}])
+        assert sink.files()["t"] == [str(tmp_path / "t.parquet"), str(tmp_path / "t-00001.parquet")]
+        assert pq.read_table(tmp_path / "t.parquet").to_pylist() == [{"a": 1}]
+        assert pq.read_table(tmp_path / "t-00001.parquet").to_pylist() == [
+            {"a": 2, "b": "late"}, {"a": 3, "b": None}]
+        assert sink.row_counts() == {"t": 3}
+
+    def test_fractional_floats_widen_inferred_ints(self, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        with ParquetSink(str(tmp_path), schemas={"t": {"n": "int"}}, row_group_size=1) as sink:
+            sink.write_rows("t", [{"n": 1, "x": 1}])
+            sink.write_rows("t", [{"n": 2.7, "x": 2.5}])
+        widened = pq.read_table(tmp_path / "t-00001.parquet")
+        assert str(widened.schema.field("x").type) == "double"
+        assert widened.to_pylist() == [{"n": 2, "x": 2.5}]
+
+class TestPartitionedSink:
+    def test_value_partitions(self, tmp_path):
+        docs = [dict(DOCS[0], status="Released"), dict(DOCS[1], status="In/Production"), {"id": 3}]
+        with PartitionedSink(str(tmp_path), partition_by={"main": "status"}) as sink:
+            normalize_batch(docs, sink=sink, root_fk="_root")
+        assert sorted(os.listdir(tmp_path / "main")) == [
+            "status=In%2FProduction", "status=Released", "status=__HIVE_DEFAULT_PARTITION__"]
+        released = read_csv(tmp_path / "main" / "status=Released" / "part-00000.csv")
+        assert [row["id"] for row in released] == ["1"]
+        assert os.listdir(tmp_path / "genres_table") == ["part-00000.csv"]
+
+    def test_hash_buckets_align_tables_and_roll_files(self, tmp_path):
+        docs = [{"id": i, "title": "x" * 50, "genres": [{"id": i % 3}]} for i in range(200)]
+        sink = PartitionedSink(str(tmp_path), partition_by={"main": "id", "*": "_root"}, buckets=4,
+                               max_file_bytes=512)
+        with sink:
+            stream_to_sink(docs, sink, chunk_size=10, root_fk="_root")
+        assert sink.row_counts() == {"main": 200, "genres_table": 200}
+        assert sorted(os.listdir(tmp_path / "main")) == [f"bucket={n}" for n in range(4)]
+        for n in range(4):
+            ids = {row["id"] for path in sorted((tmp_path / "main" / f"bucket={n}").iterdir())
+                   for row in read_csv(path)}
+            roots = {row["_root"] for path in (tmp_path / "genres_table" / f"bucket={n}").iterdir()
+                     for row in read_csv(path)}
+            assert ids == roots
+        assert len(os.listdir(tmp_path / "main" / "bucket=0")) > 1
+        assert len(sink.files()["main"]) == sum(len(files) for _, _, files in os.walk(tmp_path / "main"))
+
+    def test_parquet_partitions(self, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        with PartitionedSink(str(tmp_path), "parquet", partition_by="id", buckets=2) as sink:
+            normalize_batch(DOCS, sink=sink)
+        table = pq.read_table(str(tmp_path / "main"))
+        assert sorted(table.column("id").to_pylist()) == [1, 2]
+
+
+class TestSqliteSink:
+    def test_ddl_indexes_fk_columns(self):
+        statements = generate_ddl("genres_table", {"id": "int", "name": "str", "parent_id": "str"},
+                                  fk_columns=["parent_id"])
+        assert statements == [
+            'CREATE TABLE IF NOT EXISTS "genres_table" ("id" INTEGER, "name" TEXT, "parent_id" TEXT)',
+            'CREATE INDEX IF NOT EXISTS "idx_genres_table_parent_id" ON "genres_table" ("parent_id")',
+        ]
+
+    def test_bulk_load_with_schema_evolution(self, tmp_path):
+        path = str(tmp_path / "out.db")
+        sink = SqliteSink(path, schemas={"main": {"id": "int"}}, batch_size=1)
+        counts = stream_to_sink(DOCS, sink, chunk_size=1)
+        assert counts == {"main": 2, "genres_table": 2}
+
+        connection = sqlite3.connect(path)
+        assert connection.execute('SELECT id, title, budget FROM main ORDER BY id').fetchall() == [
+            (1, "A", None), (2, "B", 10)]
+        assert connection.execute('SELECT slug FROM genres_table').fetchall() == [(None,), ("thr",)]
+        indexes = [row[1] for row in connection.execute("PRAGMA index_list(genres_table)")]
+        assert indexes == ["idx_genres_table_parent_id"]
+
+        stats = sink.stats()
+        assert stats["total"]["rows"] == 4
+        assert stats["main"]["rows_per_second"] > 0
+
+    def test_failed_flush_keeps_rows_and_schema(self, tmp_path):
+        path = str(tmp_path / "out.db")
+        sink = SqliteSink(path)
+        rows = [{"id": 1}, {"id": 2, "big": 2 ** 70}]
+        sink.write_rows("main", rows)
+        with pytest.raises(OverflowError):
+            sink.flush()
+        assert sink.tables["main"].rows == rows
+        assert sink.tables["main"].columns == {}
+
+        rows[1]["big"] = 3
+        sink.close()
+        connection = sqlite3.connect(path)
+        assert connection.execute("SELECT id, big FROM main ORDER BY id").fetchall() == [(1, None), (2, 3)]
@@ -0,0 +1,55 @@
+import pytest
+
+from core.predicate import compile_predicate
+from core.transformer import normalize_batch, normalize_json
+
+
+DOCS = [
+    {"id": 1, "status": "Released", "vote_count": 500, "genres": [{"name": "Drama"}]},
+    {"id": 2, "status": "Rumored", "vote_count": 5, "genres": [{"name": "Comedy"}]},
+    {"id": 3, "status": "Released", "vote_count": 50, "genres": []},
+]
+
+
+class TestWherePredicate:
+    def test_operators(self):
+        assert compile_predicate({"status": "Released"})(DOCS[0])
+        assert not compile_predicate({"vote_count": {"$gt": 100}})(DOCS[2])
+        assert compile_predicate({"vote_count": {"$gte": 5, "$lt": 51}})(DOCS[1])
+        assert compile_predicate({"genres.name": {"$in": ["Comedy", "Horror"]}})(DOCS[1])
+        assert compile_predicate({"budget": {"$exists": False}})(DOCS[0])
+        assert not compile_predicate({"status": {"$gt": 3}})(DOCS[0])
+        assert compile_predicate(None) is None
+
+    def test_only_referenced_paths_are_read(self):
+        class Untouchable(dict):
+            def __getitem__(self, key):
+                raise AssertionError("unreferenced field was read")
+
+        doc = {"status": "Released", "credits": Untouchable(cast=[])}
+        assert compile_predicate({"status": "Released"})(doc)
+
+    def test_rejected_document_yields_empty_tables(self):
+        result = normalize_json(DOCS[1], output_format="relational", where={"status": "Released"})
+        assert result == {"main": [], "relations": {}}
+
+    def test_batch_filtering(self):
+        result = normalize_batch(DOCS, where=lambda doc: doc["vote_count"] > 10)
+        assert [row["id"] for row in result["main"]] == [1, 3]
+        assert [row["name"] for row in result["relations"]["genres_table"]] == ["Drama"]
+
+    def test_logical_operators(self):
+        released_or_popular = {"$or": [{"status": "Released"}, {"vote_count": {"$gt": 100}}]}
+        assert compile_predicate(released_or_popular)({"status": "Released", "vote_count": 5})
+        assert not compile_predicate(released_or_popular)(DOCS[1])
+        assert compile_predicate({"$and": [{"status": "Released"}, {"vote_count": {"$lt": 100}}]})(DOCS[2])
+        assert not compile_predicate({"$nor": [{"status": "Rumored"}, {"id": 3}]})(DOCS[2])
+        for where, ids in ((released_or_popular, [1, 3]),
+                           ({"$and": [{"status": "Released"}, {"vote_count": {"$lt": 100}}]}, [3]),
+                           ({"$nor": [{"status": "Rumored"}, {"id": 3}]}, [1])):
+            rows = [row for doc in DOCS for row in normalize_json(doc, output_format="relational", where=where)["main"]]
+            assert [row["id"] for row in rows] == ids
+        with pytest.raises(ValueError):
+            compile_predicate({"$where": "this.id > 1"})
+        with pytest.raises(ValueError):
+            compile_predicate({"$or": []})
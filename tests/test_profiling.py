@@ -0,0 +1,44 @@
+import tracemalloc
+
+from core.transformer import normalize_batch, normalize_json
+from utils.metrics import NormalizeMetrics
+from utils.profiling import MemoryProfiler
+
+
+DOC = {
+    "id": 550,
+    "title": "Fight Club",
+    "genres": [{"id": 18, "name": "Drama"}, {"id": 53, "name": "Thriller"}],
+    "videos": {"results": [{"key": "SUXWAEX2jlg", "type": "Trailer"}]},
+}
+
+
+class TestMemoryProfiling:
+    def test_report_alongside_output(self):
+        expected = normalize_json(DOC, output_format="relational")
+        output, report = normalize_json(DOC, output_format="relational", profile_memory=True)
+        assert output == expected
+        assert report["peak_bytes"] > 0
+        for name in ("flatten", "relations", "nulls", "keys", "output"):
+            stage = report["stages"][name]
+            assert stage["calls"] == 1
+            assert stage["peak_bytes"] >= 0
+        assert report["tables"]["genres_table"]["rows"] == 2
+        assert report["tables"]["genres_table"]["retained_bytes"] > 0
+        assert not tracemalloc.is_tracing()
+
+    def test_batch_sites_and_metrics(self):
+        metrics = NormalizeMetrics()
+        output, report = normalize_batch([DOC, DOC], profile_memory=True, metrics=metrics)
+        assert len(output["main"]) == 2
+        assert report["stages"]["relations"]["calls"] == 2
+        assert report["tables"]["main"]["rows"] == 2
+        sites = report["stages"]["relations"]["sites"]
+        assert all(":" in site["site"] and site["size_diff"] > 0 for site in sites)
+        assert metrics.calls["flatten"] == 2
+
+    def test_profiler_without_tracing_only_times(self):
+        profiler = MemoryProfiler()
+        normalize_json(DOC, output_format="relational", metrics=profiler)
+        assert profiler.timings["flatten"] >= 0
+        assert profiler.memory == {}
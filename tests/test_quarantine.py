@@ -0,0 +1,33 @@
+import json
+
+from core.transformer import normalize_batch
+from extensions.streaming import normalize_stream
+from utils.error_handler import Quarantine
+from utils.metrics import NormalizeMetrics
+
+
+GOOD = {"id": 550, "title": "Fight Club", "genres": [{"id": 18, "name": "Drama"}]}
+
+
+class TestQuarantine:
+    def test_bad_document_is_quarantined(self, tmp_path):
+        quarantine = Quarantine(tmp_path / "failed.ndjson")
+        metrics = NormalizeMetrics()
+        docs = [dict(GOOD), b"{not json", dict(GOOD, id=13)]
+        result = normalize_batch(docs, quarantine=quarantine, metrics=metrics)
+        assert [row["id"] for row in result["main"]] == [550, 13]
+        assert len(result["relations"]["genres_table"]) == 2
+        assert quarantine.summary()["indexes"] == [1]
+        assert metrics.counters["documents_failed"] == 1
+        lines = (tmp_path / "failed.ndjson").read_text().splitlines()
+        record = json.loads(lines[0])
+        assert record["index"] == 1 and record["document"] == "{not json"
+
+    def test_stream_indexes_span_chunks(self):
+        quarantine = Quarantine(keep_documents=False)
+        docs = [dict(GOOD, id=i) for i in range(5)]
+        docs[3] = b"[1, 2"
+        chunks = list(normalize_stream(docs, chunk_size=2, quarantine=quarantine))
+        assert sum(len(chunk["main"]) for chunk in chunks) == 4
+        assert [record["index"] for record in quarantine] == [3]
+        assert quarantine.records[0]["document"] is None
@@ -0,0 +1,67 @@
+import copy
+import pickle
+
+import pytest
+
+from core.relational import RelationalResult
+from core.transformer import normalize_batch, normalize_json
+from utils.error_handler import SchemaValidationError
+
+
+MOVIES = [
+    {
+        "id": 550,
+        "title": "Fight Club",
+        "genres": [{"id": 18, "name": "Drama"}],
+        "credits": {"cast": [{"name": "Brad Pitt", "roles": [{"name": "Tyler"}, {"name": "Narrator"}]}]},
+    },
+    {"id": 13, "title": "Forrest Gump", "genres": [{"id": 35, "name": "Comedy"}, {"id": 18, "name": "Drama"}]},
+]
+
+
+@pytest.fixture
+def result():
+    return normalize_batch(copy.deepcopy(MOVIES), root_fk="_root")
+
+
+class TestRelationalResult:
+    def test_still_a_dict(self, result):
+        assert isinstance(result, RelationalResult)
+        assert set(result) == {"main", "relations"}
+        assert pickle.loads(pickle.dumps(result)) == result
+
+    def test_children_and_parent(self, result):
+        gump = result["main"][1]
+        genres = result.children_of("genres_table", gump)
+        assert [row["name"] for row in genres] == ["Comedy", "Drama"]
+        assert result.children_of("genres_table", 13) == genres
+        assert result.parent_of("genres_table", genres[0]) is gump
+
+        cast = result.children_of("credits.cast_table", result["main"][0])
+        roles = result.children_of("credits.cast_roles_table", cast[0])
+        assert [row["name"] for row in roles] == ["Tyler", "Narrator"]
+        assert result.parent_of("credits.cast_roles_table", roles[1]) is cast[0]
+        assert result.parent_table("credits.cast_roles_table") == "credits.cast_table"
+
+    def test_indexes_are_built_once(self, result):
+        index = result.index("genres_table", "id")
+        assert len(index[18]) == 2
+        assert result.index("genres_table", "id") is index
+        assert [row["_root"] for row in result.lookup("genres_table", "id", 18)] == [550, 13]
+
+    def test_joins(self, result):
+        joined = result.join("main", "genres_table")
+        assert [(row["title"], row["name"]) for row in joined] == [
+            ("Fight Club", "Drama"), ("Forrest Gump", "Comedy"), ("Forrest Gump", "Drama")]
+        assert joined[0]["genres_table.id"] == 18
+        left = result.join("main", "credits.cast_table", how="left")
+        assert len(left) == 2 and "credits.cast_table.parent_id" not in left[1]
+        by_column = result.join("genres_table", "genres_table", on="id")
+        assert len(by_column) == 5
+
+    def test_batch_without_root_fk_cannot_link(self):
+        result = normalize_batch(copy.deepcopy(MOVIES))
+        with pytest.raises(SchemaValidationError):
+            result.children_of("genres_table", result["main"][0])
+        single = normalize_json(copy.deepcopy(MOVIES[1]), output_format="relational")
+        assert len(single.children_of("genres_table", single["main"][0])) == 2
@@ -0,0 +1,78 @@
+import pytest
+
+from core.rows import CompactTable, RowView
+from core.transformer import normalize_batch
+from utils.output import CsvSink, ParquetSink
+
+
+DOCS = [
+    {"id": 550, "title": "Fight Club", "genres": [{"id": 18, "name": "Drama"}]},
+    {"id": 13, "title": "Forrest Gump", "tagline": "Life is like a box of chocolates",
+     "genres": [{"id": 35, "name": "Comedy"}, {"id": 18, "name": "Drama"}]},
+]
+
+
+class TestCompactTable:
+    def test_rows_share_shapes(self):
+        rows = [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}, {"id": 3}]
+        table = CompactTable(rows)
+        assert len(table) == 3
+        assert table.shapes == [("id", "name"), ("id",)]
+        assert table == rows
+        assert isinstance(table[0], RowView)
+        assert table[1]["name"] == "b"
+        assert table[2].get("name") is None
+        assert "name" not in table[2]
+        assert table.to_dicts() == rows
+        assert table.to_columns() == {"id": [1, 2, 3], "name": ["a", "b", None]}
+        assert [row.to_dict() for row in table[1:]] == rows[1:]
+
+    def test_extend_merges_shapes(self):
+        table = CompactTable([{"id": 1}])
+        table.extend(CompactTable([{"id": 2, "name": "b"}, {"id": 3}]))
+        assert table.shapes == [("id",), ("id", "name")]
+        assert table.to_dicts() == [{"id": 1}, {"id": 2, "name": "b"}, {"id": 3}]
+
+    def test_compact_batch_matches_dicts(self, tmp_path):
+        expected = normalize_batch(DOCS)
+        result = normalize_batch(DOCS, compact=True)
+        assert isinstance(result["main"], CompactTable)
+        assert result["main"] == expected["main"]
+        assert result["relations"]["genres_table"] == expected["relations"]["genres_table"]
+        with CsvSink(tmp_path) as sink:
+            sink.write(result)
+        assert sink.row_counts() == {"main": 2, "genres_table": 3}
+
+
+class TestDictionaryEncoding:
+    def test_low_cardinality_columns_are_encoded(self):
+        rows = [{"id": i, "status": "Released" if i % 3 else "Rumored", "title": f"Movie {i}"}
+                for i in range(200)]
+        table = CompactTable(rows, encode=True)
+        assert table.categories == {"status": ["Rumored", "Released"]}
+        assert table[0].raw("status") == 0
+        assert table == rows
+        assert table.to_columns()["status"][:2] == ["Rumored", "Released"]
+
+    def test_non_string_value_decodes_column(self):
+        table = CompactTable([{"code": "a"}, {"code": "b"}], encode=True)
+        assert "code" in table.categories
+        table.append({"code": 3})
+        assert "code" not in table.categories
+        assert table.to_dicts() == [{"code": "a"}, {"code": "b"}, {"code": 3}]
+
+    def test_categorical_dataframe(self):
+        result = normalize_batch(DOCS, output_format="dataframe", dictionary_encode=True)
+        genres = result["genres_table"]
+        assert str(genres["name"].dtype) == "category"
+        assert list(genres["name"]) == ["Drama", "Comedy", "Drama"]
+        assert result["main"]["tagline"].isna().sum() == 1
+
+    def test_arrow_dictionary_array(self, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        result = normalize_batch(DOCS, dictionary_encode=True)
+        with ParquetSink(tmp_path) as sink:
+            sink.write(result)
+        table = pq.read_table(tmp_path / "genres_table.parquet")
+        assert str(table.schema.field("name").type).startswith("dictionary")
+        assert table.column("name").to_pylist() == ["Drama", "Comedy", "Drama"]
@@ -0,0 +1,73 @@
+from core.flattener import flatten_dict
+from core.selector import DESCEND, INCLUDE, KEEP_ALL, SKIP, PathSelector, compile_selector
+from core.transformer import normalize_json
+
+
+MOVIE = {
+    "id": 550,
+    "title": "Fight Club",
+    "overview": "...",
+    "belongs_to_collection": {"id": 1, "name": "C"},
+    "genres": [{"id": 18, "name": "Drama"}],
+    "production_countries": [{"iso_3166_1": "US", "name": "USA"}],
+    "videos": {"results": [{"key": "abc", "site": "YouTube", "iso_639_1": "en"}]},
+}
+
+
+class TestPathSelector:
+    def test_decisions(self):
+        selector = PathSelector(include=["id", "videos.results.key", "genres"])
+        assert selector.decide(("id",)) == KEEP_ALL
+        assert selector.decide(("videos",)) == DESCEND
+        assert selector.decide(("overview",)) == SKIP
+        assert selector.decide(("genres", "name")) == KEEP_ALL
+
+    def test_wildcards(self):
+        selector = PathSelector(exclude=["**.iso_*", "belongs_to_*"])
+        assert selector.decide(("belongs_to_collection",)) == SKIP
+        assert selector.decide(("videos", "results", "iso_639_1")) == SKIP
+        # "**" patterns could match below any path, so descendants stay checked
+        assert selector.decide(("title",)) == INCLUDE
+
+    def test_flatten_never_visits_unselected(self):
+        class Exploding(dict):
+            def items(self):
+                raise AssertionError("excluded subtree was visited")
+
+        doc = dict(MOVIE, belongs_to_collection=Exploding(a=1))
+        rows = flatten_dict(doc, selector=PathSelector(include=["id", "videos.results.key"]))
+        assert rows == [{"id": 550, "videos.results": [{"key": "abc"}]}]
+
+    def test_normalize_json_builds_only_selected_tables(self):
+        result = normalize_json(MOVIE, output_format="relational",
+                                include=["id", "title", "genres", "videos"],
+                                exclude=["**.iso_*"])
+        assert result["main"] == [{"id": 550, "title": "Fight Club"}]
+        assert set(result["relations"]) == {"genres_table", "videos.results_table"}
+        assert result["relations"]["videos.results_table"][0] == {
+            "key": "abc", "site": "YouTube", "parent_id": "videos.results_0"}
+
+    def test_compiled_once(self):
+        assert compile_selector(["id"], ["x"]) is compile_selector(["id"], ["x"])
+        assert compile_selector() is None
+        assert PathSelector(include=["videos.results.key", "id"]).projection_paths() == [
+            "videos.results.key", "id"]
+        assert PathSelector(include=["*.key"]).projection_paths() is None
+
+    def test_selector_include_merges_exclude(self):
+        selector = PathSelector(include=["id", "genres"], exclude=["genres.id"])
+        assert compile_selector(selector) is selector
+        merged = compile_selector(selector, ["genres.name"])
+        assert merged.decide(("genres", "id")) == SKIP
+        assert merged.decide(("genres", "name")) == SKIP
+        assert merged.decide(("title",)) == SKIP
+        assert compile_selector(PathSelector(), ["title"]).decide(("title",)) == SKIP
+
+    def test_prune_copies_only_changed_containers(self):
+        selector = PathSelector(exclude=["**.iso_*"])
+        genres = MOVIE["genres"]
+        assert selector.prune(genres, ("genres",), selector.decide(("genres",))) is genres
+        videos = MOVIE["videos"]
+        pruned = selector.prune(videos, ("videos",), selector.decide(("videos",)))
+        assert pruned == {"results": [{"key": "abc", "site": "YouTube"}]}
+        assert videos["results"][0]["iso_639_1"] == "en"
@@ -0,0 +1,71 @@
+import copy
+import json
+
+from core.shape import ShapeCache, ShapePlan, shape_fingerprint
+from core.transformer import normalize_batch
+from extensions.streaming import normalize_stream
+from utils.error_handler import Quarantine
+from utils.metrics import NormalizeMetrics
+
+
+MOVIE = {
+    "id": 550,
+    "Title": "Fight Club",
+    "tagline": None,
+    "keywords": [],
+    "collection": {"id": 10, "name": None},
+    "genres": [{"id": 18, "name": "Drama"}],
+    "credits": {"cast": [{"name": "Brad Pitt", "roles": [{"name": "Tyler"}]}]},
+}
+
+DOCS = [
+    MOVIE,
+    dict(MOVIE, id=13, genres=[{"id": 35, "name": "Comedy"}, {"id": 18, "name": "Drama"}]),
+    {"id": 680, "title": "Pulp Fiction"},
+    dict(MOVIE, id=807, genres=[]),
+    {},
+    {"genres": [{"id": 99, "name": "Noir"}]},
+    {"a.b": 1, "a": {"b": 2}},
+]
+
+
+class TestShapes:
+    def test_fingerprint_ignores_values(self):
+        other = dict(MOVIE, id=1, Title="Other", genres=[{"id": 1}])
+        assert shape_fingerprint(other) == shape_fingerprint(MOVIE)
+        assert shape_fingerprint(dict(MOVIE, genres=[])) != shape_fingerprint(MOVIE)
+
+    def test_plan_routes_relations(self):
+        plan = ShapePlan.build(shape_fingerprint(MOVIE))
+        assert plan.columns == ["id", "title", "tagline", "keywords", "collectionid", "collectionname"]
+        assert plan.relation_keys == ["genres", "credits.cast"]
+        assert ShapePlan.build(shape_fingerprint(DOCS[-1])) is None
+
+    def test_same_output_as_generic_pipeline(self):
+        for options in ({}, {"null_value": "NULL", "schema": {"id": "string"}}, {"extract_relations": False}):
+            expected = normalize_batch(copy.deepcopy(DOCS), **options)
+            cache = ShapeCache()
+            metrics = NormalizeMetrics()
+            result = normalize_batch(copy.deepcopy(DOCS), shapes=cache, metrics=metrics, **options)
+            assert result == expected
+            assert [list(row) for row in result["main"]] == [list(row) for row in expected["main"]]
+            assert metrics.counters["shape_documents"] == 6
+            assert cache.stats() == {"shapes": 6, "hits": 1, "misses": 6, "unplanned": 1}
+
+    def test_raw_documents_and_stream_share_cache(self):
+        raw = [json.dumps(doc).encode() for doc in DOCS[:2]] * 3
+        cache = ShapeCache()
+        chunks = list(normalize_stream(raw, chunk_size=2, shapes=cache))
+        assert [row["id"] for chunk in chunks for row in chunk["main"]] == [550, 13] * 3
+        assert cache.misses == 1 and cache.hits == 5
+
+    def test_failing_main_row_is_quarantined_alone(self):
+        docs = [{"id": 1, "budget": 10.0}, {"id": 2, "budget": float("inf")}, {"id": 3, "budget": 2.5}]
+        results = []
+        for shapes in (None, ShapeCache()):
+            quarantine = Quarantine()
+            results.append(normalize_batch(copy.deepcopy(docs), schema={"budget": "int"}, shapes=shapes,
+                                           quarantine=quarantine))
+            assert [record["index"] for record in quarantine] == [1]
+        assert results[0] == results[1]
+        assert [row["id"] for row in results[1]["main"]] == [1, 3]
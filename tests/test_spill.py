@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from core.spill import MemoryBudget, SpillTable
+from core.transformer import normalize_batch, normalize_json
+from utils.metrics import NormalizeMetrics
+from utils.output import CsvSink
+
+
+DOCS = [
+    {"id": i, "title": f"Movie {i}",
+     "cast": [{"name": f"Actor {i}-{j}", "order": j} for j in range(20)],
+     "genres": [{"id": 18, "name": "Drama"}]}
+    for i in range(100)
+]
+
+
+class TestSpillTable:
+    def test_spilled_rows_read_back_in_order(self, tmp_path):
+        table = SpillTable("cast", directory=str(tmp_path))
+        table.extend({"id": i} for i in range(5))
+        assert table.spill() == 5
+        table.extend([{"id": 5, "extra": True}])
+        assert table.spilled and len(table) == 6
+        assert table == [{"id": i} for i in range(5)] + [{"id": 5, "extra": True}]
+        assert [len(chunk) for chunk in table.chunks()] == [5, 1]
+        assert [len(chunk) for chunk in table.chunks(4)] == [4, 2]
+        path = table.path
+        table.close()
+        assert not os.path.exists(path) and len(table) == 0
+
+    def test_budget_spills_tables_over_their_share(self, tmp_path):
+        budget = MemoryBudget(4000, directory=str(tmp_path))
+        small, large = budget.table("main"), budget.table("cast_table")
+        small.extend([{"id": 1}])
+        large.extend({"name": "x" * 50, "order": i} for i in range(100))
+        assert large.spilled and not small.spilled
+        assert budget.used <= budget.limit_bytes
+
+
+class TestMemoryBudget:
+    def test_batch_output_is_unchanged(self):
+        metrics = NormalizeMetrics()
+        expected = normalize_batch(DOCS, root_fk="_root")
+        result = normalize_batch(DOCS, root_fk="_root", memory_budget=20000, metrics=metrics)
+        cast = result["relations"]["cast_table"]
+        assert isinstance(cast, SpillTable) and cast.spilled
+        assert cast == expected["relations"]["cast_table"]
+        assert result["main"] == expected["main"]
+        assert metrics.counters["spilled_rows"] > 0
+        assert result.children_of("cast_table", result["main"][0])[0]["name"] == "Actor 0-0"
+
+    def test_normalize_json_list(self):
+        result = normalize_json(DOCS, output_format="relational", memory_budget=20000)
+        assert len(result["relations"]["cast_table"]) == 2000
+
+    def test_spilled_tables_as_dataframe_chunks(self):
+        pd = pytest.importorskip("pandas")
+        result = normalize_batch(DOCS, output_format="dataframe", memory_budget=20000)
+        frames = list(result["cast_table"])
+        assert all(isinstance(frame, pd.DataFrame) for frame in frames)
+        assert sum(len(frame) for frame in frames) == 2000
+
+    def test_sink_writes_spilled_frames(self, tmp_path):
+        sink = CsvSink(str(tmp_path))
+        normalize_batch(DOCS, memory_budget=20000, sink=sink)
+        sink.close()
+        assert sink.row_counts()["cast_table"] == 2000
+
+    def test_not_combinable_with_compact(self):
+        with pytest.raises(ValueError):
+            normalize_batch(DOCS, memory_budget=20000, compact=True)
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from extensions.streaming import ChunkSizer, iter_chunks, normalize_stream, result_size
+from utils.metrics import NormalizeMetrics
+
+
+def movie(i, cast=0):
+    return {"id": i, "title": f"Movie {i}", "cast": [{"name": f"Actor {j}", "order": j} for j in range(cast)]}
+
+
+class TestChunkSizer:
+    def test_large_documents_get_small_chunks(self):
+        sizer = ChunkSizer(target_bytes=1 << 20, target_seconds=None, min_size=10, max_size=50000)
+        result = {"main": [{"id": 1}], "relations": {"cast_table": [{"name": "x" * 100}] * 500}}
+        size = sizer.observe(1, result, input_bytes=60000)
+        assert 10 <= size < 20
+
+    def test_small_documents_grow_gradually_to_the_maximum(self):
+        sizer = ChunkSizer(target_bytes=64 << 20, target_seconds=None, max_size=50000, initial_size=1000)
+        result = {"main": [{"id": i} for i in range(1000)], "relations": {}}
+        sizes = [sizer.observe(1000, result, input_bytes=20000) for _ in range(4)]
+        assert sizes == [4000, 16000, 50000, 50000]
+
+    def test_time_target_caps_the_size(self):
+        sizer = ChunkSizer(target_seconds=1.0, initial_size=1000)
+        assert sizer.observe(1000, {"main": [{"id": 1}], "relations": {}}, seconds=10.0) == 100
+
+    def test_decisions_are_exposed_in_metrics(self):
+        metrics = NormalizeMetrics()
+        sizer = ChunkSizer(metrics=metrics)
+        size = sizer.observe(10, {"main": [{"id": i} for i in range(10)], "relations": {}})
+        assert metrics.gauges["chunk_size"] == size == sizer.decisions[-1]["size"]
+        assert metrics.gauges["rows_per_document"] == 1.0
+        assert metrics.counters["chunks"] == 1
+        assert metrics.to_dict()["gauges"] == metrics.gauges
+
+    def test_invalid_bounds(self):
+        with pytest.raises(ValueError):
+            ChunkSizer(min_size=10, max_size=5)
+
+
+class TestAdaptiveStream:
+    def test_iter_chunks_reads_the_current_size(self):
+        sizer = ChunkSizer(min_size=1, initial_size=2)
+        chunks = iter_chunks(range(10), sizer)
+        assert next(chunks) == [0, 1]
+        sizer.size = 5
+        assert next(chunks) == [2, 3, 4, 5, 6]
+
+    def test_auto_chunk_size_keeps_every_document(self):
+        metrics = NormalizeMetrics()
+        lines = [json.dumps(movie(i, cast=i % 7)).encode() for i in range(300)]
+        results = list(normalize_stream(lines, chunk_size="auto", metrics=metrics))
+        assert sum(len(result["main"]) for result in results) == 300
+        assert sum(len(result["relations"].get("cast_table", [])) for result in results) == \
+            sum(i % 7 for i in range(300))
+        assert metrics.gauges["chunk_size"] >= 100
+
+    def test_result_size(self):
+        rows, size = result_size({"main": [{"id": 1}, {"id": 2}], "relations": {"t": [{"a": "b"}]}})
+        assert rows == 3 and size > 0
+
+    def test_auto_chunk_size_with_dataframes(self):
+        documents = [{"id": i, "cast": [{"name": f"n{j}"} for j in range(i % 3)]} for i in range(250)]
+        results = list(normalize_stream(documents, chunk_size="auto", output_format="dataframe"))
+        assert sum(len(result["main"]) for result in results) == 250
+        rows, size = result_size(results[0])
+        assert rows == len(results[0]["main"]) + len(results[0]["cast_table"]) and size > 0
+        assert result_size(results[0]["main"])[0] == len(results[0]["main"])
@@ -0,0 +1,228 @@
+import datetime
+import decimal
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from copy import deepcopy
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+Result = Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]
+
+# Values a row can share with the cache
+_IMMUTABLE = (str, bytes, int, float, complex, decimal.Decimal, datetime.date, datetime.time,
+              datetime.timedelta, type(None))
+
+if orjson is not None:
+    # Datetimes, dataclasses and str/int/dict/list subclasses go through _tagged too
+    _ORJSON_OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                       | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_SUBCLASS)
+
+def _tagged(obj: Any) -> Dict[str, Any]:
+    """Stand-in for a non-JSON value that keeps its type, so equal strings of different types differ."""
+    if isinstance(obj, dict):
+        value = dict(obj)
+    elif isinstance(obj, (list, tuple)):
+        value = list(obj)
+    elif isinstance(obj, (set, frozenset)):
+        value = sorted(_canonical_bytes(item).decode() for item in obj)
+    else:
+        value = repr(obj)
+    return {"\0type": f"{type(obj).__module__}.{type(obj).__qualname__}", "\0value": value}
+
+def _canonical_bytes(obj: Any) -> bytes:
+    """Serialize a decoded document deterministically (sorted keys, non-JSON values type-tagged)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=_ORJSON_OPTIONS, default=_tagged)
+        except TypeError:
+            pass
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=_tagged).encode()
+
+# Non-JSON row values the disk tier can store, by tag
+_DISK_TYPES = {
+    "datetime": datetime.datetime.fromisoformat,
+    "date": datetime.date.fromisoformat,
+    "time": datetime.time.fromisoformat,
+    "decimal": decimal.Decimal,
+}
+
+def _encode_value(obj: Any) -> Dict[str, str]:
+    """JSON stand-in for a date, time or Decimal row value; anything else can't go to disk."""
+    if isinstance(obj, datetime.datetime):
+        tag = "datetime"
+    elif isinstance(obj, datetime.date):
+        tag = "date"
+    elif isinstance(obj, datetime.time):
+        tag = "time"
+    elif isinstance(obj, decimal.Decimal):
+        return {"\0type": "decimal", "\0value": str(obj)}
+    else:
+        raise TypeError(f"{type(obj).__name__} values can't be stored in the disk cache")
+    return {"\0type": tag, "\0value": obj.isoformat()}
+
+def _decode_object(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 2 and "\0type" in obj:
+        decode = _DISK_TYPES.get(obj["\0type"])
+        if decode is not None:
+            return decode(obj["\0value"])
+    return obj
+
+def _copy_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    row = dict(row)
+    for key, value in row.items():
+        if not isinstance(value, _IMMUTABLE):
+            row[key] = deepcopy(value)
+    return row
+
+def _copy_result(result: Result) -> Result:
+    """Copy the rows, nested values included, so that callers and the cache never share mutable data."""
+    main, relations = result
+    return [_copy_row(row) for row in main], {name: [_copy_row(row) for row in rows]
+                                              for name, rows in relations.items()}
+
+class ResultCache:
+    """
+    Content-addressed cache of normalized results with a memory LRU tier and an optional disk tier.
+
+    Entries are keyed by a hash of the raw document (its bytes, or a canonical
+    serialization of a decoded document) and of every option that affects the
+    output, so a byte-identical document normalized with the same config and
+    schema skips the pipeline entirely.
+
+    The disk tier stores one JSON file per entry, holding its key, and never
+    unpickles: reading a file can't run code. Results with values other than
+    JSON types, dates, times and Decimals stay in memory only. Files whose key
+    doesn't match are ignored, but anyone who can write to the directory can
+    still hand out rows of their choosing, so keep it private to the users
+    trusted with the output.
+
+    Args:
+        max_entries: Capacity of the in-memory LRU tier.
+        directory: Directory of the on-disk tier (trusted, see above); None keeps
+                   the cache in memory only.
+
+    Attributes:
+        hits (int): Lookups answered from memory or disk.
+        disk_hits (int): Lookups answered from disk (included in `hits`).
+        misses (int): Lookups that had to normalize.
+
+    Example:
+        >>> cache = ResultCache(max_entries=50_000, directory=".normalize-cache")
+        >>> for doc in documents:
+        ...     normalize_json(doc, output_format="relational", cache=cache)
+        >>> cache.stats()
+    """
+
+    def __init__(self, max_entries: int = 10000, directory: Optional[str] = None):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.directory = os.fspath(directory) if directory is not None else None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        self._memory: "OrderedDict[str, Result]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(document: Any, options: Dict[str, Any]) -> str:
+        """
+        Hash a document and the options it is normalized with.
+
+        Args:
+            document: Raw JSON (bytes-like) or a decoded document.
+            options: JSON-serializable options (config, schema, separators, ...).
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(_canonical_bytes(options))
+        digest.update(b"\0raw\0" if isinstance(document, (bytes, bytearray, memoryview)) else b"\0doc\0")
+        if isinstance(document, (bytes, bytearray, memoryview)):
+            digest.update(document)
+        else:
+            digest.update(_canonical_bytes(document))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def get(self, key: str) -> Optional[Result]:
+        """Return a copy of the cached ``(main, relations)`` for `key`, or None."""
+        result = self._memory.get(key)
+        if result is not None:
+            self._memory.move_to_end(key)
+        elif self.directory:
+            result = self._load(key)
+            if result is not None:
+                self.disk_hits += 1
+                self._remember(key, result)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _copy_result(result)
+
+    def put(self, key: str, main: List[Dict[str, Any]], relations: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Store a normalized result in memory and, if configured, on disk."""
+        result = _copy_result((main, relations))
+        self._remember(key, result)
+        if self.directory:
+            try:
+                data = json.dumps({"key": key, "main": result[0], "relations": result[1]},
+                                  ensure_ascii=False, default=_encode_value).encode()
+            except (TypeError, ValueError):
+                return
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+    def _load(self, key: str) -> Optional[Result]:
+        """Read the disk entry of `key`; unreadable entries and entries of another key are misses."""
+        try:
+            with open(self._path(key), "rb") as f:
+                payload = json.loads(f.read(), object_hook=_decode_object)
+        except (OSError, ValueError, ArithmeticError):
+            return None
+        if not (isinstance(payload, dict) and payload.get("key") == key
+                and isinstance(payload.get("main"), list) and isinstance(payload.get("relations"), dict)):
+            return None
+        return payload["main"], payload["relations"]
+
+    def _remember(self, key: str, result: Result) -> None:
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def clear(self, disk: bool = False) -> None:
+        """Empty the memory tier, and the disk tier if `disk`."""
+        self._memory.clear()
+        if disk and self.directory:
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith(".json"):
+                        os.remove(os.path.join(root, name))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit and miss counters and the hit rate."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'memory_hits': self.hits - self.disk_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'memory_entries': len(self._memory),
+        }
@@ -40,11 +40,14 @@ class JsonNormalizeConfig:
 
     def _setup_logging(self):
         """Setup logging configuration."""
+        level = getattr(logging, self.log_level.upper())
         logging.basicConfig(
-            level=getattr(logging, self.log_level.upper()),
+            level=level,
             format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
         self.logger = logging.getLogger('JsonNormalize')
+        # basicConfig() is a no-op once logging is configured; set the level explicitly
+        self.logger.setLevel(level)
 
     def update(self, **kwargs):
         """Update configuration parameters."""
@@ -0,0 +1,193 @@
+import json
+from collections import Counter
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+from .sketches import CountMinSketch, HyperLogLog, stable_hash
+
+def _hashable(value: Any) -> Any:
+    """Lists and dicts are counted by their JSON text."""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return value
+
+class ColumnProfile:
+    """
+    Statistics of one column, collected in a single pass and mergeable.
+
+    Attributes:
+        count (int): Non-null values.
+        nulls (int): Explicit null values (rows without the column are counted by the table).
+        types (Counter): Python type name -> number of values.
+        minimum, maximum: Smallest and largest numeric value (bools excluded), or None.
+        distinct (HyperLogLog): Distinct value estimate.
+        frequent (CountMinSketch): Value frequencies and heavy hitters.
+    """
+
+    def __init__(self, precision: int = 12, width: int = 1024, depth: int = 4, top_k: int = 10):
+        self.count = 0
+        self.nulls = 0
+        self.types: Counter = Counter()
+        self.minimum = None
+        self.maximum = None
+        self.distinct = HyperLogLog(precision)
+        self.frequent = CountMinSketch(width, depth, top_k)
+
+    def update(self, values: Iterable[Any]) -> None:
+        """Add a batch of values of the column."""
+        values = values if isinstance(values, list) else list(values)
+        present = [value for value in values if value is not None]
+        self.nulls += len(values) - len(present)
+        self.count += len(present)
+        self.types.update(type(value).__name__ for value in present)
+
+        numbers = [value for value in present if type(value) in (int, float) and value == value]
+        if numbers:
+            low, high = min(numbers), max(numbers)
+            if self.minimum is None or low < self.minimum:
+                self.minimum = low
+            if self.maximum is None or high > self.maximum:
+                self.maximum = high
+
+        # Keyed by type too: 1, 1.0 and True are equal dict keys but distinct values
+        try:
+            counts = Counter(zip(map(type, present), present))
+        except TypeError:
+            counts = Counter((type(value), _hashable(value)) for value in present)
+        # Each distinct value is hashed once per batch and feeds both sketches
+        items = [(value, stable_hash(value), count) for (_, value), count in counts.items()]
+        self.distinct.add_hashes([hashed for _, hashed, _ in items])
+        self.frequent.add_counts(items)
+
+    def merge(self, other: "ColumnProfile") -> "ColumnProfile":
+        """Add the statistics of `other` (another chunk or worker)."""
+        self.count += other.count
+        self.nulls += other.nulls
+        self.types.update(other.types)
+        for value in (other.minimum, other.maximum):
+            if value is None:
+                continue
+            if self.minimum is None or value < self.minimum:
+                self.minimum = value
+            if self.maximum is None or value > self.maximum:
+                self.maximum = value
+        self.distinct.merge(other.distinct)
+        self.frequent.merge(other.frequent)
+        return self
+
+    def to_dict(self, rows: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Report the statistics.
+
+        Args:
+            rows: Rows of the table; nulls then include rows without the column.
+        """
+        nulls = rows - self.count if rows is not None else self.nulls
+        return {
+            'non_null': self.count,
+            'nulls': nulls,
+            'null_ratio': nulls / (nulls + self.count) if nulls + self.count else 0.0,
+            'types': dict(self.types),
+            'min': self.minimum,
+            'max': self.maximum,
+            'distinct': min(self.distinct.estimate(), self.count),
+            'top': [[value, count] for value, count in self.frequent.top()],
+        }
+
+class TableProfile:
+    """Row count and `ColumnProfile` of every column of one table."""
+
+    def __init__(self, **sketch_options):
+        self.rows = 0
+        self.columns: Dict[str, ColumnProfile] = {}
+        self.sketch_options = sketch_options
+
+    def update(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        """Profile a batch of rows, column by column."""
+        columns: Dict[str, list] = {}
+        count = 0
+        for row in rows:
+            count += 1
+            for key, value in row.items():
+                values = columns.get(key)
+                if values is None:
+                    values = columns[key] = []
+                values.append(value)
+        self.rows += count
+        for key, values in columns.items():
+            profile = self.columns.get(key)
+            if profile is None:
+                profile = self.columns[key] = ColumnProfile(**self.sketch_options)
+            profile.update(values)
+
+    def merge(self, other: "TableProfile") -> "TableProfile":
+        self.rows += other.rows
+        for key, column in other.columns.items():
+            if key in self.columns:
+                self.columns[key].merge(column)
+            else:
+                # A copy: later merges into self must not change `other`
+                self.columns[key] = ColumnProfile(**self.sketch_options).merge(column)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'rows': self.rows,
+            'columns': {key: column.to_dict(self.rows) for key, column in self.columns.items()},
+        }
+
+class DataProfile:
+    """
+    Column profiles of every output table, collected while normalizing.
+
+    Pass an instance as ``data_profile=`` to ``normalize_json``/``normalize_batch``
+    (or ``normalize_stream``) and every table is profiled as it is produced: null
+    and non-null counts, type distribution, numeric min/max, a HyperLogLog
+    distinct estimate and count-min heavy hitters per column. Memory per
+    column is fixed (about 4 KB of HyperLogLog registers and 32 KB of
+    count-min counters with the defaults), and profiles of chunks or worker
+    processes combine with `merge`.
+
+    Args:
+        precision: HyperLogLog precision (2 ** precision registers).
+        width: Count-min sketch counters per row.
+        depth: Count-min sketch rows.
+        top_k: Heavy hitters reported per column.
+
+    Example:
+        >>> profile = DataProfile()
+        >>> for chunk in normalize_stream(documents, data_profile=profile):
+        ...     sink.write(chunk)
+        >>> profile.to_dict()["main"]["columns"]["status"]["top"]
+    """
+
+    def __init__(self, precision: int = 12, width: int = 1024, depth: int = 4, top_k: int = 10):
+        self.sketch_options = dict(precision=precision, width=width, depth=depth, top_k=top_k)
+        self.tables: Dict[str, TableProfile] = {}
+
+    def update_table(self, table_name: str, rows: Iterable[Mapping[str, Any]]) -> None:
+        """Profile rows of one table."""
+        table = self.tables.get(table_name)
+        if table is None:
+            table = self.tables[table_name] = TableProfile(**self.sketch_options)
+        table.update(rows)
+
+    def update(self, main: Iterable[Mapping[str, Any]], relations: Mapping[str, Iterable[Mapping[str, Any]]]) -> None:
+        """Profile the main rows and every relation table of a result."""
+        self.update_table("main", main)
+        for table_name, rows in relations.items():
+            self.update_table(table_name, rows)
+
+    def merge(self, other: "DataProfile") -> "DataProfile":
+        """Add the profiles of `other` (e.g. from a worker); sketch options must match."""
+        if other.sketch_options != self.sketch_options:
+            raise ValueError("Can't merge profiles built with different sketch options")
+        for table_name, table in other.tables.items():
+            if table_name in self.tables:
+                self.tables[table_name].merge(table)
+            else:
+                self.tables[table_name] = TableProfile(**self.sketch_options).merge(table)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Table name -> ``{"rows": n, "columns": {column: statistics}}``."""
+        return {table_name: table.to_dict() for table_name, table in self.tables.items()}
@@ -0,0 +1,83 @@
+import json
+import mmap
+import os
+from typing import Any
+
+try:
+    import orjson
+    DECODER = "orjson"
+except ImportError:
+    orjson = None
+    DECODER = "json"
+
+# A plain str is not raw input: it could be JSON text as well as a file name
+RAW_TYPES = (bytes, bytearray, memoryview, mmap.mmap, os.PathLike)
+
+def is_raw_source(obj: Any) -> bool:
+    """Whether `obj` is undecoded JSON input (buffer, mmap or ``os.PathLike``) rather than a document."""
+    return isinstance(obj, RAW_TYPES)
+
+def loads(data: Any) -> Any:
+    """
+    Decode a JSON buffer with the fastest available decoder.
+
+    orjson is used when installed and reads bytes, bytearray, memoryview and
+    mmap buffers without copying them; otherwise the stdlib decoder is used.
+
+    Args:
+        data: bytes, bytearray, memoryview, mmap or str.
+
+    Returns:
+        The decoded value.
+    """
+    if orjson is not None:
+        if isinstance(data, mmap.mmap):
+            data = memoryview(data)
+        return orjson.loads(data)
+    if isinstance(data, (memoryview, mmap.mmap)):
+        # The stdlib decoder only accepts str, bytes and bytearray
+        data = bytes(data)
+    return json.loads(data)
+
+def decode_json(source: Any) -> Any:
+    """
+    Decode raw JSON input into Python objects.
+
+    Args:
+        source: bytes, bytearray, memoryview or mmap holding JSON text, or a file
+                path (str or os.PathLike; unlike the normalizers, this function
+                takes a str for a path). Files are memory-mapped rather than
+                read into an intermediate string. Anything else is returned
+                unchanged, assuming it is already decoded.
+
+    Returns:
+        The decoded document(s).
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return loads(f.read())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if orjson is not None:
+                    view = memoryview(mapped)
+                    try:
+                        return orjson.loads(view)
+                    finally:
+                        view.release()
+                return loads(mapped)
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        return loads(source)
+    return source
+
+def raw_size(source: Any) -> int:
+    """Size in bytes of raw JSON input, or 0 if unknown."""
+    if isinstance(source, (str, os.PathLike)):
+        try:
+            return os.path.getsize(source)
+        except OSError:
+            return 0
+    if isinstance(source, memoryview):
+        return source.nbytes
+    if isinstance(source, (bytes, bytearray, mmap.mmap)):
+        return len(source)
+    return 0
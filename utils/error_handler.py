@@ -1,4 +1,6 @@
-from typing import Any, Dict, List
+import json
+import traceback
+from typing import Any, Dict, List, Optional
 from .config import get_config
 
 class JsonNormalizeError(Exception):
@@ -130,3 +132,72 @@ def create_error_summary(errors: List[Dict]) -> Dict:
                 summary['error_types'][error_type] = summary['error_types'].get(error_type, 0) + 1
 
     return summary
+
+class Quarantine:
+    """
+    Collects documents that failed normalization so that the rest of a batch can complete.
+
+    Pass an instance as ``quarantine=`` to ``normalize_batch``, ``normalize_stream``
+    or ``stream_to_sink``: every document is then normalized in isolation, and a
+    failing one is recorded here with its index and error instead of being
+    silently dropped or aborting the batch.
+
+    Args:
+        path: Optional NDJSON file each failure is appended to as it happens.
+        keep_documents: Whether to keep the failed documents themselves.
+
+    Attributes:
+        records (list[dict]): Failures as {"index", "error_type", "error", "traceback", "document"}.
+
+    Example:
+        >>> quarantine = Quarantine("failed.ndjson")
+        >>> stream_to_sink(docs, CsvSink("out"), quarantine=quarantine)
+        >>> quarantine.summary()
+    """
+
+    def __init__(self, path: Optional[str] = None, keep_documents: bool = True):
+        self.path = path
+        self.keep_documents = keep_documents
+        self.records: List[Dict[str, Any]] = []
+
+    def add(self, index: int, document: Any, error: Exception) -> None:
+        """Record the failure of document `index`."""
+        record = {
+            'index': index,
+            'error_type': type(error).__name__,
+            'error': str(error),
+            'traceback': "".join(traceback.format_exception(type(error), error, error.__traceback__)),
+            'document': document if self.keep_documents else None,
+        }
+        get_config().logger.warning(f"Quarantined document {index}: {record['error_type']}: {record['error']}")
+        self.add_record(record)
+
+    def add_record(self, record: Dict[str, Any]) -> None:
+        """Store an already built failure record (e.g. one collected in a worker process)."""
+        self.records.append(record)
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, default=_quarantine_default, ensure_ascii=False) + "\n")
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def summary(self) -> Dict[str, Any]:
+        """Failure counts, by error type, and the failed document indexes."""
+        error_types = {}
+        for record in self.records:
+            error_types[record['error_type']] = error_types.get(record['error_type'], 0) + 1
+        return {
+            'failed_documents': len(self.records),
+            'error_types': error_types,
+            'indexes': [record['index'] for record in self.records],
+        }
+
+def _quarantine_default(value: Any) -> Any:
+    """JSON fallback for quarantined documents that are raw buffers or hold odd types."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).decode("utf-8", errors="replace")
+    return str(value)
@@ -0,0 +1,94 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict
+
+class NormalizeMetrics:
+    """
+    Collects per-stage timings and counters for normalization runs.
+
+    Pass an instance as ``metrics=`` to ``normalize_json``/``normalize_batch``;
+    timings of repeated calls accumulate, so one instance can cover a whole
+    batch or stream.
+
+    Attributes:
+        timings (dict): Stage name -> total seconds spent.
+        calls (dict): Stage name -> number of times the stage ran.
+        counters (dict): Counter name -> value (documents, rows, bytes, ...).
+        gauges (dict): Gauge name -> latest value (e.g. the current adaptive chunk size).
+
+    Example:
+        >>> metrics = NormalizeMetrics()
+        >>> normalize_json(raw_bytes, metrics=metrics)
+        >>> metrics.timings["decode"], metrics.timings["flatten"]
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as stage `name`."""
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """Add `seconds` to stage `name`."""
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Increment counter `name` by `value`."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set gauge `name` to its current `value`."""
+        self.gauges[name] = value
+
+    def merge(self, other: "NormalizeMetrics") -> "NormalizeMetrics":
+        """Add the timings and counters of `other` (e.g. from a worker) to this instance."""
+        for name, seconds in other.timings.items():
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+        for name, calls in other.calls.items():
+            self.calls[name] = self.calls.get(name, 0) + calls
+        for name, value in other.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        # Gauges are point-in-time values: the merged-in ones are the latest
+        self.gauges.update(other.gauges)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert metrics to a plain dictionary."""
+        return {
+            'timings': dict(self.timings),
+            'calls': dict(self.calls),
+            'counters': dict(self.counters),
+            'gauges': dict(self.gauges),
+        }
+
+class _NullStage:
+    """Context manager that does nothing; used when no metrics are collected."""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+def stage_timer(metrics):
+    """
+    Return a ``stage(name)`` function for `metrics`, or a no-op one if it is None.
+
+    Lets pipeline code write ``with stage("flatten"):`` without paying for
+    timing when metrics are disabled.
+    """
+    if metrics is None:
+        return lambda name: _NULL_STAGE
+    return metrics.stage
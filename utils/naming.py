@@ -54,17 +54,28 @@ def normalize_key(key: str, convention: str = 'snake') -> str:
     else:
         return key
 
-def normalize_keys(data: List[Dict], convention: str = 'snake') -> List[Dict]:
+def normalize_keys(data: List[Dict], convention: str = 'snake', inplace: bool = False) -> List[Dict]:
     """
     Normalize all keys in the data according to the convention.
 
     Args:
         data: List of dictionaries to normalize.
         convention: Naming convention ('snake', 'camel', 'keep').
+        inplace: If True, rename keys inside the input records (preserving
+                 key order) instead of building new ones.
 
     Returns:
         List of dictionaries with normalized keys.
     """
+    if inplace:
+        for record in data:
+            renamed = [(normalize_key(key, convention), value) for key, value in record.items()]
+            # Records whose keys are already normalized are left untouched
+            if any(new_key != key for (new_key, _), key in zip(renamed, record)):
+                record.clear()
+                record.update(renamed)
+        return data
+
     normalized_data = []
     for record in data:
         normalized_record = {}
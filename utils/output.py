@@ -0,0 +1,839 @@
+import csv
+import datetime
+import io
+import json
+import os
+import shutil
+import sqlite3
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+from .error_handler import handle_error, TypeCastError
+
+try:
+    from ..core.type_cast import cast_value
+    from ..core.rows import encoded_column
+    from ..core.spill import SpillTable
+except ImportError:
+    # Imported as top-level modules (core, utils, ...): their parent directory
+    # is already on sys.path, so absolute imports resolve
+    from core.type_cast import cast_value
+    from core.rows import encoded_column
+    from core.spill import SpillTable
+
+MAIN_TABLE = "main"
+
+class TableSink:
+    """
+    Base class for output sinks that persist normalized tables batch by batch.
+
+    A sink receives relational results (``{"main": [...], "relations": {...}}``)
+    as they are produced and writes each table incrementally, so a normalized
+    collection never has to be held in memory as a whole. Subclasses implement
+    `write_rows` and `close`.
+    """
+
+    def write(self, result: Dict) -> None:
+        """
+        Write one relational result: the main rows and every relation table.
+
+        Args:
+            result: Output of ``normalize_json``/``normalize_batch`` with
+                    ``output_format="relational"``.
+        """
+        if not result:
+            return
+        tables = [(MAIN_TABLE, result.get("main"))] + list(result.get("relations", {}).items())
+        for table_name, rows in tables:
+            if not rows:
+                continue
+            if isinstance(rows, SpillTable):
+                # Spilled tables are written frame by frame, never loaded whole
+                for chunk in rows.chunks():
+                    self.write_rows(table_name, chunk)
+            else:
+                self.write_rows(table_name, rows)
+
+    def write_rows(self, table_name: str, rows: List[Dict]) -> None:
+        """Append rows to a table."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Flush and release all underlying resources."""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+def _to_cell(value: Any) -> Any:
+    """Convert a normalized value to a CSV cell."""
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+def _table_filename(table_name: str, extension: str) -> str:
+    """File name for a table, safe to use inside the sink directory."""
+    return table_name.replace(os.sep, "_").replace("/", "_") + extension
+
+class _CsvTable:
+    """
+    One CSV file whose header can only grow.
+
+    Writing after `close` appends to the file. `size` counts the bytes written,
+    so that callers can check the file size without flushing the write buffer.
+    """
+
+    def __init__(self, path: str, buffer_size: int, encoding: str, delimiter: str):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self.columns: List[str] = []
+        self.column_set = set()
+        self.header_columns: List[str] = []
+        self.header_bytes = 0
+        self.rows_written = 0
+        self.size = 0
+        self.file = None
+        self.writer = None
+
+    def _widen(self, rows: List[Dict]) -> None:
+        for row in rows:
+            for key in row:
+                if key not in self.column_set:
+                    self.column_set.add(key)
+                    self.columns.append(key)
+
+    def _format_header(self, columns: List[str]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer, delimiter=self.delimiter).writerow(columns)
+        return buffer.getvalue()
+
+    def write(self, text: str) -> None:
+        """File-like write for the csv writer, counting the bytes written."""
+        self.file.write(text)
+        self.size += len(text) if text.isascii() else len(text.encode(self.encoding))
+
+    def write_rows(self, rows: List[Dict]) -> None:
+        self._widen(rows)
+        if self.file is None:
+            # Reopened after close: the header is on disk already
+            append = bool(self.header_columns)
+            self.file = open(self.path, "a" if append else "w", newline="", encoding=self.encoding,
+                             buffering=self.buffer_size)
+            self.writer = csv.writer(self, delimiter=self.delimiter)
+            if not append:
+                # The header is taken from the first batch; later columns are
+                # appended to the right of it.
+                header = self._format_header(self.columns)
+                self.write(header)
+                self.header_columns = list(self.columns)
+                self.header_bytes = self.size
+
+        columns = self.columns
+        self.writer.writerows([_to_cell(row.get(column)) for column in columns] for row in rows)
+        self.rows_written += len(rows)
+
+    def close(self) -> None:
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+        if len(self.columns) == len(self.header_columns):
+            return
+
+        # Columns appeared after the header was written. Rows already on disk
+        # are shorter than the final header, which CSV readers fill with empty
+        # values, so only the header line has to change.
+        tmp_path = self.path + ".tmp"
+        header = self._format_header(self.columns).encode(self.encoding)
+        with open(tmp_path, "wb") as dst, open(self.path, "rb") as src:
+            dst.write(header)
+            src.seek(self.header_bytes)
+            shutil.copyfileobj(src, dst, self.buffer_size)
+        os.replace(tmp_path, self.path)
+        self.size += len(header) - self.header_bytes
+        self.header_columns = list(self.columns)
+        self.header_bytes = len(header)
+
+class CsvSink(TableSink):
+    """
+    Stream normalized tables to one CSV file per table using only the stdlib.
+
+    Each table is written to ``<directory>/<table_name>.csv`` as batches arrive.
+    The header comes from the first batch of a table; columns first seen in later
+    batches are appended to the right, and the header line is rewritten once on
+    `close` only if such columns appeared. Nested lists and dicts are written as
+    JSON, None as an empty cell.
+
+    Args:
+        directory: Output directory, created if missing.
+        buffer_size: Write buffer size in bytes per table file.
+        encoding: File encoding.
+        delimiter: CSV field delimiter.
+
+    Example:
+        >>> with CsvSink("out") as sink:
+        ...     for chunk in normalize_stream(documents, chunk_size=1000):
+        ...         sink.write(chunk)
+    """
+
+    def __init__(self, directory: str, buffer_size: int = 1 << 20,
+                 encoding: str = "utf-8", delimiter: str = ","):
+        self.directory = directory
+        self.buffer_size = buffer_size
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self.tables: Dict[str, _CsvTable] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def write_rows(self, table_name: str, rows: List[Dict]) -> None:
+        table = self.tables.get(table_name)
+        if table is None:
+            path = os.path.join(self.directory, _table_filename(table_name, ".csv"))
+            table = _CsvTable(path, self.buffer_size, self.encoding, self.delimiter)
+            self.tables[table_name] = table
+        table.write_rows(rows)
+
+    def row_counts(self) -> Dict[str, int]:
+        """Number of rows written so far per table."""
+        return {name: table.rows_written for name, table in self.tables.items()}
+
+    def close(self) -> None:
+        for table in self.tables.values():
+            table.close()
+
+def _import_pyarrow():
+    """Import pyarrow on first use; it is an optional dependency."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("pyarrow is required for Parquet output (pip install pyarrow)")
+    return pyarrow, pyarrow.parquet
+
+def _arrow_type(pa, type_name: str):
+    """Map a type_cast type name (or 'category' for dictionary-encoded strings) to an Arrow type."""
+    if type_name == 'category':
+        return pa.dictionary(pa.int32(), pa.string())
+    return {
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'bool': pa.bool_(),
+        'date': pa.date32(),
+        'datetime': pa.timestamp('us'),
+    }.get(type_name, pa.string())
+
+def _infer_column_type(values: List[Any]) -> str:
+    """
+    Infer a type_cast type name from the Python values of a column.
+
+    Unlike `infer_schema`, this looks at every value so that mixed int/float
+    columns become 'float' and anything heterogeneous falls back to 'str'.
+    """
+    seen = set()
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            seen.add('bool')
+        elif isinstance(value, int):
+            seen.add('int')
+        elif isinstance(value, float):
+            seen.add('float')
+        elif isinstance(value, datetime.datetime):
+            seen.add('datetime')
+        elif isinstance(value, datetime.date):
+            seen.add('date')
+        else:
+            seen.add('str')
+    if len(seen) == 1:
+        return seen.pop()
+    if seen == {'int', 'float'}:
+        return 'float'
+    return 'str'
+
+class _ParquetTable:
+    """
+    Buffers the rows of one table and writes them as Parquet row groups.
+
+    A Parquet file has one schema, so when a row group needs a wider one (columns
+    first seen late, or an inferred int column holding fractional floats) the
+    file is closed and the table continues in ``<name>-00001.parquet`` and so on,
+    each written with the widened schema.
+    """
+
+    def __init__(self, name: str, path: str, declared: Dict[str, str],
+                 row_group_size: int, compression: str):
+        self.name = name
+        self.path = path
+        self.paths = [path]
+        self.declared = declared
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.rows: List[Dict] = []
+        self.types: Optional[Dict[str, str]] = None
+        self.schema = None
+        self.writer = None
+        self.rows_written = 0
+
+    def append(self, rows: List[Dict]) -> None:
+        self.rows.extend(rows)
+        while len(self.rows) >= self.row_group_size:
+            batch = self.rows[:self.row_group_size]
+            del self.rows[:self.row_group_size]
+            self._write_batch(batch)
+
+    def _column_types(self, rows: List[Dict], types: Dict[str, str]) -> Dict[str, str]:
+        """`types` extended with the columns of `rows` it lacks, declared or inferred."""
+        types = dict(types)
+        for column in self.declared:
+            types.setdefault(column, self.declared[column])
+        for row in rows:
+            for column in row:
+                if column in types:
+                    continue
+                if encoded_column(rows, column) is not None:
+                    # Dictionary-encoded rows (CompactTable) stay encoded in Arrow
+                    types[column] = 'category'
+                else:
+                    types[column] = _infer_column_type([row.get(column) for row in rows])
+        return types
+
+    def _set_schema(self, types: Dict[str, str]) -> None:
+        pa, _ = _import_pyarrow()
+        self.types = types
+        self.schema = pa.schema([(column, _arrow_type(pa, type_name))
+                                 for column, type_name in types.items()])
+
+    def _resolve_schema(self, rows: List[Dict]) -> None:
+        """Fix the table schema from declared types and the first row group."""
+        self._set_schema(self._column_types(rows, {}))
+
+    def _widened_types(self, rows: List[Dict]) -> Optional[Dict[str, str]]:
+        """The types the schema needs for `rows`, or None when the current ones fit."""
+        types = self._column_types(rows, self.types)
+        for column, type_name in self.types.items():
+            # Inferred int columns become float rather than truncating fractions
+            if type_name == 'int' and column not in self.declared and any(
+                    isinstance(value, float) and not value.is_integer()
+                    for value in (row.get(column) for row in rows)):
+                types[column] = 'float'
+        return types if types != self.types else None
+
+    def _roll(self, types: Dict[str, str]) -> None:
+        """Close the current file and continue in a new one with the schema `types`."""
+        _, pq = _import_pyarrow()
+        self.writer.close()
+        root, extension = os.path.splitext(self.paths[0])
+        self.path = f"{root}-{len(self.paths):05d}{extension}"
+        self.paths.append(self.path)
+        self._set_schema(types)
+        self.writer = pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+
+    def _dictionary_array(self, pa, column: str, rows: List[Dict]):
+        """Build a dictionary array, reusing the codes of encoded rows as indices."""
+        encoded = encoded_column(rows, column)
+        if encoded is not None:
+            codes, categories = encoded
+            return pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int32()),
+                                                  pa.array(categories, type=pa.string()))
+        values = self._column_array(pa, column, [row.get(column) for row in rows], 'str', pa.string())
+        return values.dictionary_encode()
+
+    def _column_array(self, pa, column: str, values: List[Any], type_name: str = None, arrow_type=None):
+        type_name = type_name or self.types[column]
+        arrow_type = arrow_type or self.schema.field(column).type
+        if type_name == 'str':
+            values = [v if v is None or isinstance(v, str)
+                      else json.dumps(v, ensure_ascii=False, default=str) if isinstance(v, (dict, list))
+                      else str(v) for v in values]
+        try:
+            return pa.array(values, type=arrow_type)
+        except (TypeError, ValueError, OverflowError):
+            pass
+        values = [cast_value(v, type_name) for v in values]
+        try:
+            return pa.array(values, type=arrow_type)
+        except (TypeError, ValueError, OverflowError) as e:
+            handle_error(TypeCastError(f"Column {column} of {self.name} does not fit {type_name}, "
+                                       f"writing nulls for non-conforming values: {e}"), "ParquetSink")
+        converted = []
+        for v in values:
+            try:
+                pa.scalar(v, type=arrow_type)
+                converted.append(v)
+            except (TypeError, ValueError, OverflowError):
+                converted.append(None)
+        return pa.array(converted, type=arrow_type)
+
+    def _write_batch(self, rows: List[Dict]) -> None:
+        pa, pq = _import_pyarrow()
+        if self.schema is None:
+            self._resolve_schema(rows)
+            self.writer = pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+        else:
+            types = self._widened_types(rows)
+            if types is not None:
+                self._roll(types)
+
+        arrays = [self._dictionary_array(pa, column, rows) if type_name == 'category'
+                  else self._column_array(pa, column, [row.get(column) for row in rows])
+                  for column, type_name in self.types.items()]
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        self.writer.write_batch(batch, row_group_size=self.row_group_size)
+        self.rows_written += len(rows)
+
+    def close(self) -> None:
+        if self.rows:
+            rows, self.rows = self.rows, []
+            self._write_batch(rows)
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+class ParquetSink(TableSink):
+    """
+    Stream normalized tables into one Parquet file per table via Arrow record batches.
+
+    Rows are buffered per table and written as one row group every
+    `row_group_size` rows. Column types come from the declared type_cast schemas
+    (``{'budget': 'int', 'release_date': 'date', ...}``); undeclared columns are
+    inferred from the first row group. The schema of a table is fixed once its
+    first row group is written; when a later row group brings new columns, or
+    fractional floats in an inferred int column, the table rolls over to
+    ``<table>-00001.parquet`` (and so on) with the widened schema, listed by
+    `files`. Requires the optional ``pyarrow`` dependency.
+
+    Args:
+        directory: Output directory, created if missing.
+        schemas: Mapping of table name ("main" or a relation table name) to a
+                 type_cast schema.
+        row_group_size: Number of rows per Parquet row group.
+        compression: Parquet compression codec.
+    """
+
+    def __init__(self, directory: str, schemas: Dict[str, Dict[str, str]] = None,
+                 row_group_size: int = 65536, compression: str = "snappy"):
+        _import_pyarrow()
+        if row_group_size < 1:
+            raise ValueError("row_group_size must be at least 1")
+        self.directory = directory
+        self.schemas = schemas or {}
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.tables: Dict[str, _ParquetTable] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def write_rows(self, table_name: str, rows: List[Dict]) -> None:
+        table = self.tables.get(table_name)
+        if table is None:
+            path = os.path.join(self.directory, _table_filename(table_name, ".parquet"))
+            table = _ParquetTable(table_name, path, self.schemas.get(table_name, {}),
+                                  self.row_group_size, self.compression)
+            self.tables[table_name] = table
+        table.append(rows)
+
+    def files(self) -> Dict[str, List[str]]:
+        """Paths of the files written per table, in order."""
+        return {name: list(table.paths) for name, table in self.tables.items()}
+
+    def row_counts(self) -> Dict[str, int]:
+        """Number of rows written so far per table (buffered rows excluded)."""
+        return {name: table.rows_written for name, table in self.tables.items()}
+
+    def close(self) -> None:
+        for table in self.tables.values():
+            table.close()
+
+_HIVE_DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+def _partition_value(value: Any) -> str:
+    """Escape a value for use in a ``column=value`` directory name, as Hive does."""
+    if value is None or value == "":
+        return _HIVE_DEFAULT_PARTITION
+    return quote(str(value), safe=" ")
+
+class _Partition:
+    """The rolling files of one partition of one table."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.paths: List[str] = []
+        self.file = None
+        self.rows_written = 0
+
+class PartitionedSink(TableSink):
+    """
+    Write every table as Hive-style partitions of rolling CSV or Parquet files.
+
+    Rows go to ``<directory>/<table>/<column>=<value>/part-00000.<ext>`` by the
+    value of their partition column, or with `buckets` to
+    ``<directory>/<table>/bucket=<n>/...`` by a stable hash (CRC32) of it, so the
+    rows of one key land in the same bucket number in every table. Rows without
+    the column go to ``__HIVE_DEFAULT_PARTITION__``; tables without a partition
+    column are written to ``<directory>/<table>/`` directly. A file is closed
+    and the next part started once it reaches `max_file_bytes` (checked after
+    each batch; for Parquet after each row group).
+
+    Each partition keeps one file open, so value partitioning suits
+    low-cardinality columns; hash keys into buckets otherwise.
+
+    Args:
+        directory: Output directory, created if missing.
+        format: "csv" or "parquet".
+        partition_by: Partition column of every table, or a mapping of table
+                      name ("main" or a relation table name) to its column;
+                      the "*" entry applies to unlisted tables.
+        buckets: Number of hash buckets; None partitions by value.
+        max_file_bytes: File size at which to roll to a new part; None never rolls.
+        schemas: Type_cast schemas per table (Parquet only).
+        **options: CsvSink (buffer_size, encoding, delimiter) or ParquetSink
+                   (row_group_size, compression) options.
+
+    Example:
+        >>> sink = PartitionedSink("out", "parquet", buckets=16,
+        ...                        partition_by={"main": "id", "*": "_root"})
+        >>> stream_to_sink(documents, sink, root_fk="_root")
+        >>> sink.files()["main"][:2]
+    """
+
+    def __init__(self, directory: str, format: str = "csv", partition_by=None, buckets: Optional[int] = None,
+                 max_file_bytes: Optional[int] = 128 << 20, schemas: Dict[str, Dict[str, str]] = None,
+                 **options):
+        if format not in ("csv", "parquet"):
+            raise ValueError(f"Unsupported format: {format} please use 'csv' or 'parquet' instead.")
+        if format == "parquet":
+            _import_pyarrow()
+        if buckets is not None and buckets < 1:
+            raise ValueError("buckets must be at least 1")
+        if max_file_bytes is not None and max_file_bytes < 1:
+            raise ValueError("max_file_bytes must be at least 1")
+        self.directory = directory
+        self.format = format
+        self.partition_by = partition_by
+        self.buckets = buckets
+        self.max_file_bytes = max_file_bytes
+        self.schemas = schemas or {}
+        self.options = options
+        self.tables: Dict[str, Dict[Optional[str], _Partition]] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _column(self, table_name: str) -> Optional[str]:
+        if isinstance(self.partition_by, dict):
+            return self.partition_by.get(table_name, self.partition_by.get("*"))
+        return self.partition_by
+
+    def _partition_name(self, column: str, value: Any) -> str:
+        if self.buckets is None:
+            return f"{column}={_partition_value(value)}"
+        if value is None:
+            return f"bucket={_HIVE_DEFAULT_PARTITION}"
+        return f"bucket={zlib.crc32(str(value).encode('utf-8')) % self.buckets}"
+
+    def write_rows(self, table_name: str, rows: List[Dict]) -> None:
+        column = self._column(table_name)
+        if column is None:
+            groups = {None: rows}
+        else:
+            groups = {}
+            partition_name = self._partition_name
+            for row in rows:
+                name = partition_name(column, row.get(column))
+                group = groups.get(name)
+                if group is None:
+                    groups[name] = [row]
+                else:
+                    group.append(row)
+        partitions = self.tables.setdefault(table_name, {})
+        for name, group in groups.items():
+            partition = partitions.get(name)
+            if partition is None:
+                directory = os.path.join(self.directory, _table_filename(table_name, ""))
+                if name is not None:
+                    directory = os.path.join(directory, name)
+                os.makedirs(directory, exist_ok=True)
+                partition = partitions[name] = _Partition(directory)
+            self._write(table_name, partition, group)
+
+    def _write(self, table_name: str, partition: _Partition, rows: List[Dict]) -> None:
+        if partition.file is None:
+            path = os.path.join(partition.directory, f"part-{len(partition.paths):05d}.{self.format}")
+            partition.paths.append(path)
+            if self.format == "csv":
+                partition.file = _CsvTable(path, self.options.get("buffer_size", 1 << 20),
+                                           self.options.get("encoding", "utf-8"),
+                                           self.options.get("delimiter", ","))
+            else:
+                partition.file = _ParquetTable(table_name, path, self.schemas.get(table_name, {}),
+                                               self.options.get("row_group_size", 65536),
+                                               self.options.get("compression", "snappy"))
+        table = partition.file
+        if self.format == "csv":
+            table.write_rows(rows)
+            size = table.size
+        else:
+            table.append(rows)
+            # The file may have rolled over to a wider schema
+            partition.paths.extend(path for path in table.paths[1:] if path not in partition.paths)
+            size = os.path.getsize(table.path) if table.writer is not None else 0
+        partition.rows_written += len(rows)
+        if self.max_file_bytes is not None and size >= self.max_file_bytes:
+            table.close()
+            partition.file = None
+
+    def files(self) -> Dict[str, List[str]]:
+        """Paths of the files written per table, partition by partition."""
+        return {table_name: [path for partition in partitions.values() for path in partition.paths]
+                for table_name, partitions in self.tables.items()}
+
+    def row_counts(self) -> Dict[str, int]:
+        """Number of rows written so far per table (including rows buffered for Parquet)."""
+        return {table_name: sum(partition.rows_written for partition in partitions.values())
+                for table_name, partitions in self.tables.items()}
+
+    def close(self) -> None:
+        for partitions in self.tables.values():
+            for partition in partitions.values():
+                if partition.file is not None:
+                    partition.file.close()
+                    partition.file = None
+
+_SQLITE_TYPES = {
+    'int': 'INTEGER',
+    'bool': 'INTEGER',
+    'float': 'REAL',
+    'str': 'TEXT',
+    'date': 'TEXT',
+    'datetime': 'TEXT',
+}
+
+def _quote_identifier(name: str) -> str:
+    """Quote a table or column name for SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+def _to_sql_value(value: Any) -> Any:
+    """Convert a normalized value to something sqlite3 can bind."""
+    if value is None or isinstance(value, (int, float, str, bytes)):
+        # bool is an int subclass and is stored as 0/1
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value)
+
+def generate_ddl(table_name: str, schema: Dict[str, str], fk_columns: Iterable[str] = ()) -> List[str]:
+    """
+    Generate the SQLite DDL for a normalized table.
+
+    Args:
+        table_name: Name of the table.
+        schema: Column name -> type_cast type name ('int', 'float', 'str', 'bool',
+                'date', 'datetime'), in column order.
+        fk_columns: Foreign key columns to index.
+
+    Returns:
+        List of SQL statements: ``CREATE TABLE`` followed by one ``CREATE INDEX``
+        per foreign key column present in the schema.
+    """
+    columns = ", ".join(f"{_quote_identifier(column)} {_SQLITE_TYPES.get(type_name, 'TEXT')}"
+                        for column, type_name in schema.items())
+    statements = [f"CREATE TABLE IF NOT EXISTS {_quote_identifier(table_name)} ({columns})"]
+    for column in fk_columns:
+        if column in schema:
+            index_name = _quote_identifier(f"idx_{table_name}_{column}")
+            statements.append(f"CREATE INDEX IF NOT EXISTS {index_name} "
+                              f"ON {_quote_identifier(table_name)} ({_quote_identifier(column)})")
+    return statements
+
+class _SqliteTable:
+    """Tracks the columns, pending rows and insert timings of one SQLite table."""
+
+    def __init__(self, name: str, declared: Dict[str, str]):
+        self.name = name
+        self.declared = declared
+        self.columns: Dict[str, str] = {}
+        self.rows: List[Dict] = []
+        self.rows_written = 0
+        self.seconds = 0.0
+
+class SqliteSink(TableSink):
+    """
+    Bulk-load normalized tables into a SQLite database.
+
+    Tables are created on first use from the declared type_cast schemas and the
+    types inferred from the first batch, with an index on every foreign key
+    column of relation tables. Rows are buffered per table and inserted with
+    ``executemany`` in one transaction per `batch_size` rows. Columns first seen
+    in later batches are added with ``ALTER TABLE ADD COLUMN``.
+
+    Args:
+        path: Database file path (or ":memory:").
+        schemas: Mapping of table name ("main" or a relation table name) to a
+                 type_cast schema.
+        batch_size: Number of rows per insert transaction.
+        fk_columns: Columns to index in relation tables (the ``fk_name`` used
+                    during normalization).
+        pragmas: SQLite pragmas applied on connect.
+
+    Example:
+        >>> sink = SqliteSink("movies.db", batch_size=50000)
+        >>> stream_to_sink(documents, sink)
+        >>> sink.stats()["total"]["rows_per_second"]
+    """
+
+    def __init__(self, path: str, schemas: Dict[str, Dict[str, str]] = None,
+                 batch_size: int = 10000, fk_columns: Iterable[str] = ("parent_id",),
+                 pragmas: Dict[str, Any] = None):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.path = path
+        self.schemas = schemas or {}
+        self.batch_size = batch_size
+        self.fk_columns = tuple(fk_columns)
+        self.tables: Dict[str, _SqliteTable] = {}
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        if pragmas is None:
+            pragmas = {"journal_mode": "WAL", "synchronous": "NORMAL"}
+        for name, value in pragmas.items():
+            self.connection.execute(f"PRAGMA {name}={value}")
+
+    def write_rows(self, table_name: str, rows: List[Dict]) -> None:
+        table = self.tables.get(table_name)
+        if table is None:
+            table = _SqliteTable(table_name, self.schemas.get(table_name, {}))
+            self.tables[table_name] = table
+        table.rows.extend(rows)
+        if len(table.rows) >= self.batch_size:
+            self._flush(table)
+
+    def _existing_columns(self, table_name: str) -> Dict[str, str]:
+        cursor = self.connection.execute(f"PRAGMA table_info({_quote_identifier(table_name)})")
+        return {row[1]: row[2] for row in cursor.fetchall()}
+
+    def _evolve(self, table: _SqliteTable, rows: List[Dict]) -> None:
+        """Create the table on first use and add columns that are new in `rows`."""
+        new_columns = []
+        seen = set(table.columns)
+        if not table.columns:
+            for column in table.declared:
+                seen.add(column)
+                new_columns.append(column)
+        for row in rows:
+            for key in row:
+                if key not in seen:
+                    seen.add(key)
+                    new_columns.append(key)
+        if not new_columns:
+            return
+
+        types = {column: table.declared.get(column) or
+                 _infer_column_type([row.get(column) for row in rows])
+                 for column in new_columns}
+        if not table.columns:
+            # The table may already exist when appending to an earlier load
+            table.columns = self._existing_columns(table.name)
+        fk_columns = self.fk_columns if table.name != MAIN_TABLE else ()
+        if not table.columns:
+            for statement in generate_ddl(table.name, types, fk_columns):
+                self.connection.execute(statement)
+            table.columns = dict(types)
+            return
+        for column, type_name in types.items():
+            if column in table.columns:
+                continue
+            self.connection.execute(f"ALTER TABLE {_quote_identifier(table.name)} ADD COLUMN "
+                                    f"{_quote_identifier(column)} {_SQLITE_TYPES.get(type_name, 'TEXT')}")
+            table.columns[column] = type_name
+            if column in fk_columns:
+                for statement in generate_ddl(table.name, {column: type_name}, fk_columns)[1:]:
+                    self.connection.execute(statement)
+
+    def _flush(self, table: _SqliteTable) -> None:
+        rows, table.rows = table.rows, []
+        if not rows:
+            return
+        started = time.perf_counter()
+        # The schema as committed: _evolve records DDL that a rollback undoes
+        columns = dict(table.columns)
+        self.connection.execute("BEGIN")
+        try:
+            self._evolve(table, rows)
+            names = list(table.columns)
+            placeholders = ", ".join("?" for _ in names)
+            sql = (f"INSERT INTO {_quote_identifier(table.name)} "
+                   f"({', '.join(_quote_identifier(c) for c in names)}) VALUES ({placeholders})")
+            self.connection.executemany(
+                sql, ([_to_sql_value(row.get(column)) for column in names] for row in rows))
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            table.columns = columns
+            table.rows[:0] = rows
+            raise
+        table.seconds += time.perf_counter() - started
+        table.rows_written += len(rows)
+
+    def flush(self) -> None:
+        """Insert all buffered rows."""
+        for table in self.tables.values():
+            self._flush(table)
+
+    def row_counts(self) -> Dict[str, int]:
+        """Number of rows inserted so far per table (buffered rows excluded)."""
+        return {name: table.rows_written for name, table in self.tables.items()}
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Insert throughput per table and in total.
+
+        Returns:
+            ``{table_name: {"rows": int, "seconds": float, "rows_per_second": float}}``
+            plus a ``"total"`` entry.
+        """
+        def _entry(rows, seconds):
+            return {"rows": rows, "seconds": seconds,
+                    "rows_per_second": rows / seconds if seconds > 0 else 0.0}
+
+        result = {name: _entry(table.rows_written, table.seconds) for name, table in self.tables.items()}
+        result["total"] = _entry(sum(t.rows_written for t in self.tables.values()),
+                                 sum(t.seconds for t in self.tables.values()))
+        return result
+
+    def close(self) -> None:
+        if self.connection is None:
+            return
+        self.flush()
+        self.connection.close()
+        self.connection = None
+
+def write_tables(results: Iterable[Dict], sink: TableSink) -> Dict[str, int]:
+    """
+    Write a sequence of relational results to a sink and close it.
+
+    Args:
+        results: Iterable of relational results, e.g. from ``normalize_stream``.
+        sink: The sink to write to.
+
+    Returns:
+        Number of rows written per table.
+    """
+    counts: Dict[str, int] = {}
+    with sink:
+        for result in results:
+            if not result:
+                continue
+            sink.write(result)
+            counts[MAIN_TABLE] = counts.get(MAIN_TABLE, 0) + len(result.get("main", []))
+            for table_name, rows in result.get("relations", {}).items():
+                counts[table_name] = counts.get(table_name, 0) + len(rows)
+    return counts
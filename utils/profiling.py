@@ -0,0 +1,229 @@
+import linecache
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+from .metrics import NormalizeMetrics
+
+# tracemalloc.reset_peak() exists from Python 3.9; before that stage peaks are
+# bounded by the peak of the whole run
+_reset_peak = getattr(tracemalloc, "reset_peak", None)
+
+_IGNORED_FILES = (tracemalloc.__file__, linecache.__file__, __file__)
+
+def _snapshot() -> tracemalloc.Snapshot:
+    """Take a snapshot without the allocations of the profiler itself."""
+    return tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES]
+    )
+
+def _site(frame: tracemalloc.Frame) -> str:
+    return f"{frame.filename}:{frame.lineno}"
+
+def retained_size(rows: List[Dict[str, Any]]) -> int:
+    """
+    Approximate bytes held by a table of flat rows: the list, the row dicts and their values.
+
+    Keys are shared between rows and are not counted; values shared between rows
+    (small ints, interned strings) are counted once per row.
+    """
+    if hasattr(rows, "memory_usage"):
+        # CompactTable knows its own layout
+        return rows.memory_usage()
+    getsizeof = sys.getsizeof
+    total = getsizeof(rows)
+    for row in rows:
+        total += getsizeof(row)
+        for value in row.values():
+            total += getsizeof(value)
+    return total
+
+class MemoryProfiler(NormalizeMetrics):
+    """
+    Opt-in memory profiler for the normalization pipeline, built on tracemalloc.
+
+    A drop-in ``metrics=`` collector: besides the timings and counters of
+    `NormalizeMetrics`, every stage records the net bytes it left allocated and
+    the peak bytes it allocated above its starting point, plus the source lines
+    that allocated the most. DataFrame construction is measured per table, and
+    the retained size of every relation table is recorded.
+
+    Profiling is slow (tracemalloc hooks every allocation and sites need two
+    snapshots per stage); run it on a representative sample.
+
+    Attributes:
+        memory (dict): Stage name -> {"calls", "peak_bytes", "net_bytes", "sites"}.
+        tables (dict): Table name -> {"rows", "retained_bytes", "build_peak_bytes", "build_net_bytes"}.
+        top (int): Number of allocation sites kept per stage.
+
+    Example:
+        >>> output, report = normalize_json(doc, profile_memory=True)
+        >>> # or, for a stream:
+        >>> profiler = MemoryProfiler()
+        >>> with profiler.tracing():
+        ...     for chunk in normalize_stream(docs, metrics=profiler):
+        ...         ...
+        >>> profiler.report()["stages"]["flatten"]["peak_bytes"]
+    """
+
+    def __init__(self, top: int = 10, sites: bool = True, frames: int = 1):
+        super().__init__()
+        self.top = top
+        self.sites = sites
+        self.frames = frames
+        self.memory: Dict[str, Dict[str, Any]] = {}
+        self.tables: Dict[str, Dict[str, int]] = {}
+        self._stack: List[List[int]] = []
+        self._run: Dict[str, int] = {}
+        self._run_sites: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def tracing(self):
+        """Trace allocations for the enclosed block and record its overall peak and top sites."""
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start(self.frames)
+        before = _snapshot() if self.sites else None
+        self._push()
+        try:
+            yield self
+        finally:
+            start, peak = self._pop()
+            current = tracemalloc.get_traced_memory()[0]
+            self._run = {"peak_bytes": peak - start, "net_bytes": current - start}
+            if before is not None:
+                self._run_sites = self._diff_sites(before, _snapshot())
+            if started_here:
+                tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as stage `name` and record its memory use."""
+        if not tracemalloc.is_tracing():
+            # Not inside tracing(): behave like NormalizeMetrics
+            with super().stage(name):
+                yield self
+            return
+        with super().stage(name):
+            before = _snapshot() if self.sites else None
+            self._push()
+            try:
+                yield self
+            finally:
+                start, peak = self._pop()
+                current = tracemalloc.get_traced_memory()[0]
+                entry = self.memory.setdefault(name, {"calls": 0, "peak_bytes": 0, "net_bytes": 0, "sites": {}})
+                entry["calls"] += 1
+                entry["peak_bytes"] = max(entry["peak_bytes"], peak - start)
+                entry["net_bytes"] += current - start
+                if before is not None:
+                    for site in self._diff_sites(before, _snapshot()):
+                        totals = entry["sites"].setdefault(site["site"], {"size_diff": 0, "count_diff": 0})
+                        totals["size_diff"] += site["size_diff"]
+                        totals["count_diff"] += site["count_diff"]
+
+    @contextmanager
+    def table(self, name: str):
+        """Measure the construction of output table `name` (e.g. its DataFrame)."""
+        if not tracemalloc.is_tracing():
+            yield self
+            return
+        self._push()
+        try:
+            yield self
+        finally:
+            start, peak = self._pop()
+            current = tracemalloc.get_traced_memory()[0]
+            entry = self.tables.setdefault(name, {"rows": 0, "retained_bytes": 0})
+            entry["build_peak_bytes"] = max(entry.get("build_peak_bytes", 0), peak - start)
+            entry["build_net_bytes"] = entry.get("build_net_bytes", 0) + current - start
+
+    def record_tables(self, main: List[Dict], relations: Dict[str, List[Dict]]) -> None:
+        """Add the row counts and retained sizes of the main and relation tables."""
+        for name, rows in [("main", main)] + list(relations.items()):
+            entry = self.tables.setdefault(name, {"rows": 0, "retained_bytes": 0})
+            entry["rows"] += len(rows)
+            entry["retained_bytes"] += retained_size(rows)
+
+    def _push(self):
+        """Open a nested measurement starting at the current traced size."""
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            # Save the enclosing measurement's peak before reset_peak() forgets it
+            self._stack[-1][1] = max(self._stack[-1][1], peak)
+        self._stack.append([current, 0])
+        if _reset_peak is not None:
+            _reset_peak()
+
+    def _pop(self):
+        """Close the innermost measurement and return its (start, peak) traced bytes."""
+        peak = tracemalloc.get_traced_memory()[1]
+        start, nested_peak = self._stack.pop()
+        peak = max(peak, nested_peak)
+        if self._stack:
+            # The enclosing measurement must see the peak of the nested one
+            self._stack[-1][1] = max(self._stack[-1][1], peak)
+        return start, peak
+
+    def _diff_sites(self, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> List[Dict[str, Any]]:
+        stats = after.compare_to(before, "lineno")
+        stats.sort(key=lambda stat: stat.size_diff, reverse=True)
+        return [
+            {"site": _site(stat.traceback[0]), "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+            for stat in stats[:self.top] if stat.size_diff > 0
+        ]
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarize the profile.
+
+        Returns:
+            dict with "peak_bytes"/"net_bytes" of the traced run, per-stage
+            "stages" (calls, peak_bytes, net_bytes, seconds, top "sites"),
+            per-table "tables" and the run's "top_sites".
+        """
+        stages = {}
+        for name, entry in self.memory.items():
+            sites = sorted(entry["sites"].items(), key=lambda item: item[1]["size_diff"], reverse=True)
+            stages[name] = {
+                "calls": entry["calls"],
+                "seconds": self.timings.get(name, 0.0),
+                "peak_bytes": entry["peak_bytes"],
+                "net_bytes": entry["net_bytes"],
+                "sites": [dict(site=site, **totals) for site, totals in sites[:self.top]],
+            }
+        return {
+            "peak_bytes": self._run.get("peak_bytes"),
+            "net_bytes": self._run.get("net_bytes"),
+            "stages": stages,
+            "tables": {name: dict(entry) for name, entry in self.tables.items()},
+            "top_sites": list(self._run_sites),
+            "counters": dict(self.counters),
+        }
+
+    def merge(self, other: "NormalizeMetrics") -> "NormalizeMetrics":
+        super().merge(other)
+        if isinstance(other, MemoryProfiler):
+            for name, entry in other.memory.items():
+                mine = self.memory.setdefault(name, {"calls": 0, "peak_bytes": 0, "net_bytes": 0, "sites": {}})
+                mine["calls"] += entry["calls"]
+                mine["peak_bytes"] = max(mine["peak_bytes"], entry["peak_bytes"])
+                mine["net_bytes"] += entry["net_bytes"]
+                for site, totals in entry["sites"].items():
+                    target = mine["sites"].setdefault(site, {"size_diff": 0, "count_diff": 0})
+                    target["size_diff"] += totals["size_diff"]
+                    target["count_diff"] += totals["count_diff"]
+            for name, entry in other.tables.items():
+                mine = self.tables.setdefault(name, {"rows": 0, "retained_bytes": 0})
+                for key, value in entry.items():
+                    if key == "build_peak_bytes":
+                        mine[key] = max(mine.get(key, 0), value)
+                    else:
+                        mine[key] = mine.get(key, 0) + value
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = super().to_dict()
+        result['memory'] = self.report()
+        return result
@@ -0,0 +1,214 @@
+import hashlib
+import math
+import struct
+from array import array
+from typing import Any, Dict, Iterable, List, Tuple
+
+_MASK_32 = (1 << 32) - 1
+_MASK_64 = (1 << 64) - 1
+
+# Per-type offsets keep 1, 1.0 and True apart
+_INT_SEED = 0x9E3779B97F4A7C15
+_FLOAT_SEED = 0xD1B54A32D192ED03
+_BOOL_SEED = 0x8CB92BA72F3D8DD7
+_pack_double = struct.Struct("<d").pack
+
+def _mix(bits: int, seed: int) -> int:
+    """splitmix64 finalizer: a bijection on 64-bit values, so distinct bits never collide."""
+    hashed = (bits + seed) & _MASK_64
+    hashed = ((hashed ^ (hashed >> 30)) * 0xBF58476D1CE4E5B9) & _MASK_64
+    hashed = ((hashed ^ (hashed >> 27)) * 0x94D049BB133111EB) & _MASK_64
+    return hashed ^ (hashed >> 31)
+
+def stable_hash(value: Any) -> int:
+    """
+    64-bit hash of a value that is the same in every process.
+
+    Python's ``hash()`` of strings is salted per process, so sketches built in
+    different workers could not be merged with it. Numbers that fit 64 bits
+    only go through a cheap mixing step over their exact bits (two's
+    complement ints, IEEE doubles), offset by type.
+    """
+    kind = type(value)
+    if kind is int and -(1 << 63) <= value < (1 << 63):
+        return _mix(value, _INT_SEED)
+    if kind is float:
+        return _mix(int.from_bytes(_pack_double(value), "little"), _FLOAT_SEED)
+    if kind is bool:
+        return _mix(value, _BOOL_SEED)
+    if kind is str:
+        data = value.encode("utf-8", "surrogatepass")
+    elif kind is bytes:
+        data = value
+    else:
+        # Keep 1 and "1" apart, and values of different types with the same repr
+        data = b"\0" + kind.__qualname__.encode() + b"\0" + repr(value).encode("utf-8", "surrogatepass")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+class HyperLogLog:
+    """
+    Distinct count estimate in fixed memory.
+
+    Uses ``2 ** precision`` one-byte registers; the standard error is about
+    ``1.04 / sqrt(2 ** precision)`` (1.6% with the default 12).
+
+    Args:
+        precision: Number of hash bits that select a register (4 to 18).
+    """
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: Any) -> None:
+        """Add a value."""
+        self.add_hash(stable_hash(value))
+
+    def add_hash(self, hashed: int) -> None:
+        """Add a value by its `stable_hash`."""
+        self.add_hashes((hashed,))
+
+    def add_hashes(self, hashes: Iterable[int]) -> None:
+        """Add values by their `stable_hash`es."""
+        registers = self.registers
+        bits = 64 - self.precision
+        mask = (1 << bits) - 1
+        for hashed in hashes:
+            index = hashed >> bits
+            rank = bits - (hashed & mask).bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def estimate(self) -> int:
+        """Estimated number of distinct values added."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small range correction: linear counting
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Combine with a sketch of the same precision (e.g. from another chunk or worker)."""
+        if other.precision != self.precision:
+            raise ValueError("Can't merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+        return self
+
+class CountMinSketch:
+    """
+    Approximate value frequencies in fixed memory, plus the most frequent values.
+
+    Counts are never underestimated; they are overestimated by at most about
+    ``e / width`` of the total count with probability ``1 - exp(-depth)``.
+    Candidates for the `top_k` most frequent values are tracked next to the
+    counters.
+
+    Args:
+        width: Counters per row.
+        depth: Number of rows (independent hashes).
+        top_k: Number of heavy hitters reported by `top`.
+    """
+
+    def __init__(self, width: int = 1024, depth: int = 4, top_k: int = 10):
+        if width < 1 or depth < 1:
+            raise ValueError("width and depth must be at least 1")
+        self.width = width
+        self.depth = depth
+        self.top_k = top_k
+        self.total = 0
+        self.counters = [array("Q", bytes(8 * width)) for _ in range(depth)]
+        # Heavy hitter candidates: hash -> (value, estimate), keyed by hash so
+        # that 1, 1.0 and True stay apart; twice top_k are kept so that values
+        # close to the cut survive merges
+        self.candidates: Dict[int, Tuple[Any, int]] = {}
+        # Smallest candidate estimate once the candidates are full
+        self._floor = 0
+
+    def _cells(self, hashed: int):
+        low, high = hashed & _MASK_32, hashed >> 32
+        width = self.width
+        return [(low + row * high) % width for row in range(self.depth)]
+
+    def add(self, value: Any, count: int = 1) -> None:
+        """Count `value` (hashable) `count` times."""
+        self.add_counts(((value, stable_hash(value), count),))
+
+    def add_hash(self, value: Any, hashed: int, count: int = 1) -> None:
+        """Count `value` by its `stable_hash`."""
+        self.add_counts(((value, hashed, count),))
+
+    def add_counts(self, items: Iterable[Tuple[Any, int, int]]) -> None:
+        """Count ``(value, stable_hash, count)`` items."""
+        rows = self.counters
+        width = self.width
+        candidates = self.candidates
+        capacity = 2 * self.top_k
+        total = 0
+        for value, hashed, count in items:
+            total += count
+            # Row i uses cell (low + i * high) % width, see `_cells`
+            cell, high = hashed & _MASK_32, hashed >> 32
+            estimate = None
+            for counters in rows:
+                index = cell % width
+                counted = counters[index] = counters[index] + count
+                if estimate is None or counted < estimate:
+                    estimate = counted
+                cell += high
+            if hashed in candidates or len(candidates) < capacity:
+                candidates[hashed] = (value, estimate)
+                if len(candidates) == capacity:
+                    self._floor = min(item[1] for item in candidates.values())
+            elif estimate > self._floor:
+                self._offer(value, hashed, estimate)
+        self.total += total
+
+    def _offer(self, value: Any, hashed: int, estimate: int) -> None:
+        """Replace the weakest heavy hitter candidate by `value` if it is more frequent."""
+        candidates = self.candidates
+        if hashed in candidates or len(candidates) < 2 * self.top_k:
+            candidates[hashed] = (value, estimate)
+        else:
+            smallest = min(candidates, key=lambda key: candidates[key][1])
+            if estimate <= candidates[smallest][1]:
+                return
+            del candidates[smallest]
+            candidates[hashed] = (value, estimate)
+        if len(candidates) == 2 * self.top_k:
+            self._floor = min(item[1] for item in candidates.values())
+
+    def estimate_hash(self, hashed: int) -> int:
+        """Estimated count of the value with this `stable_hash`."""
+        return min(counters[cell] for counters, cell in zip(self.counters, self._cells(hashed)))
+
+    def estimate(self, value: Any) -> int:
+        """Estimated count of `value`."""
+        return self.estimate_hash(stable_hash(value))
+
+    def top(self) -> List[Tuple[Any, int]]:
+        """The `top_k` most frequent values seen, with their estimated counts."""
+        ranked = sorted(self.candidates.values(), key=lambda item: -item[1])
+        return ranked[:self.top_k]
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        """Add the counts of a sketch of the same dimensions."""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Can't merge CountMinSketches of different dimensions")
+        for counters, other_counters in zip(self.counters, other.counters):
+            for cell, count in enumerate(other_counters):
+                if count:
+                    counters[cell] += count
+        self.total += other.total
+        candidates = dict(self.candidates)
+        for hashed, (value, _) in other.candidates.items():
+            candidates.setdefault(hashed, (value, 0))
+        self.candidates = {}
+        self._floor = 0
+        for hashed, (value, _) in candidates.items():
+            self._offer(value, hashed, self.estimate_hash(hashed))
+        return self